@@ -124,6 +124,16 @@ def run(config, **kwargs):
         spec_dict = json.load(fp)
     interface.run(spec_dict)
 
+@cli.command()
+@_pass_config
+@click.argument('outdir', type=click.Path(exists=True, file_okay=False, resolve_path=True))
+def status(config, **kwargs):
+    """Print the number of runs in OUTDIR with each result, from its state database
+    """
+    config = spawn_config(**{**config, **kwargs})
+    interface = LocalInterface(config)
+    click.echo(_stats_to_string(interface.status(config.get(APP_NAME, 'outdir'))))
+
 @cli.command()
 @_pass_config
 def work(config):
@@ -24,7 +24,12 @@ DEFAULT_CONFIGURATION = {
         'config_file': ConfigurationBase.default_category + '.ini',
         'runner_type': 'process',
         'prereq_outdir': 'prerequisites',
-        'local': True
+        'local': True,
+        'generation_processes': 1,
+        'batch_size': 0,
+        'scheduler': 'luigi',
+        'state_database': False,
+        'deduplicate': False
     },
     'server': {
         'port': 8082,
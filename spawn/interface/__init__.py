@@ -17,6 +17,8 @@
 """Defines objects that implement the spawn interface
 """
 from .spawn import SpawnInterface
-from .local import LocalInterface, run as run_local, inspect as inspect_local, stats as stats_local
+from .local import (
+    LocalInterface, run as run_local, inspect as inspect_local, stats as stats_local, status as status_local
+)
 from .config import spawn_config
 from .util import write_inspection
@@ -22,8 +22,11 @@ import json
 
 from spawn.plugins import PluginLoader
 from spawn.parsers import SpecificationParser
-from spawn.specification import DictSpecificationConverter
-from spawn.schedulers import LuigiScheduler
+from spawn.specification import DictSpecificationConverter, deduplicate
+from spawn.schedulers import SCHEDULERS
+from spawn.runners import StateDatabase
+from spawn.runners.state_database import DATABASE_FILE_NAME
+from spawn.tasks import InputManifest
 
 from .spawn import SpawnInterface
 from .config import spawn_config
@@ -58,31 +61,69 @@ class LocalInterface(SpawnInterface):
         :param spec_dict: The specfile object
         :type spec_dict: dict
 
+        If leaves are deduplicated, the number of runs saved by deduplication is included.
+
         :returns: An dict containing stats about the object
         :rtype: dict
         """
+        if not self._deduplicate:
+            spec = self._spec_dict_to_spec(spec_dict, lazy=True)
+            return {
+                'leaf_count': spec.root_node.leaf_count
+            }
         spec = self._spec_dict_to_spec(spec_dict)
         return {
-            'leaf_count': len(spec.root_node.leaves)
+            'leaf_count': spec.root_node.leaf_count,
+            'runs_saved': len(spec.aliases)
         }
 
+    def status(self, outdir):
+        """Get the status of the runs in the output directory, from its state database
+
+        :param outdir: The output directory
+        :type outdir: path-like
+
+        :returns: A dict containing the number of runs with each result
+        :rtype: dict
+        """
+        if not path.isfile(path.join(outdir, DATABASE_FILE_NAME)):
+            raise FileNotFoundError('No state database found in {}'.format(outdir))
+        database = StateDatabase.in_directory(outdir)
+        try:
+            return database.summary()
+        finally:
+            database.close()
+
     def run(self, spec_dict):
         """Run the spec object on the luigi scheduler
 
         :param spec_dict: The specfile object
         :type spec_dict: dict
         """
-        spec = self._spec_dict_to_spec(spec_dict)
+        # Every leaf is needed to write the inspection file and generate the tasks, so rather than evaluating
+        # the whole tree of nodes, the tree is evaluated as it is stored in a compact tree
+        spec = self._spec_dict_to_spec(spec_dict, compact=True)
         plugin_type = self._config.get(self._config.default_category, 'type') or spec.metadata.spec_type
         if not plugin_type:
             raise ValueError((
                 'No plugin type defined - please specify the --type argument ' +
                 'or add a type property in the spec file'
             ))
-        self._write_json_inspection_file(spec, self._config.get(self._config.default_category, 'outdir'))
+        outdir = self._config.get(self._config.default_category, 'outdir')
+        self._write_json_inspection_file(spec, outdir)
         spawner = self._plugin_loader.create_spawner(plugin_type)
-        scheduler = LuigiScheduler(self._config)
-        scheduler.run(spawner, spec)
+        scheduler_type = self._config.get(self._config.default_category, 'scheduler') or 'luigi'
+        if scheduler_type not in SCHEDULERS:
+            raise ValueError('Unknown scheduler "{}" - expected one of {}'.format(
+                scheduler_type, ', '.join(SCHEDULERS.keys())
+            ))
+        scheduler = SCHEDULERS[scheduler_type](self._config)
+        # Record the hash of each input next to spawn.json, so that a rerun only rewrites the inputs that changed
+        manifest = InputManifest.load(outdir)
+        try:
+            scheduler.run(spawner, spec, manifest)
+        finally:
+            manifest.save()
 
     def _write_json_inspection_file(self, spec, outdir):
         if not path.isdir(outdir):
@@ -92,8 +133,18 @@ class LocalInterface(SpawnInterface):
         with open(inspection_file, 'w') as fp:
             json.dump(self._spec_to_spec_dict(spec), fp, indent=2)
 
-    def _spec_dict_to_spec(self, spec_dict):
-        return SpecificationParser(self._plugin_loader).parse(spec_dict)
+    def _spec_dict_to_spec(self, spec_dict, lazy=False, compact=False):
+        range_limit = self._config.get(self._config.default_category, 'range_limit', parameter_type=int, default=None)
+        spec = SpecificationParser(self._plugin_loader, range_limit=range_limit).parse(
+            spec_dict, compact=compact, lazy=lazy
+        )
+        if self._deduplicate and not lazy:
+            spec = deduplicate(spec)
+        return spec
+
+    @property
+    def _deduplicate(self):
+        return self._config.get(self._config.default_category, 'deduplicate', parameter_type=bool, default=False)
 
     @staticmethod
     def _spec_to_spec_dict(spec):
@@ -138,3 +189,14 @@ def stats(spec_dict, config=None):
     """
     config = _make_config(config)
     return LocalInterface(config).stats(spec_dict)
+
+def status(outdir, config=None):
+    """Get the status of the runs in outdir
+
+    :param outdir: The output directory
+    :type outdir: path-like
+    :param config: The config
+    :type config: dict or :class:`ConfigurationBase`
+    """
+    config = _make_config(config)
+    return LocalInterface(config).status(outdir)
@@ -47,6 +47,18 @@ class SpawnInterface(ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def status(self, outdir):
+        """Get the status of the runs in the output directory
+
+        :param outdir: The output directory
+        :type outdir: path-like
+
+        :returns: A dict containing the number of runs with each result
+        :rtype: dict
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def run(self, spec_dict):
         """Run the object
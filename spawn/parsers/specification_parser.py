@@ -26,6 +26,7 @@ from ..specification import (
     SpecificationModel, SpecificationMetadata, SpecificationNode,
     ValueProxyNode, SpecificationNodeFactory
 )
+from ..specification.compact import CompactSpecificationTree
 from ..specification.combinators import zip_properties, product
 from ..specification.evaluators import (
     RangeEvaluator, RepeatEvaluator, MultiplyEvaluator,
@@ -120,17 +121,23 @@ class SpecificationParser:
     produce a tree representation of the nodes.
     """
 
-    def __init__(self, plugin_loader):
+    def __init__(self, plugin_loader, range_limit=None):
         """Initialises the :class:`SpecificationParser`
 
         :param provider: The source of the specification description
         :type provider: :class:`SpecificationDescriptionProvider`
+        :param range_limit: The maximum number of values produced by the ``range`` evaluator.
+                            Defaults to :attr:`RangeEvaluator.max_values`.
+        :type range_limit: int
         """
         self._plugin_loader = plugin_loader
         plugin_evaluators = self._plugin_loader.load_evaluators()
-        self._pre_loaded_value_libraries = ValueLibraries(evaluators={**EVALUATOR_LIB, **plugin_evaluators})
+        evaluators = {**EVALUATOR_LIB, **plugin_evaluators}
+        if range_limit is not None and evaluators[RANGE] is RangeEvaluator:
+            evaluators[RANGE] = RangeEvaluator.limited_to(range_limit)
+        self._pre_loaded_value_libraries = ValueLibraries(evaluators=evaluators)
 
-    def parse(self, description):
+    def parse(self, description, compact=False, lazy=False):
         """Parse the specification description
 
         Reads the metadata from the file and creates any required value libraries,
@@ -139,6 +146,12 @@ class SpecificationParser:
 
         :param description: The specification description
         :type description: dict
+        :param compact: If ``True``, store the evaluated tree in a :class:`CompactSpecificationTree`,
+                        which uses considerably less memory for large specifications
+        :type compact: bool
+        :param lazy: If ``True``, nodes are parsed and evaluated only when their children are first accessed,
+                     rather than expanding the whole tree up front
+        :type lazy: bool
 
         :returns: An object representing the expanded specification tree.
         :rtype: :class:`SpecificationModel`
@@ -156,11 +169,15 @@ class SpecificationParser:
         value_libraries = self._pre_loaded_value_libraries.copy()
         value_proxy_parser = ValueProxyParser(value_libraries)
         self._update_value_libraries(description, value_proxy_parser, value_libraries)
+        # A compact tree is evaluated as it is stored, so the whole tree of nodes is never held in memory
         node_parser = SpecificationNodeParser(
-            value_proxy_parser, self._get_combinators(), default_combinator=PRODUCT
+            value_proxy_parser, self._get_combinators(), default_combinator=PRODUCT, lazy=lazy or compact
         )
         root_node = node_parser.parse(description.get('spec'))
-        root_node.evaluate()
+        if compact:
+            root_node = CompactSpecificationTree.from_node(root_node).root
+        elif not lazy:
+            root_node.evaluate()
         return SpecificationModel(description.get('base_file'), root_node, metadata)
 
     def _update_value_libraries(self, description, value_proxy_parser, value_libraries):
@@ -185,7 +202,7 @@ class SpecificationNodeParser:
     child nodes and expands them according to their values.
     """
 
-    def __init__(self, value_proxy_parser, combinators=None, default_combinator=None):
+    def __init__(self, value_proxy_parser, combinators=None, default_combinator=None, lazy=False):
         """Initialises the node parser
 
         :param value_proxy_parser: The value proxy parser
@@ -193,11 +210,15 @@ class SpecificationNodeParser:
         :param combinators: A mapping between combinator names (e.g. zip, product) and combinators.
                            The default is {}
         :type combinators: dict
+        :param lazy: If ``True``, defer parsing the children of each node until they are first accessed
+        :type lazy: bool
         """
         self._combinators = combinators or {}
         self._default_combinator = default_combinator
         self._node_factory = SpecificationNodeFactory()
         self._value_proxy_parser = value_proxy_parser
+        self._lazy = lazy
+        self._leaf_counts = {}
 
     def parse(self, node_spec, parent=None, node_policies=None, ghost_parameters=None):
         """Parse the `node_spec`, and expand its children.
@@ -227,6 +248,45 @@ class SpecificationNodeParser:
         self._parse_value(parent, name, value, next_node_spec, node_policies, ghost_parameters)
         return parent
 
+    def count_leaves(self, node_spec):
+        """Count the leaves that parsing the `node_spec` would add beneath a node, without parsing it
+
+        :param node_spec: A node specification
+        :type node_spec: dict
+
+        :returns: The number of leaves, or ``None`` if the count depends on evaluating value proxies
+        :rtype: int
+        """
+        _, node_spec = self._get_policies(node_spec)
+        _, node_spec = self._get_ghost_parameters(node_spec)
+        if node_spec is None or node_spec == {}:
+            return 0
+        validate_type(node_spec, dict, 'node_spec')
+        key = repr(node_spec)
+        if key not in self._leaf_counts:
+            (name, value), next_node_spec = self._get_next_node(node_spec)
+            self._leaf_counts[key] = self._count_value(name, value, next_node_spec)
+        return self._leaf_counts[key]
+
+    def _count_value(self, name, value, next_node_spec):
+        literal, name, value = self._parse_literal(name, value)
+        if self._is_combinator(name):
+            counts = [self.count_leaves({**s, **next_node_spec}) for s in self._get_combinator(name)(value)]
+        elif isinstance(value, list) and not literal:
+            counts = [self._count_value(name, val, next_node_spec) for val in value]
+        elif isinstance(value, dict) and not literal:
+            counts = [self.count_leaves(value), self.count_leaves(next_node_spec)]
+        else:
+            child_leaf_count = self.count_leaves(next_node_spec)
+            if child_leaf_count is None:
+                return None
+            if isinstance(value, str) and self._is_value_proxy(value) and not literal:
+                value = self._value_proxy_parser.parse(value)
+            return SpecificationNodeFactory.leaf_count(value, child_leaf_count or 1, literal=literal)
+        if None in counts:
+            return None
+        return sum(counts)
+
     @staticmethod
     def _merge_policies(left, right):
         if not left:
@@ -262,14 +322,20 @@ class SpecificationNodeParser:
                 parent, name, self._value_proxy_parser.parse(value),
                 node_policies.get(PATH, None), ghost_parameters
             )
-            self.parse(next_node_spec, next_parent)
+            self._parse_children(next_node_spec, next_parent)
         # simple single value
         else:
             logger.debug('Parsing "%s" as raw value (%s)', name, value)
             next_parent = self._node_factory.create(
                 parent, name, value, node_policies.get(PATH, None), ghost_parameters, literal=literal
             )
-            self.parse(next_node_spec, next_parent)
+            self._parse_children(next_node_spec, next_parent)
+
+    def _parse_children(self, node_spec, parent):
+        if self._lazy and node_spec:
+            self._node_factory.defer_children(parent, _DeferredNodeSpec(self, node_spec))
+        else:
+            self.parse(node_spec, parent)
 
     def _parse_literal(self, name, value):
         literal_key = self._is_literal(name)
@@ -359,3 +425,20 @@ class SpecificationNodeParser:
         if ':' in value:
             return value.split(':', 1)
         return None, value
+
+class _DeferredNodeSpec:
+    """Node specification whose parsing is deferred until the children of its parent are accessed
+    """
+    def __init__(self, node_parser, node_spec):
+        self._node_parser = node_parser
+        self._node_spec = node_spec
+
+    def populate(self, node):
+        """Parses the node specification into children of `node`
+        """
+        self._node_parser.parse(self._node_spec, node)
+
+    def leaf_count(self):
+        """Counts the leaves that would be added by :meth:`populate`
+        """
+        return self._node_parser.count_leaves(self._node_spec)
@@ -18,6 +18,8 @@
 """
 
 import ast
+import re
+from functools import lru_cache
 
 from spawn.specification.evaluators import ParameterEvaluator
 from spawn.errors import (
@@ -43,6 +45,9 @@ GENERATOR_TOKEN = '__generator__'
 PARAMETER_TOKEN = '__param__'
 EVALUATOR_TOKEN = ''
 
+#: The maximum number of distinct value proxy strings whose parsed value proxies are kept by each parser
+PARSE_CACHE_SIZE = 4096
+
 TOKENS = {
     MACRO: MACRO_TOKEN,
     GENERATOR: GENERATOR_TOKEN,
@@ -50,6 +55,14 @@ TOKENS = {
     EVALUATOR: EVALUATOR_TOKEN
 }
 
+# A string is a value proxy if it starts with a short form, or a long form followed by a colon.
+# This is equivalent to expanding the short forms throughout the string and checking for a long form prefix,
+# since no expansion can complete a long form prefix started in the original string.
+_VALUE_PROXY_PATTERN = re.compile('(?:[{}]|(?:{}):)'.format(
+    re.escape(''.join(SHORT_FORM_EXPANSION.keys())),
+    '|'.join(re.escape(prefix) for prefix in [GENERATOR, MACRO, EVALUATOR, PARAMETER])
+))
+
 class ValueProxyVisitor(ast.NodeVisitor):
     """Implementation of :class:`ast.NodeVisitor` that is able to parse evaluators
     """
@@ -188,18 +201,25 @@ class ValueProxyVisitor(ast.NodeVisitor):
 
 class ValueProxyParser:
     """Parser for value proxies
+
+    Parsed value proxies are cached by their string, so that a string repeated throughout a spec
+    is only parsed once. Value proxies are not modified by evaluation, so may be shared.
     """
-    def __init__(self, value_libraries):
+    def __init__(self, value_libraries, cache_size=PARSE_CACHE_SIZE):
         """Initialises :class:`ValueProxyParser`
 
         :param value_libraries: A mapping between value library names (e.g. generators, evaluators, macros)
                                 and value libraries.
                                 The default is {}.
         :type value_libraries: dict
+        :param cache_size: The maximum number of parsed value proxies to cache, least recently used first out.
+                           ``None`` for no limit.
+        :type cache_size: int
         """
         self._evaluator_library = value_libraries.evaluators
         self._generator_library = value_libraries.generators
         self._macro_library = value_libraries.macros
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse)
 
     def parse(self, value):
         """Parse the value string
@@ -212,6 +232,9 @@ class ValueProxyParser:
         """
         if not self.is_value_proxy(value):
             raise ValueError('{} is not a value proxy'.format(value))
+        return self._parse_cached(value)
+
+    def _parse(self, value):
         tokenised_string = self._tokenise(value)
         tree = ast.parse(tokenised_string)
         visitor = ValueProxyVisitor(
@@ -220,7 +243,8 @@ class ValueProxyParser:
         visitor.visit(tree)
         return visitor.value_proxy
 
-    def is_value_proxy(self, value):
+    @staticmethod
+    def is_value_proxy(value):
         """Determine if the provided string is a value proxy
 
         :param value: The value to analyse
@@ -229,10 +253,7 @@ class ValueProxyParser:
         :returns: ``True`` if the string provided is a value proxy; ``False`` otherwise
         :rtype: bool
         """
-        if not isinstance(value, str):
-            return False
-        expanded_string = self._expand(value)
-        return any(expanded_string.startswith(prefix + ':') for prefix in [GENERATOR, MACRO, EVALUATOR, PARAMETER])
+        return isinstance(value, str) and _VALUE_PROXY_PATTERN.match(value) is not None
 
     @staticmethod
     def _tokenise(input_string):
@@ -27,7 +27,7 @@ from ..tasks import SimulationTask
 from ..simulation_inputs import JsonSimulationInput
 
 
-def create_spawner(task_exe, working_dir, base_file, runner_type):
+def create_spawner(task_exe, working_dir, base_file, runner_type, max_log_size=None):
     """
     Creates spawner that creates tasks taking a single JSON input file as command line argument
 
@@ -35,6 +35,7 @@ def create_spawner(task_exe, working_dir, base_file, runner_type):
     :param working_dir: Working directory of task execution
     :param base_file: Baseline JSON file on which to make parameter editions and additions. If None, parameter additions
      will be made onto an empty input
+    :param max_log_size: If given, only the last ``max_log_size`` bytes of the output of each task are kept in its logs
     :return: :class:`SingleInputFileSpawner` object
     """
     if task_exe is not None:
@@ -60,6 +61,8 @@ def create_spawner(task_exe, working_dir, base_file, runner_type):
     luigi_config.set(SimulationTask.__name__, '_exe_path', task_exe)
     luigi_config.set(SimulationTask.__name__, '_working_dir', working_dir)
     luigi_config.set(SimulationTask.__name__, '_runner_type', runner_type)
+    if max_log_size:
+        luigi_config.set(SimulationTask.__name__, '_max_log_size', str(max_log_size))
 
     if base_file is not None:
         with open(base_file, 'r') as fp:
@@ -20,3 +20,6 @@ A runner has a ``run`` method, which runs the work required for a task,
 and a ``complete`` method, which returns ``True`` when the task has completed.
 """
 from .process_runner import ProcessRunner
+from .state_index import StateFileIndex
+from .state_database import StateDatabase
+from .result_cache import ResultCache
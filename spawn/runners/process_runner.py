@@ -16,22 +16,62 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
 """Implementation of the :class:`ProcessRunner`
 """
+import asyncio
 import subprocess
+import time
+from threading import Thread
 import logging
-from os import path, getcwd
+from os import path, getcwd, remove
 import json
 
 from spawn.util.validation import validate_file
 
+from .state_index import StateFileIndex, STATE_FILE_EXTENSION
+from .state_database import StateDatabase
+from .result_cache import ResultCache
+
 LOGGER = logging.getLogger(__name__)
 
 SUCCESS = 'success'
 FAILURE = 'failure'
 
+_READ_SIZE = 64 * 1024
+
+class _TailBuffer:
+    """Buffer that keeps only the last ``max_size`` bytes written to it
+    """
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._buffer = bytearray()
+
+    def write(self, data):
+        """Appends the data, discarding the oldest bytes if the buffer is over size
+        """
+        self._buffer += data
+        excess = len(self._buffer) - self._max_size
+        if excess > 0:
+            del self._buffer[:excess]
+
+    def getvalue(self):
+        """Gets the contents of the buffer
+        """
+        return bytes(self._buffer)
+
+def _read_into(stream, buffer):
+    for chunk in iter(lambda: stream.read(_READ_SIZE), b''):
+        buffer.write(chunk)
+
+async def _read_into_async(stream, buffer):
+    chunk = await stream.read(_READ_SIZE)
+    while chunk:
+        buffer.write(chunk)
+        chunk = await stream.read(_READ_SIZE)
+
 class ProcessRunner:
     """Runner that uses the native os process (provided by :mod:`subprocess`) in order to run tasks
     """
-    def __init__(self, id_, input_file_path, exe_path, run_name=None, output_dir=None, cwd=None):
+    def __init__(self, id_, input_file_path, exe_path, run_name=None, output_dir=None, cwd=None, input_hash=None,
+                 max_log_size=None):
         """Initialises the :class:`ProcessRunner`
 
         :param id_: The ID of the runner
@@ -47,6 +87,11 @@ class ProcessRunner:
         :param cwd: The current working directory for the child process.
             Defaults to the current working directory for the parent process.
         :type cwd: path-like
+        :param input_hash: The hash of the inputs of the run, if known. Recorded in the state database.
+        :type input_hash: str
+        :param max_log_size: If given, only the last ``max_log_size`` bytes of each of stdout and stderr are kept
+            in the log files; otherwise the output is streamed to the log files in full.
+        :type max_log_size: int
         """
         self._id = id_
         self._input_file_path = input_file_path
@@ -54,23 +99,114 @@ class ProcessRunner:
         self._run_name = run_name or path.splitext(path.basename(input_file_path))[0]
         self._output_dir = output_dir or path.dirname(input_file_path)
         self._cwd = cwd or getcwd()
+        self._input_hash = input_hash
+        self._max_log_size = max_log_size
 
     def run(self):
         """Runs the process synchronously.
 
-        Runs the process synchronously and when complete writes the log files and a status file.
+        Runs the process synchronously, writing its output to the log files, and when complete writes a status file.
+        If a :class:`ResultCache` is active and holds the outputs of a run with identical input file and executable,
+        the outputs are restored from the cache rather than running the process.
         """
         validate_file(self._input_file_path, 'input_file_path')
         validate_file(self._exe_path, 'exe_path')
+        start_time = time.time()
+        cache_entry = self._cache_entry()
+        if self._restore_from_cache(cache_entry, start_time):
+            return
         LOGGER.info('Executing \'%s\': %s', self._id, self.process_args)
-        output = subprocess.run(args=self.process_args, cwd=self._cwd, check=False,
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        self._write_logs(output)
-        state = self._output_to_state(output)
-        with open(self.state_file, 'w') as fp:
-            json.dump(state, fp)
-        if output.returncode != 0:
-            raise ChildProcessError('process exited with {}'.format(output.returncode))
+        ResultCache.release(self._output_dir)
+        self._remove_logs()
+        if self._max_log_size:
+            process = subprocess.Popen(args=self.process_args, cwd=self._cwd,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            buffers = _TailBuffer(self._max_log_size), _TailBuffer(self._max_log_size)
+            readers = [
+                Thread(target=_read_into, args=(stream, buffer), daemon=True)
+                for stream, buffer in zip((process.stdout, process.stderr), buffers)
+            ]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+            returncode = process.wait()
+            self._write_logs(*buffers)
+        else:
+            with open(self.log_file, 'wb') as stdout, open(self.error_file, 'wb') as stderr:
+                returncode = subprocess.run(args=self.process_args, cwd=self._cwd, check=False,
+                                            stdout=stdout, stderr=stderr).returncode
+        self._process_output(returncode, start_time, cache_entry)
+
+    async def run_async(self):
+        """Runs the process asynchronously, using :mod:`asyncio` subprocesses.
+
+        Behaves as :meth:`run`, but may be awaited from an event loop.
+        """
+        validate_file(self._input_file_path, 'input_file_path')
+        validate_file(self._exe_path, 'exe_path')
+        start_time = time.time()
+        cache_entry = self._cache_entry()
+        if self._restore_from_cache(cache_entry, start_time):
+            return
+        LOGGER.info('Executing \'%s\': %s', self._id, self.process_args)
+        ResultCache.release(self._output_dir)
+        self._remove_logs()
+        if self._max_log_size:
+            process = await asyncio.create_subprocess_exec(
+                *self.process_args, cwd=self._cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            buffers = _TailBuffer(self._max_log_size), _TailBuffer(self._max_log_size)
+            await asyncio.gather(
+                _read_into_async(process.stdout, buffers[0]), _read_into_async(process.stderr, buffers[1])
+            )
+            returncode = await process.wait()
+            self._write_logs(*buffers)
+        else:
+            with open(self.log_file, 'wb') as stdout, open(self.error_file, 'wb') as stderr:
+                process = await asyncio.create_subprocess_exec(
+                    *self.process_args, cwd=self._cwd, stdout=stdout, stderr=stderr
+                )
+                returncode = await process.wait()
+        self._process_output(returncode, start_time, cache_entry)
+
+    def _cache_entry(self):
+        cache = ResultCache.active()
+        if cache is None:
+            return None
+        return cache.entry(self._input_file_path, self._exe_path, self._output_dir)
+
+    def _restore_from_cache(self, cache_entry, start_time):
+        if cache_entry is None or not cache_entry.restore():
+            return False
+        LOGGER.info('Restored outputs of \'%s\' from result cache entry %s', self._id, cache_entry.key)
+        self._record_state(0, start_time)
+        return True
+
+    def _process_output(self, returncode, start_time, cache_entry=None):
+        self._finish_error_log(returncode)
+        if cache_entry is not None and returncode == 0:
+            cache_entry.store()
+        self._record_state(returncode, start_time)
+        if returncode != 0:
+            raise ChildProcessError('process exited with {}'.format(returncode))
+
+    def _record_state(self, returncode, start_time):
+        state = self._output_to_state(returncode)
+        database = StateDatabase.active()
+        if database is not None:
+            database.record(
+                self._id, state['result'], state['returncode'],
+                start_time=start_time, end_time=time.time(), input_hash=self._input_hash
+            )
+        else:
+            if self._input_hash is not None:
+                state['input_hash'] = self._input_hash
+            with open(self.state_file, 'w') as fp:
+                json.dump(state, fp)
+            index = StateFileIndex.active(self.state_file)
+            if index is not None:
+                index.record(self.state_file, state)
 
     def error_logs(self):
         """Error logs produced by the process, if any
@@ -78,9 +214,8 @@ class ProcessRunner:
         :returns: The output written to stderr, if any, otherwise ``None``
         :rtype: str
         """
-        error_file = self.output_file_base + '.err'
-        if path.isfile(error_file):
-            with open(error_file) as fp:
+        if path.isfile(self.error_file):
+            with open(self.error_file) as fp:
                 return fp.read()
         return None
 
@@ -90,23 +225,43 @@ class ProcessRunner:
         :returns: The output written to stdout, if any, otherwise ``None``
         :rtype: str
         """
-        log_file = self.output_file_base + '.log'
-        if path.isfile(log_file):
-            with open(log_file) as fp:
+        if path.isfile(self.log_file):
+            with open(self.log_file) as fp:
                 return fp.read()
         return None
 
     def complete(self):
         """Determine if the run is complete.
 
+        If a :class:`StateDatabase` is active, the state recorded in it is used. Otherwise, or if
+        it has no state for this run, the state file is read, using the active
+        :class:`StateFileIndex` covering the state file if there is one.
+
+        If this runner has an input hash and the recorded state has a different one, the inputs
+        have changed since the run, so it is not complete.
+
         :returns: ``True`` if the run is complete; ``False`` otherwise.
         :rtype: bool
         """
-        if path.isfile(self.output_file_base + '.state.json'):
+        state = self._read_state()
+        if state is None or state['result'] != SUCCESS:
+            return False
+        recorded_hash = state.get('input_hash')
+        return self._input_hash is None or recorded_hash is None or recorded_hash == self._input_hash
+
+    def _read_state(self):
+        database = StateDatabase.active()
+        if database is not None:
+            state = database.state(self._id)
+            if state is not None:
+                return state
+        index = StateFileIndex.active(self.state_file)
+        if index is not None:
+            return index.state(self.state_file)
+        if path.isfile(self.state_file):
             with open(self.state_file) as fp:
-                state = json.load(fp)
-            return state['result'] == SUCCESS
-        return False
+                return json.load(fp)
+        return None
 
     @property
     def process_args(self):
@@ -128,6 +283,24 @@ class ProcessRunner:
         """
         return path.join(self._output_dir, self._run_name)
 
+    @property
+    def log_file(self):
+        """The path to the file containing the output written to stdout
+
+        :returns: The path to the log file
+        :rtype: path-like
+        """
+        return self.output_file_base + '.log'
+
+    @property
+    def error_file(self):
+        """The path to the file containing the output written to stderr
+
+        :returns: The path to the error log file
+        :rtype: path-like
+        """
+        return self.output_file_base + '.err'
+
     @property
     def state_file(self):
         """The path to the state file
@@ -135,21 +308,32 @@ class ProcessRunner:
         :returns: The path to the state file
         :rtype: path-like
         """
-        return self.output_file_base + '.state.json'
-
-    def _write_logs(self, output):
-        with open(self.output_file_base + '.log', 'wb') as fp:
-            fp.write(output.stdout)
-        if output.stderr:
-            with open(self.output_file_base + '.err', 'wb') as fp:
-                fp.write(output.stderr)
-        elif output.returncode != 0:
-            with open(self.output_file_base + '.err', 'w') as fp:
-                fp.write(str(output.returncode))
+        return self.output_file_base + STATE_FILE_EXTENSION
+
+    def _remove_logs(self):
+        # Unlink rather than overwrite existing logs, which may be hard-linked to a result cache entry
+        for log_file in (self.log_file, self.error_file):
+            if path.lexists(log_file):
+                remove(log_file)
+
+    def _write_logs(self, stdout, stderr):
+        with open(self.log_file, 'wb') as fp:
+            fp.write(stdout.getvalue())
+        with open(self.error_file, 'wb') as fp:
+            fp.write(stderr.getvalue())
+
+    def _finish_error_log(self, returncode):
+        # Only keep the error log if something was written to stderr, or the process failed
+        if path.getsize(self.error_file) == 0:
+            if returncode != 0:
+                with open(self.error_file, 'w') as fp:
+                    fp.write(str(returncode))
+            else:
+                remove(self.error_file)
 
     @staticmethod
-    def _output_to_state(output):
+    def _output_to_state(returncode):
         return {
-            'result': SUCCESS if output.returncode == 0 else FAILURE,
-            'returncode': output.returncode
+            'result': SUCCESS if returncode == 0 else FAILURE,
+            'returncode': returncode
         }
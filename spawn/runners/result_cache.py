@@ -0,0 +1,307 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Implementation of the :class:`ResultCache`
+"""
+import os
+from os import path
+import shutil
+import stat
+import time
+import logging
+
+from spawn.util.hash import file_hash, string_hash
+
+LOGGER = logging.getLogger(__name__)
+
+_ACTIVE_CACHES = []
+
+RESTORED_FILE_NAME = '.spawn-restored'
+
+class ResultCache:
+    """Content-addressed cache of the outputs of successful runs
+
+    Outputs are stored in a directory per entry, keyed by the hash of the input file and the
+    executable, so that a run whose input file is byte-identical to that of an earlier run of the
+    same executable can take its outputs from the cache instead of running the executable.
+
+    Outputs are copied into the cache and made read-only. They are hard-linked out of the cache where
+    possible (and copied otherwise), so that restored outputs cannot be modified in place. The restored
+    outputs are recorded in the output directory, so that :meth:`release` can replace them with writable
+    copies before the executable is next run there. If ``max_size`` is given, the least recently used
+    entries are evicted once the total size of the cache exceeds it. When several processes share
+    a cache, each only accounts for the entries it has seen, so the bound is approximate.
+
+    The cache is used by :class:`ProcessRunner` while it is active, i.e. inside a ``with`` block::
+
+        with ResultCache(cache_dir):
+            ...
+    """
+    def __init__(self, cache_dir, max_size=None, link=True):
+        """Initialises the :class:`ResultCache`
+
+        :param cache_dir: The directory in which to store the cache. Created if it does not exist.
+        :type cache_dir: path-like
+        :param max_size: The maximum total size of the cache in bytes, or ``None`` for no limit
+        :type max_size: int
+        :param link: ``True`` to hard-link restored outputs to the cache where possible;
+            ``False`` to always copy them
+        :type link: bool
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._link = link
+        self._entries = None
+        self._exe_hashes = {}
+
+    def key(self, input_file_path, exe_path):
+        """Gets the cache key of a run
+
+        :param input_file_path: The path to the input file of the run
+        :type input_file_path: path-like
+        :param exe_path: The path to the executable of the run
+        :type exe_path: path-like
+
+        :returns: The cache key
+        :rtype: str
+        """
+        exe_stat = os.stat(exe_path)
+        exe_key = (path.abspath(exe_path), exe_stat.st_mtime_ns, exe_stat.st_size)
+        if exe_key not in self._exe_hashes:
+            self._exe_hashes[exe_key] = file_hash(exe_path)
+        return string_hash(file_hash(input_file_path) + self._exe_hashes[exe_key])
+
+    def entry(self, input_file_path, exe_path, output_dir):
+        """Gets the cache entry for a run
+
+        :param input_file_path: The path to the input file of the run
+        :type input_file_path: path-like
+        :param exe_path: The path to the executable of the run
+        :type exe_path: path-like
+        :param output_dir: The output directory of the run
+        :type output_dir: path-like
+
+        :returns: The cache entry, which can restore or store the outputs of the run
+        :rtype: :class:`ResultCacheEntry`
+        """
+        return ResultCacheEntry(self, self.key(input_file_path, exe_path), output_dir)
+
+    def restore(self, key, output_dir):
+        """Restores the outputs of a cached run, if there is one
+
+        :param key: The cache key of the run
+        :type key: str
+        :param output_dir: The directory to restore the outputs to
+        :type output_dir: path-like
+
+        :returns: ``True`` if the outputs were restored; ``False`` if there is no cached run
+        :rtype: bool
+        """
+        entry_dir = path.join(self._cache_dir, key)
+        if not path.isdir(entry_dir):
+            return False
+        restored = _files(entry_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        for file_path in restored:
+            self._restore_file(path.join(entry_dir, file_path), path.join(output_dir, file_path))
+        with open(path.join(output_dir, RESTORED_FILE_NAME), 'w') as fp:
+            fp.write('\n'.join(restored))
+        # The modified time of the entry records its last use for other processes; file system timestamps
+        # may be coarse, so this process also keeps its own record
+        os.utime(entry_dir)
+        entries = self._load_entries()
+        if key in entries:
+            entries[key] = (time.time(), entries[key][1])
+        return True
+
+    @staticmethod
+    def snapshot(output_dir):
+        """Takes a snapshot of the files in the output directory, so that the outputs of a run can be identified
+
+        :param output_dir: The output directory of the run
+        :type output_dir: path-like
+
+        :returns: The snapshot, to be passed to :meth:`store`
+        :rtype: dict
+        """
+        return {f: _modified_time(path.join(output_dir, f)) for f in _files(output_dir)}
+
+    @staticmethod
+    def release(output_dir):
+        """Releases the outputs restored to the output directory, so that the executable can be run there
+
+        Restored outputs that are links to the cache are replaced by copies, and all restored outputs are made
+        writable, so that the run can overwrite them without modifying the cache.
+
+        :param output_dir: The output directory of the run
+        :type output_dir: path-like
+        """
+        record = path.join(output_dir, RESTORED_FILE_NAME)
+        if not path.isfile(record):
+            return
+        with open(record) as fp:
+            restored = fp.read().splitlines()
+        for file_path in restored:
+            restored_file = path.join(output_dir, file_path)
+            if not path.isfile(restored_file):
+                continue
+            if os.stat(restored_file).st_nlink > 1:
+                temp_file = '{}.{}.tmp'.format(restored_file, os.getpid())
+                shutil.copy2(restored_file, temp_file)
+                os.replace(temp_file, restored_file)
+            os.chmod(restored_file, stat.S_IMODE(os.stat(restored_file).st_mode) | stat.S_IWUSR)
+        os.remove(record)
+
+    def store(self, key, output_dir, snapshot):
+        """Stores the outputs of a successful run
+
+        The outputs are the files in the output directory that were created or modified since the snapshot.
+
+        :param key: The cache key of the run
+        :type key: str
+        :param output_dir: The output directory of the run
+        :type output_dir: path-like
+        :param snapshot: The snapshot of the output directory taken before the run
+        :type snapshot: dict
+        """
+        entry_dir = path.join(self._cache_dir, key)
+        if path.isdir(entry_dir):
+            return
+        outputs = [
+            f for f in _files(output_dir) if snapshot.get(f) != _modified_time(path.join(output_dir, f))
+        ]
+        size = sum(path.getsize(path.join(output_dir, f)) for f in outputs)
+        if self._max_size is not None and size > self._max_size:
+            LOGGER.debug('Not caching outputs of %s, which are larger than the cache', output_dir)
+            return
+        temp_dir = '{}.{}.tmp'.format(entry_dir, os.getpid())
+        os.makedirs(temp_dir, exist_ok=True)
+        for file_path in outputs:
+            cached_file = path.join(temp_dir, file_path)
+            os.makedirs(path.dirname(cached_file), exist_ok=True)
+            shutil.copy2(path.join(output_dir, file_path), cached_file)
+            os.chmod(cached_file, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        try:
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            # Another process has stored the same outputs
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+        self._load_entries()[key] = (time.time(), size)
+        self._evict()
+
+    def _restore_file(self, source, destination):
+        os.makedirs(path.dirname(destination), exist_ok=True)
+        if path.lexists(destination):
+            os.remove(destination)
+        if self._link:
+            try:
+                os.link(source, destination)
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, destination)
+
+    def _load_entries(self):
+        if self._entries is None:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            self._entries = {}
+            for key in os.listdir(self._cache_dir):
+                entry_dir = path.join(self._cache_dir, key)
+                if path.isdir(entry_dir) and not key.endswith('.tmp'):
+                    size = sum(path.getsize(path.join(entry_dir, f)) for f in _files(entry_dir))
+                    self._entries[key] = (path.getmtime(entry_dir), size)
+        return self._entries
+
+    def _evict(self):
+        if self._max_size is None:
+            return
+        entries = self._load_entries()
+        total_size = sum(size for _, size in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k][0]):
+            if total_size <= self._max_size:
+                break
+            LOGGER.debug('Evicting %s from result cache', key)
+            shutil.rmtree(path.join(self._cache_dir, key), ignore_errors=True)
+            total_size -= entries.pop(key)[1]
+
+    @staticmethod
+    def active():
+        """Gets the active cache, if any
+
+        :returns: The innermost active cache, or ``None``
+        :rtype: :class:`ResultCache`
+        """
+        return _ACTIVE_CACHES[-1] if _ACTIVE_CACHES else None
+
+    def __enter__(self):
+        _ACTIVE_CACHES.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _ACTIVE_CACHES.remove(self)
+
+class ResultCacheEntry:
+    """The entry in a :class:`ResultCache` for a single run
+    """
+    def __init__(self, cache, key, output_dir):
+        """Initialises the :class:`ResultCacheEntry`
+
+        :param cache: The cache
+        :type cache: :class:`ResultCache`
+        :param key: The cache key of the run
+        :type key: str
+        :param output_dir: The output directory of the run
+        :type output_dir: path-like
+        """
+        self._cache = cache
+        self._key = key
+        self._output_dir = output_dir
+        self._snapshot = None
+
+    @property
+    def key(self):
+        """The cache key of the run
+        """
+        return self._key
+
+    def restore(self):
+        """Restores the outputs of the run from the cache, if they are cached
+
+        If they are not, a snapshot of the output directory is taken so that the outputs can be stored after the run.
+
+        :returns: ``True`` if the outputs were restored; otherwise ``False``
+        :rtype: bool
+        """
+        if self._cache.restore(self._key, self._output_dir):
+            return True
+        self._snapshot = self._cache.snapshot(self._output_dir)
+        return False
+
+    def store(self):
+        """Stores the outputs of the run, which must have succeeded, in the cache
+        """
+        self._cache.store(self._key, self._output_dir, self._snapshot or {})
+
+def _files(directory):
+    return [
+        path.relpath(path.join(dir_path, f), directory)
+        for dir_path, _, file_names in os.walk(directory) for f in file_names
+    ]
+
+def _modified_time(file_path):
+    file_stat = os.stat(file_path)
+    return file_stat.st_mtime_ns, file_stat.st_size
@@ -0,0 +1,216 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Implementation of the :class:`StateDatabase`
+"""
+import os
+from os import path
+import sqlite3
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+DATABASE_FILE_NAME = 'spawn.state.db'
+
+_COLUMNS = ('id', 'result', 'returncode', 'start_time', 'end_time', 'input_hash')
+
+_ACTIVE_DATABASES = []
+
+class StateDatabase:
+    """Store of run states in a single SQLite database, used in place of a state file per run
+
+    States are recorded against the ID of the run. Writes are batched into a single transaction
+    every ``batch_size`` records, and whenever the database is read, flushed or closed. A process forked
+    after the database was opened (e.g. a luigi worker process) discards the states read and the records
+    pending in its parent, which remain the parent's to write, and commits its own writes immediately,
+    because such processes may exit without flushing.
+
+    The database is used by :class:`ProcessRunner` while it is active, i.e. inside a ``with`` block::
+
+        with StateDatabase.in_directory(outdir):
+            ...
+    """
+    def __init__(self, db_path, batch_size=1000):
+        """Initialises the :class:`StateDatabase`
+
+        :param db_path: The path to the database file. Created if it does not exist.
+        :type db_path: path-like
+        :param batch_size: The number of records written in each transaction
+        :type batch_size: int
+        """
+        self._db_path = db_path
+        self._batch_size = batch_size
+        self._pending = []
+        self._states = None
+        self._pid = None
+        self._local_pid = os.getpid()
+        self._connection = None
+
+    @classmethod
+    def in_directory(cls, directory, **kwargs):
+        """Creates a :class:`StateDatabase` using the database file in the given directory
+
+        :param directory: The directory containing the database file
+        :type directory: path-like
+
+        :returns: The state database
+        :rtype: :class:`StateDatabase`
+        """
+        return cls(path.join(directory, DATABASE_FILE_NAME), **kwargs)
+
+    def record(self, id_, result, returncode, *, start_time=None, end_time=None, input_hash=None):
+        """Records the state of a run
+
+        :param id_: The ID of the run
+        :type id_: str
+        :param result: The result of the run
+        :type result: str
+        :param returncode: The return code of the run
+        :type returncode: int
+        :param start_time: The time at which the run started, in seconds since the epoch
+        :type start_time: float
+        :param end_time: The time at which the run ended, in seconds since the epoch
+        :type end_time: float
+        :param input_hash: The hash of the inputs of the run, if known
+        :type input_hash: str
+        """
+        self._discard_if_forked()
+        self._pending.append((id_, result, returncode, start_time, end_time, input_hash))
+        if self._states is not None:
+            self._states[id_] = {'result': result, 'input_hash': input_hash}
+        if len(self._pending) >= self._batch_size or self._pid not in (None, os.getpid()):
+            self.flush()
+
+    def state(self, id_):
+        """Gets the result and input hash of a run
+
+        The results and input hashes of all runs are read from the database the first time this is called.
+        Runs that were not recorded then are looked up in the database again, because they may since have
+        been recorded by another process.
+
+        :param id_: The ID of the run
+        :type id_: str
+
+        :returns: A dict with keys ``result`` and ``input_hash``, or ``None`` if no state has been recorded for the run
+        :rtype: dict
+        """
+        self._discard_if_forked()
+        if self._states is None:
+            self._states = {
+                state['id']: {'result': state['result'], 'input_hash': state['input_hash']} for state in self.states()
+            }
+        elif id_ not in self._states:
+            self.flush()
+            row = self._connect().execute('SELECT result, input_hash FROM states WHERE id = ?', (id_,)).fetchone()
+            if row is not None:
+                self._states[id_] = {'result': row[0], 'input_hash': row[1]}
+        return self._states.get(id_)
+
+    def result(self, id_):
+        """Gets the result of a run
+
+        :param id_: The ID of the run
+        :type id_: str
+
+        :returns: The result of the run, or ``None`` if no state has been recorded for it
+        :rtype: str
+        """
+        state = self.state(id_)
+        return state['result'] if state is not None else None
+
+    def states(self):
+        """Gets the recorded states of all runs
+
+        :returns: A list containing a dict for each run, with keys
+            ``id``, ``result``, ``returncode``, ``start_time``, ``end_time`` and ``input_hash``
+        :rtype: list
+        """
+        self.flush()
+        rows = self._connect().execute('SELECT {} FROM states ORDER BY id'.format(', '.join(_COLUMNS)))
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def summary(self):
+        """Gets the number of runs with each result
+
+        :returns: A dict of the number of runs keyed by result
+        :rtype: dict
+        """
+        self.flush()
+        rows = self._connect().execute('SELECT result, COUNT(*) FROM states GROUP BY result ORDER BY result')
+        return dict(rows)
+
+    def flush(self):
+        """Writes any pending records to the database
+        """
+        self._discard_if_forked()
+        if self._pending:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO states ({}) VALUES (?, ?, ?, ?, ?, ?)'.format(', '.join(_COLUMNS)),
+                    self._pending
+                )
+            LOGGER.debug('Wrote %d run states to %s', len(self._pending), self._db_path)
+            self._pending = []
+
+    def close(self):
+        """Writes any pending records and closes the database
+        """
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+
+    def _discard_if_forked(self):
+        # A forked process inherits the states, pending records and connection of its parent. The pending records
+        # are written by the parent, the states may be stale, and SQLite connections must not be shared with
+        # forked processes, so the child starts afresh
+        if self._local_pid != os.getpid():
+            LOGGER.debug('Discarding state database snapshot inherited from process %d', self._local_pid)
+            self._local_pid = os.getpid()
+            self._states = None
+            self._pending = []
+            self._connection = None
+
+    def _connect(self):
+        self._discard_if_forked()
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._db_path, timeout=60)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS states (id TEXT PRIMARY KEY, result TEXT, returncode INTEGER, '
+                'start_time REAL, end_time REAL, input_hash TEXT)'
+            )
+            if self._pid is None:
+                self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def active():
+        """Gets the active database, if any
+
+        :returns: The innermost active database, or ``None``
+        :rtype: :class:`StateDatabase`
+        """
+        return _ACTIVE_DATABASES[-1] if _ACTIVE_DATABASES else None
+
+    def __enter__(self):
+        self._connect()
+        _ACTIVE_DATABASES.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _ACTIVE_DATABASES.remove(self)
+        self.close()
@@ -0,0 +1,166 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Implementation of the :class:`StateFileIndex`
+"""
+import os
+import json
+import logging
+from os import path, walk
+
+LOGGER = logging.getLogger(__name__)
+
+STATE_FILE_EXTENSION = '.state.json'
+
+_ACTIVE_INDICES = []
+
+class StateFileIndex:
+    """In-memory index of the run state files beneath a directory
+
+    The directory is scanned once, when the index is first queried, so that runs that have no
+    state file are known to be incomplete without probing the file system for each one. Each
+    state file that does exist is read at most once.
+
+    The index is used by :meth:`ProcessRunner.complete` while it is active, i.e. inside a
+    ``with`` block::
+
+        with StateFileIndex(outdir):
+            ...
+
+    It reflects the state files written by runners in this process while it is active, but not
+    those written by other processes, so :meth:`refresh` should be called once other processes may
+    have written state files, e.g. after each scheduling pass. Processes forked while it is active
+    (e.g. luigi worker processes) do not use it, and read the state files directly.
+    """
+    def __init__(self, root_dir):
+        """Initialises the :class:`StateFileIndex`
+
+        :param root_dir: The directory containing the state files
+        :type root_dir: path-like
+        """
+        self._root_dir = path.abspath(root_dir)
+        self._state_files = None
+        self._states = {}
+        self._missing = set()
+        self._pid = None
+
+    def covers(self, state_file):
+        """Determine if the state file is beneath the indexed directory
+
+        :param state_file: The path to the state file
+        :type state_file: path-like
+
+        :returns: ``True`` if the state file is beneath the indexed directory; otherwise ``False``
+        :rtype: bool
+        """
+        return path.abspath(state_file).startswith(path.join(self._root_dir, ''))
+
+    def in_current_process(self):
+        """Determine if the index was entered in the current process
+
+        An index inherited by a forked process does not see the state files written since the fork.
+
+        :returns: ``True`` if the index was entered in the current process; otherwise ``False``
+        :rtype: bool
+        """
+        return self._pid == os.getpid()
+
+    def state(self, state_file):
+        """Gets the state recorded in the state file
+
+        :param state_file: The path to the state file
+        :type state_file: path-like
+
+        :returns: The state recorded in the state file, or ``None`` if there is no state file
+        :rtype: dict
+        """
+        state_file = path.abspath(state_file)
+        if state_file not in self._states:
+            if state_file in self._scan():
+                with open(state_file) as fp:
+                    self._states[state_file] = json.load(fp)
+            else:
+                self._states[state_file] = None
+                self._missing.add(state_file)
+        return self._states[state_file]
+
+    def result(self, state_file):
+        """Gets the result recorded in the state file
+
+        :param state_file: The path to the state file
+        :type state_file: path-like
+
+        :returns: The result recorded in the state file, or ``None`` if there is no state file
+        :rtype: str
+        """
+        state = self.state(state_file)
+        return state['result'] if state is not None else None
+
+    def record(self, state_file, state):
+        """Records the state of a run that has just written its state file
+
+        :param state_file: The path to the state file
+        :type state_file: path-like
+        :param state: The state written to the state file
+        :type state: dict
+        """
+        self._states[path.abspath(state_file)] = state
+
+    def refresh(self):
+        """Looks again for the state files of runs that had none when last queried, which may since
+        have been written by other processes
+
+        Only those runs are checked, rather than scanning the directory again.
+        """
+        for state_file in self._missing:
+            if self._states.get(state_file, False) is None:
+                del self._states[state_file]
+                if path.isfile(state_file):
+                    self._scan().add(state_file)
+        self._missing = set()
+
+    def _scan(self):
+        if self._state_files is None:
+            self._state_files = {
+                path.join(dir_path, f)
+                for dir_path, _, file_names in walk(self._root_dir)
+                for f in file_names if f.endswith(STATE_FILE_EXTENSION)
+            }
+            LOGGER.debug('Found %d state files in %s', len(self._state_files), self._root_dir)
+        return self._state_files
+
+    @staticmethod
+    def active(state_file):
+        """Gets the active index that covers the state file, if any
+
+        :param state_file: The path to the state file
+        :type state_file: path-like
+
+        :returns: The active index covering the state file, or ``None``
+        :rtype: :class:`StateFileIndex`
+        """
+        for index in reversed(_ACTIVE_INDICES):
+            if index.in_current_process() and index.covers(state_file):
+                return index
+        return None
+
+    def __enter__(self):
+        self._pid = os.getpid()
+        _ACTIVE_INDICES.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _ACTIVE_INDICES.remove(self)
@@ -19,3 +19,11 @@
 A scheduler understands how to turn a spec into a list of jobs and related dependncies to run
 """
 from .luigi import LuigiScheduler
+from .asyncio import AsyncioScheduler
+from .pool import LocalPoolScheduler
+
+SCHEDULERS = {
+    'luigi': LuigiScheduler,
+    'asyncio': AsyncioScheduler,
+    'pool': LocalPoolScheduler
+}
@@ -0,0 +1,147 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+""":mod:`spawn` scheduler running tasks in an :mod:`asyncio` event loop
+"""
+import asyncio
+import logging
+from contextlib import ExitStack
+from itertools import islice
+
+from luigi.task import flatten
+
+from spawn.tasks import SpawnTask
+from spawn.tasks.generate import iter_tasks_from_spec
+
+from .stores import RunStores
+
+LOGGER = logging.getLogger(__name__)
+
+_GENERATION_BATCH_SIZE = 100
+
+class AsyncioScheduler:
+    """Scheduler implementation that runs tasks on the local machine in an :mod:`asyncio` event loop
+
+    Tasks are run as soon as their dependencies have completed, with at most ``workers`` running
+    at once. Tasks deriving from :class:`SpawnTask` are run via their ``run_async`` coroutine, so that
+    simulations are run as :mod:`asyncio` subprocesses without a thread or process per task.
+    """
+    def __init__(self, config):
+        """Initialise the :class:`AsyncioScheduler`
+
+        :param config: Configuration object
+        :type config: :class:`ConfigurationBase`
+
+        Config Values
+        =============
+        workers             The maximum number of tasks to run concurrently (int)
+        outdir              The output directory (path-like)
+        generation_processes
+                            The number of processes used to generate the tasks (int)
+        state_database      ``True`` to record run states in a single database in the output directory,
+                            rather than a state file per run (bool)
+        result_cache        Directory of a cache of run outputs, from which runs with identical input files
+                            and executables are restored rather than run. No cache is used if not set. (path-like)
+        result_cache_size   The maximum size of the result cache in bytes, or 0 for no limit (int)
+        """
+        self._workers = config.get(config.default_category, 'workers', parameter_type=int)
+        self._out_dir = config.get(config.default_category, 'outdir')
+        self._generation_processes = config.get(
+            config.default_category, 'generation_processes', parameter_type=int, default=1
+        )
+        self._stores = RunStores.from_config(config)
+
+    def run(self, spawner, spec, manifest=None):
+        """Run the spec by generating tasks using the spawner
+
+        :param spawner: The task spawner
+        :type spawner: :class:`TaskSpawner`
+        :param spec: The specification
+        :type spec: :class:`SpecificationModel`
+        :param manifest: If given, the manifest in which to record the input hashes of the tasks,
+                         and against which unchanged inputs are detected
+        :type manifest: :class:`InputManifest`
+        """
+        tasks = iter_tasks_from_spec(
+            spawner, spec.root_node, self._out_dir, processes=self._generation_processes,
+            manifest=manifest, aliases=spec.aliases
+        )
+        loop = asyncio.new_event_loop()
+        try:
+            with ExitStack() as stack:
+                self._stores.enter(stack)
+                success = loop.run_until_complete(self._run_tasks(tasks))
+        finally:
+            loop.close()
+        if not success:
+            LOGGER.error('Error running spawn tasks - see logs for details')
+
+    def add_worker(self):
+        """Add a worker. Not supported by this scheduler, which only runs tasks in-process.
+        """
+        raise NotImplementedError('{} does not support adding workers'.format(type(self).__name__))
+
+    async def _run_tasks(self, tasks):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self._workers)
+        scheduled = {}
+        def _schedule(task):
+            if task.task_id not in scheduled:
+                dependencies = [_schedule(d) for d in flatten(task.requires())]
+                scheduled[task.task_id] = asyncio.ensure_future(self._run_task(task, dependencies, semaphore))
+            return scheduled[task.task_id]
+        while True:
+            # Generate tasks off the event loop, so that tasks already scheduled keep running
+            batch = await loop.run_in_executor(None, _take, tasks, _GENERATION_BATCH_SIZE)
+            if not batch:
+                break
+            for task in batch:
+                _schedule(task)
+        results = await asyncio.gather(*scheduled.values())
+        return all(results)
+
+    async def _run_task(self, task, dependencies, semaphore):
+        if not all(await asyncio.gather(*dependencies)):
+            LOGGER.error('Not running %s because one or more of its dependencies failed', task.task_id)
+            return False
+        try:
+            if task.complete():
+                return True
+            async with semaphore:
+                LOGGER.info('Running %s', task.task_id)
+                error = await self._execute(task)
+        #pylint: disable=broad-except
+        except Exception as e:
+            error = task.on_failure(e)
+        if error is not None:
+            LOGGER.error('Task %s failed:\n%s', task.task_id, error)
+            return False
+        return True
+
+    async def _execute(self, task):
+        """Runs the task, raising if it fails
+
+        :returns: ``None`` if the task succeeded; otherwise a description of the failure
+        :rtype: str
+        """
+        if isinstance(task, SpawnTask):
+            await task.run_async()
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, task.run)
+        return None
+
+def _take(iterator, count):
+    return list(islice(iterator, count))
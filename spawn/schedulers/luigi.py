@@ -17,10 +17,16 @@
 """:mod:`spawn` scheduler for luigi
 """
 import logging
+from contextlib import ExitStack
+from queue import Queue
+from threading import Thread
 
 from luigi import build, worker, rpc, scheduler, execution_summary
+from luigi.task_register import Register
 
-from spawn.tasks.generate import generate_tasks_from_spec
+from spawn.tasks.generate import iter_tasks_from_spec
+
+from .stores import RunStores
 
 LOGGER = logging.getLogger()
 
@@ -72,30 +78,95 @@ class LuigiScheduler:
         outdir              The output directory (path-like)
         local               ``True`` if running locally; otherwise, ``False``. (bool)
         port                The port on which the remote scheduler is running, if ``local`` is ``False``. (int)
+        generation_processes
+                            The number of processes used to generate the tasks (int)
+        batch_size          If greater than 0, tasks are submitted to luigi in batches of this size
+                            as they are generated, rather than once all tasks are generated (int)
+        state_database      ``True`` to record run states in a single database in the output directory,
+                            rather than a state file per run (bool)
+        result_cache        Directory of a cache of run outputs, from which runs with identical input files
+                            and executables are restored rather than run. No cache is used if not set. (path-like)
+        result_cache_size   The maximum size of the result cache in bytes, or 0 for no limit (int)
         """
         self._workers = config.get(config.default_category, 'workers')
         self._out_dir = config.get(config.default_category, 'outdir')
         self._local = config.get(config.default_category, 'local', parameter_type=bool)
         self._host = config.get('server', 'host')
         self._port = config.get('server', 'port', parameter_type=int)
+        self._generation_processes = config.get(
+            config.default_category, 'generation_processes', parameter_type=int, default=1
+        )
+        self._batch_size = config.get(config.default_category, 'batch_size', parameter_type=int, default=0)
+        self._stores = RunStores.from_config(config)
         self._worker_scheduler_factory = _LuigiWorkerSchedulerFactory()
 
-    def run(self, spawner, spec):
+    def run(self, spawner, spec, manifest=None):
         """Run the spec by generating tasks using the spawner
 
         :param spawner: The task spawner
         :type spawner: :class:`TaskSpawner`
         :param spec: The specification
         :type spec: :class:`SpecificationModel`
+        :param manifest: If given, the manifest in which to record the input hashes of the tasks,
+                         and against which unchanged inputs are detected
+        :type manifest: :class:`InputManifest`
         """
-        tasks = generate_tasks_from_spec(spawner, spec.root_node, self._out_dir)
-        success = build(
+        tasks = iter_tasks_from_spec(
+            spawner, spec.root_node, self._out_dir, processes=self._generation_processes,
+            manifest=manifest, aliases=spec.aliases
+        )
+        with ExitStack() as stack:
+            # Scan the output directory once, rather than probing a state file each time luigi checks a task.
+            # Tasks run on a remote scheduler's workers are checked by those workers, so have no use for the index
+            index = self._stores.enter(stack, index=self._local)
+            if self._batch_size > 0:
+                success = True
+                for batch in self._batches(tasks):
+                    success = self._build(batch) and success
+                    # Worker processes may have written state files that later batches depend on
+                    if index is not None:
+                        index.refresh()
+                    # Let luigi drop the completed tasks, so memory doesn't grow with the number of batches
+                    Register.clear_instance_cache()
+            else:
+                success = self._build(list(tasks))
+        if not success:
+            LOGGER.error('Error running spawn tasks - see logs for details')
+
+    def _build(self, tasks):
+        return build(
             tasks, worker_scheduler_factory=self._worker_scheduler_factory,
             local_scheduler=self._local, workers=self._workers,
             scheduler_port=self._port, scheduler_host=self._host
         )
-        if not success:
-            LOGGER.error('Error running spawn tasks - see logs for details')
+
+    def _batches(self, tasks):
+        """Generates the tasks on a background thread, yielding batches of them as they become available
+        """
+        queue = Queue(maxsize=2)
+        def _produce():
+            try:
+                batch = []
+                for task in tasks:
+                    batch.append(task)
+                    if len(batch) >= self._batch_size:
+                        queue.put(batch)
+                        batch = []
+                if batch:
+                    queue.put(batch)
+            #pylint: disable=broad-except
+            except Exception as e:
+                queue.put(e)
+            finally:
+                queue.put(None)
+        Thread(target=_produce, daemon=True).start()
+        while True:
+            batch = queue.get()
+            if batch is None:
+                return
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
 
     def add_worker(self):
         """Add a worker
@@ -0,0 +1,97 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+""":mod:`spawn` scheduler running tasks in a pool of long-lived local worker processes
+"""
+import asyncio
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+
+from .asyncio import AsyncioScheduler
+
+# Stores used by the runners in a worker process, kept active for the life of the process
+_WORKER_STORES = ExitStack()
+
+class LocalPoolScheduler(AsyncioScheduler):
+    """Scheduler implementation that runs tasks in a persistent pool of ``workers`` local processes
+
+    Dependencies are resolved in the parent process as for :class:`AsyncioScheduler`. Each task that is
+    ready to run is sent to the pool as a compact descriptor (its class and string parameters), and the
+    worker sends back only a status record. Worker processes are started once, so there is no fork or
+    import cost per task, and idle workers take the next ready task from the pool's shared queue, so
+    all workers stay busy however much task durations vary. Each worker opens its own state database,
+    result cache and state file index, as the parent's are not shared with processes that are not forked.
+    """
+    def __init__(self, config):
+        """Initialise the :class:`LocalPoolScheduler`
+
+        :param config: Configuration object
+        :type config: :class:`ConfigurationBase`
+
+        Config Values
+        =============
+        workers             The number of worker processes (int)
+        outdir              The output directory (path-like)
+        generation_processes
+                            The number of processes used to generate the tasks (int)
+        state_database      ``True`` to record run states in a single database in the output directory,
+                            rather than a state file per run (bool)
+        result_cache        Directory of a cache of run outputs, from which runs with identical input files
+                            and executables are restored rather than run. No cache is used if not set. (path-like)
+        result_cache_size   The maximum size of the result cache in bytes, or 0 for no limit (int)
+        """
+        super().__init__(config)
+        self._executor = None
+
+    def run(self, spawner, spec, manifest=None):
+        """Run the spec by generating tasks using the spawner
+
+        :param spawner: The task spawner
+        :type spawner: :class:`TaskSpawner`
+        :param spec: The specification
+        :type spec: :class:`SpecificationModel`
+        :param manifest: If given, the manifest in which to record the input hashes of the tasks,
+                         and against which unchanged inputs are detected
+        :type manifest: :class:`InputManifest`
+        """
+        with ProcessPoolExecutor(self._workers, initializer=_initialise_worker, initargs=(self._stores,)) as executor:
+            self._executor = executor
+            try:
+                super().run(spawner, spec, manifest)
+            finally:
+                self._executor = None
+
+    def add_worker(self):
+        """Add a worker. Not supported by this scheduler, whose pool of workers is fixed for each run.
+        """
+        raise NotImplementedError('{} does not support adding workers'.format(type(self).__name__))
+
+    async def _execute(self, task):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _run_task, type(task), task.to_str_params()
+        )
+
+def _initialise_worker(stores):
+    stores.enter(_WORKER_STORES, worker=True)
+
+def _run_task(task_type, params):
+    task = task_type.from_str_params(params)
+    try:
+        task.run()
+    #pylint: disable=broad-except
+    except Exception as e:
+        return task.on_failure(e)
+    return None
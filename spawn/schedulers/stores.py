@@ -0,0 +1,92 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Stores of run states and outputs shared by the :mod:`spawn` schedulers
+"""
+from spawn.runners import StateFileIndex, StateDatabase, ResultCache
+
+class RunStores:
+    """The stores that the runners use while a scheduler runs tasks
+
+    These are the optional :class:`StateDatabase` and :class:`ResultCache`, and the :class:`StateFileIndex`
+    of the output directory, each of which is used by the runners while it is active.
+    """
+    def __init__(self, out_dir, state_database=False, result_cache=None, result_cache_size=0):
+        """Initialises :class:`RunStores`
+
+        :param out_dir: The output directory
+        :type out_dir: path-like
+        :param state_database: ``True`` to record run states in a single database in the output directory,
+                               rather than a state file per run
+        :type state_database: bool
+        :param result_cache: Directory of a cache of run outputs, or ``None`` for no cache
+        :type result_cache: path-like
+        :param result_cache_size: The maximum size of the result cache in bytes, or 0 for no limit
+        :type result_cache_size: int
+        """
+        self._out_dir = out_dir
+        self._state_database = state_database
+        self._result_cache = result_cache
+        self._result_cache_size = result_cache_size
+
+    @classmethod
+    def from_config(cls, config):
+        """Creates :class:`RunStores` from the configuration
+
+        :param config: Configuration object
+        :type config: :class:`ConfigurationBase`
+
+        Config Values
+        =============
+        outdir              The output directory (path-like)
+        state_database      ``True`` to record run states in a single database in the output directory,
+                            rather than a state file per run (bool)
+        result_cache        Directory of a cache of run outputs, from which runs with identical input files
+                            and executables are restored rather than run. No cache is used if not set. (path-like)
+        result_cache_size   The maximum size of the result cache in bytes, or 0 for no limit (int)
+
+        :returns: The stores
+        :rtype: :class:`RunStores`
+        """
+        return cls(
+            config.get(config.default_category, 'outdir'),
+            state_database=config.get(config.default_category, 'state_database', parameter_type=bool, default=False),
+            result_cache=config.get(config.default_category, 'result_cache'),
+            result_cache_size=config.get(config.default_category, 'result_cache_size', parameter_type=int, default=0)
+        )
+
+    def enter(self, stack, index=True, worker=False):
+        """Activates the stores until the exit stack is closed
+
+        :param stack: The exit stack
+        :type stack: :class:`contextlib.ExitStack`
+        :param index: ``True`` to index the state files in the output directory; otherwise ``False``
+        :type index: bool
+        :param worker: ``True`` if the stores are used by a worker process, which may exit without flushing,
+                       so that each run state is committed as it is recorded
+        :type worker: bool
+
+        :returns: The state file index, if the state files are indexed; otherwise ``None``
+        :rtype: :class:`StateFileIndex`
+        """
+        if self._state_database:
+            if worker:
+                stack.enter_context(StateDatabase.in_directory(self._out_dir, batch_size=1))
+            else:
+                stack.enter_context(StateDatabase.in_directory(self._out_dir))
+        if self._result_cache:
+            stack.enter_context(ResultCache(self._result_cache, max_size=self._result_cache_size or None))
+        return stack.enter_context(StateFileIndex(self._out_dir)) if index else None
@@ -18,8 +18,16 @@
 import json
 import copy
 
+from spawn.util.hash import json_fingerprint, json_digest, dict_digest
+
 from .simulation_input import SimulationInput
 
+# Options of json.dumps that the spliced serialisation in JsonSimulationInput reproduces
+_SPLICEABLE_OPTIONS = {'indent', 'separators', 'sort_keys', 'ensure_ascii', 'allow_nan'}
+
+class _NotSpliceable(Exception):
+    pass
+
 
 class JsonSimulationInputView(SimulationInput):
     """A dictionary input written as a JSON file where the parameter set is not deep-copied"""
@@ -43,7 +51,7 @@ class JsonSimulationInputView(SimulationInput):
             json.dump(self._parameter_set, fw, **self._write_options)
 
     def hash(self):
-        return hash(json.dumps(self._parameter_set))
+        return json_fingerprint(self._parameter_set)
 
     def __setitem__(self, key, value):
         self._parameter_set.__setitem__(key, value)
@@ -56,7 +64,19 @@ class JsonSimulationInputView(SimulationInput):
 
 
 class JsonSimulationInput(JsonSimulationInputView):
-    """A dictionary input written as a JSON file where the parameter set is deep copied"""
+    """A dictionary input written as a JSON file where the parameter set is deep copied
+
+    Branches share the (deep copied) baseline parameter set, and each records only the
+    parameters set on it, keyed by their path. The full document is only assembled when
+    it is written or hashed, and its serialisation is kept until the input is next changed,
+    so that writing an input more than once serialises it only once.
+
+    The serialisation is spliced together from the overridden values and fragments of the
+    baseline, which are serialised once and shared by all branches. The result is identical
+    to that of :func:`json.dumps` with the same write options. Likewise, the hash is a
+    :func:`json_fingerprint` formed from the digests of the overridden values and of the
+    baseline values around them, which are computed once and shared by all branches.
+    """
 
     # pylint: disable=super-init-not-called
     def __init__(self, parameter_set, **write_options):
@@ -66,4 +86,214 @@ class JsonSimulationInput(JsonSimulationInputView):
         :type parameter_set: dict
         """
         self._parameter_set = copy.deepcopy(parameter_set)
+        self._overrides = {}
         self._write_options = write_options
+        self._serialised = None
+        self._fingerprint = None
+        self._fragments = {} if set(write_options) <= _SPLICEABLE_OPTIONS else None
+        self._digests = {}
+
+    def to_file(self, file_path):
+        with open(file_path, 'w') as fw:
+            fw.write(self._serialise())
+
+    def hash(self):
+        if self._fingerprint is None:
+            document, copied = self._materialise_with_copies()
+            self._fingerprint = self._digest(document, (), copied).hex()
+        return self._fingerprint
+
+    def _digest(self, value, key_path, copied):
+        if id(value) in copied:
+            return dict_digest((k, self._digest(v, key_path + (k,), copied)) for k, v in value.items())
+        if not self._is_baseline(key_path):
+            return json_digest(value)
+        digest = self._digests.get(key_path)
+        if digest is None:
+            digest = self._digests[key_path] = json_digest(value)
+        return digest
+
+    def _serialise(self):
+        if self._serialised is None:
+            document, copied = self._materialise_with_copies()
+            if self._fragments is not None:
+                try:
+                    self._serialised = _Splicer(self, copied).dict(document, ())
+                except _NotSpliceable:
+                    self._fragments = None
+            if self._serialised is None:
+                self._serialised = json.dumps(document, **self._write_options)
+        return self._serialised
+
+    def branch(self):
+        return self._with_overrides(self, copy.deepcopy(self._overrides))
+
+    @classmethod
+    def _with_overrides(cls, baseline, overrides):
+        """Creates an input that shares the baseline parameter set, write options and caches of another input,
+        with overrides of its own
+        """
+        simulation_input = cls.__new__(cls)
+        vars(simulation_input).update(vars(baseline))
+        simulation_input._overrides = overrides
+        return simulation_input
+
+    def __setitem__(self, key, value):
+        self._set((key,), value)
+
+    def __getitem__(self, item):
+        return self._get((item,))
+
+    def _set(self, key_path, value):
+        self._changed()
+        length = len(key_path)
+        for overridden in [k for k in self._overrides if len(k) > length and k[:length] == key_path]:
+            del self._overrides[overridden]
+        self._overrides[key_path] = value
+
+    def _get(self, key_path):
+        obj, remaining, owned = self._parameter_set, key_path, False
+        for i in range(len(key_path), 0, -1):
+            if key_path[:i] in self._overrides:
+                obj, remaining, owned = self._overrides[key_path[:i]], key_path[i:], True
+                break
+        for key in remaining:
+            obj = obj[key]
+        if isinstance(obj, dict):
+            return _JsonSimulationInputOverlay(self, key_path)
+        if isinstance(obj, list):
+            # Lists can be modified in place, so take a copy for this branch and forget the serialisation
+            self._changed()
+            if not owned:
+                obj = copy.deepcopy(obj)
+                self._overrides[key_path] = obj
+        return obj
+
+    def _is_baseline(self, key_path):
+        """Whether the value at the key path comes from the baseline, rather than an override or a value within one
+        """
+        return not any(key_path[:i] in self._overrides for i in range(1, len(key_path) + 1))
+
+    def _changed(self):
+        self._serialised = None
+        self._fingerprint = None
+
+    def _materialise(self):
+        """Applies the overrides to shallow copies of the baseline along their paths
+        """
+        return self._materialise_with_copies()[0]
+
+    def _materialise_with_copies(self):
+        document = dict(self._parameter_set)
+        copied = {id(document)}
+        for key_path, value in self._overrides.items():
+            container = document
+            for key in key_path[:-1]:
+                child = container[key]
+                if id(child) not in copied:
+                    child = copy.copy(child)
+                    copied.add(id(child))
+                    container[key] = child
+                container = child
+            container[key_path[-1]] = value
+        return document, copied
+
+
+class _Splicer:
+    """Serialises a materialised :class:`JsonSimulationInput` as :func:`json.dumps` would
+
+    Only the dicts copied along override paths are serialised item by item; overridden values are
+    serialised whole, and any other value is taken from the input's cache of baseline fragments.
+    """
+    #pylint: disable=protected-access
+    def __init__(self, simulation_input, copied):
+        options = simulation_input._write_options
+        self._input = simulation_input
+        self._copied = copied
+        self._options = options
+        indent = options.get('indent')
+        self._indent = ' ' * indent if isinstance(indent, int) else indent
+        default_separators = (', ', ': ') if indent is None else (',', ': ')
+        self._item_separator, self._key_separator = options.get('separators') or default_separators
+        self._sort_keys = options.get('sort_keys', False)
+
+    def dict(self, obj, key_path):
+        """Serialises a dict copied along an override path
+        """
+        if not obj:
+            return '{}'
+        if self._indent is None:
+            item_separator, opening, closing = self._item_separator, '{', '}'
+        else:
+            newline = '\n' + self._indent * (len(key_path) + 1)
+            item_separator = self._item_separator + newline
+            opening, closing = '{' + newline, '\n' + self._indent * len(key_path) + '}'
+        keys = obj.keys()
+        if self._sort_keys:
+            keys = sorted(keys)
+        items = []
+        for key in keys:
+            if not isinstance(key, str):
+                raise _NotSpliceable()
+            items.append(self._key(key) + self._key_separator + self._value(obj[key], key_path + (key,)))
+        return opening + item_separator.join(items) + closing
+
+    def _key(self, key):
+        return json.dumps(key, ensure_ascii=self._options.get('ensure_ascii', True))
+
+    def _value(self, value, key_path):
+        if id(value) in self._copied:
+            return self.dict(value, key_path)
+        if not self._input._is_baseline(key_path):
+            return self._dumps(value, len(key_path))
+        fragments = self._input._fragments
+        fragment = fragments.get(key_path)
+        if fragment is None:
+            fragment = fragments[key_path] = self._dumps(value, len(key_path))
+        return fragment
+
+    def _dumps(self, value, depth):
+        serialised = json.dumps(value, **self._options)
+        if self._indent and depth:
+            # Strings are serialised with newlines escaped, so all newlines are indentation
+            serialised = serialised.replace('\n', '\n' + self._indent * depth)
+        return serialised
+
+class _JsonSimulationInputOverlay(SimulationInput):
+    """View of a nested dict in a :class:`JsonSimulationInput`, recording any changes on the input
+    """
+    #pylint: disable=protected-access
+    def __init__(self, simulation_input, key_path):
+        self._simulation_input = simulation_input
+        self._key_path = key_path
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Creates a :class:`JsonSimulationInput` by loading a file, as overlays only exist within an input
+
+        :param file_path: The file path to load
+        :type file_path: path-like
+
+        :returns: The simulation input object
+        :rtype: :class:`JsonSimulationInput`
+        """
+        return JsonSimulationInput.from_file(file_path)
+
+    def to_file(self, file_path):
+        with open(file_path, 'w') as fw:
+            json.dump(self._materialise(), fw, **self._simulation_input._write_options)
+
+    def hash(self):
+        return json_fingerprint(self._materialise())
+
+    def _materialise(self):
+        obj = self._simulation_input._materialise()
+        for key in self._key_path:
+            obj = obj[key]
+        return obj
+
+    def __setitem__(self, key, value):
+        self._simulation_input._set(self._key_path + (key,), value)
+
+    def __getitem__(self, item):
+        return self._simulation_input._get(self._key_path + (item,))
@@ -17,6 +17,7 @@
 """Abstract base class for simulation inputs
 """
 from abc import abstractmethod
+import copy
 
 
 class SimulationInput:
@@ -52,6 +53,16 @@ class SimulationInput:
         """
         raise NotImplementedError()
 
+    def branch(self):
+        """Creates a copy of this input that can be edited without affecting this one
+
+        The default implementation takes a deep copy.
+
+        :returns: The branched simulation input
+        :rtype: An instance of :class:`SimulationInput`
+        """
+        return copy.deepcopy(self)
+
     @abstractmethod
     def __setitem__(self, key, value):
         raise NotImplementedError()
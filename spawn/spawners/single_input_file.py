@@ -17,12 +17,13 @@
 """Spawner implementation that spawns :class:`SimulationTask`s taking a single input file path as its only command line
  argument"""
 from os import path, makedirs
-import copy
+import logging
 
 from ..tasks import SimulationTask
 from ..simulation_inputs import SimulationInput
 from .task_spawner import TaskSpawner
 
+LOGGER = logging.getLogger(__name__)
 
 class SingleInputFileSpawner(TaskSpawner):
     """Runs bespoke executable taking a single input file as its only command line argument"""
@@ -45,12 +46,31 @@ class SingleInputFileSpawner(TaskSpawner):
             makedirs(path_)
         input_file_path = path.join(path_, self.__dict__['__file_name'])
         self.__dict__['__simulation_input'].to_file(input_file_path)
+        return self._create_task(path_, input_file_path, metadata)
+
+    def respawn(self, path_, metadata):
+        input_file_path = path.join(path_, self.__dict__['__file_name'])
+        if not path.isfile(input_file_path):
+            return self.spawn(path_, metadata)
+        return self._create_task(path_, input_file_path, metadata)
+
+    def input_hash(self):
+        try:
+            return self.__dict__['__simulation_input'].hash()
+        except NotImplementedError:
+            # Inputs that can't be hashed are always rewritten, and are not checked for changes since their run
+            LOGGER.debug('%s cannot be hashed, so is always rewritten',
+                         type(self.__dict__['__simulation_input']).__name__)
+            return None
+
+    def _create_task(self, path_, input_file_path, metadata):
         return SimulationTask(_id=path_,
                               _input_file_path=input_file_path,
+                              _input_hash=self.input_hash() or '',
                               _metadata=metadata)
 
     def branch(self):
-        return SingleInputFileSpawner(copy.deepcopy(self.__dict__['__simulation_input']), self.__dict__['__file_name'])
+        return SingleInputFileSpawner(self.__dict__['__simulation_input'].branch(), self.__dict__['__file_name'])
 
     def __getattr__(self, item):
         if item.startswith('__') and item.endswith('__'):
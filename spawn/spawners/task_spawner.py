@@ -27,3 +27,18 @@ class TaskSpawner:
     def branch(self):
         """Deep copy task input and dependencies so that they can be edited without affecting trunk object"""
         raise NotImplementedError()
+
+    def input_hash(self):
+        """Stable hash of the inputs that :meth:`spawn` would write, or ``None`` if the spawner can't hash them
+
+        Used to skip rewriting inputs that are unchanged since a previous run.
+        """
+        #pylint: disable=no-self-use
+        return None
+
+    def respawn(self, path_, metadata):
+        """Create the task for inputs that were written at ``path_`` by a previous run and are unchanged
+
+        The default implementation spawns the task again; spawners may override it to avoid rewriting the inputs.
+        """
+        return self.spawn(path_, metadata)
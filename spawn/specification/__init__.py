@@ -22,6 +22,8 @@ from .specification import (
     SpecificationModel, SpecificationMetadata, SpecificationNode,
     ValueProxyNode, SpecificationNodeFactory
 )
+from .compact import CompactSpecificationTree
 from .converters import DictSpecificationConverter
+from .deduplication import deduplicate
 from .value_proxy import ValueProxy, Macro, evaluate
 from .evaluators import Evaluator
@@ -0,0 +1,445 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Compact, array-backed storage for evaluated specification trees
+"""
+from array import array
+
+from spawn.util import PathBuilder
+from spawn.util.validation import validate_type
+
+from .specification import SpecificationNode, IndexedNode, NodeCache
+
+_NO_PROPERTY = 0
+_PROPERTY = 1
+_INDEXED_PROPERTY = 2
+
+def _intern_key(value):
+    if isinstance(value, float):
+        return float, repr(value)
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), repr(value)
+    return type(value), value
+
+class _InternedColumn:
+    """Column of values, one for each row, in which each unique value is stored once and
+    each row holds only the integer id of its value
+    """
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+        self._row_ids = array('l')
+
+    def append(self):
+        """Adds a row, whose value is set later
+        """
+        self._row_ids.append(-1)
+
+    def set(self, row, value):
+        """Sets the value of the row, adding the value if not already present
+        """
+        key = _intern_key(value)
+        id_ = self._ids.get(key)
+        if id_ is None:
+            id_ = len(self._values)
+            self._ids[key] = id_
+            self._values.append(value)
+        self._row_ids[row] = id_
+
+    def __getitem__(self, row):
+        return self._values[self._row_ids[row]]
+
+    def __len__(self):
+        return len(self._values)
+
+class CompactSpecificationTree:
+    """Array-backed store of an evaluated specification tree
+
+    Nodes are stored as rows of parallel arrays, such that the children of any node
+    occupy a contiguous range of rows. Property names, values, path parts and ghost
+    sets are interned, so each row holds only integer ids. Nodes are accessed through
+    :class:`CompactSpecificationNode` views, which are created on demand.
+    """
+    def __init__(self):
+        """Initialises an empty :class:`CompactSpecificationTree`
+        """
+        self._parents = array('l')
+        self._first_children = array('l')
+        self._child_counts = array('l')
+        self._kinds = array('b')
+        self._array_indices = array('l')
+        self._names = _InternedColumn()
+        self._values = _InternedColumn()
+        self._path_parts = _InternedColumn()
+        self._ghost_sets = _InternedColumn()
+        self._path_suffixes = None
+        self._frame_stack = []
+        self._frame_depths = {}
+
+    @classmethod
+    def from_node(cls, root_node):
+        """Creates a compact tree from a tree of :class:`SpecificationNode`
+
+        The tree is evaluated depth-first as it is stored, and the children of each node are
+        released once they have been stored, so that the whole tree of :class:`SpecificationNode`
+        is never held in memory at once. ``root_node`` has no children afterwards.
+
+        :param root_node: The root of the tree
+        :type root_node: :class:`SpecificationNode`
+
+        :returns: The compact representation of the tree
+        :rtype: :class:`CompactSpecificationTree`
+        """
+        #pylint: disable=protected-access
+        validate_type(root_node, SpecificationNode, 'root_node')
+        tree = cls()
+        tree._add_row(-1)
+        stack = [(root_node, 0)]
+        while stack:
+            node, row = stack.pop()
+            # Getting the children evaluates the node, so its row is only filled in afterwards
+            children = node.children
+            tree._fill_row(row, node)
+            node._children = []
+            first_child = len(tree)
+            tree._first_children[row] = first_child
+            tree._child_counts[row] = len(children)
+            for _ in range(len(children)):
+                tree._add_row(row)
+            stack.extend((children[i], first_child + i) for i in reversed(range(len(children))))
+        return tree
+
+    def _add_row(self, parent_row):
+        self._parents.append(parent_row)
+        self._first_children.append(0)
+        self._child_counts.append(0)
+        self._kinds.append(_NO_PROPERTY)
+        self._array_indices.append(-1)
+        for column in (self._names, self._values, self._path_parts, self._ghost_sets):
+            column.append()
+
+    def _fill_row(self, row, node):
+        #pylint: disable=protected-access
+        if isinstance(node, IndexedNode):
+            self._kinds[row], self._array_indices[row] = _INDEXED_PROPERTY, node.index
+        elif node.has_property:
+            self._kinds[row] = _PROPERTY
+        self._names.set(row, node.property_name)
+        self._values.set(row, node.property_value)
+        self._path_parts.set(row, node._path_part)
+        self._ghost_sets.set(row, node._ghosts)
+
+    @property
+    def root(self):
+        """The root node of the tree
+
+        :returns: A view of the root node
+        :rtype: :class:`CompactSpecificationNode`
+        """
+        return self.node(0)
+
+    def node(self, row):
+        """Gets a view of the node stored at the given row
+
+        :param row: The row of the node
+        :type row: int
+
+        :returns: A view of the node
+        :rtype: :class:`CompactSpecificationNode`
+        """
+        if self._kinds[row] == _INDEXED_PROPERTY:
+            return CompactIndexedNode(self, row)
+        return CompactSpecificationNode(self, row)
+
+    def path(self, node):
+        """Gets the path of the given node, disambiguating leaves that share a base path
+
+        :param node: A view of a node in this tree
+        :type node: :class:`CompactSpecificationNode`
+
+        :returns: The path of the node
+        :rtype: str
+        """
+        #pylint: disable=protected-access
+        if self._path_suffixes is None:
+            rows_by_path = {}
+            for leaf in self.root.iter_leaves():
+                rows_by_path.setdefault(leaf._base_path, []).append(leaf._row)
+            self._path_suffixes = {
+                row: i for rows in rows_by_path.values() if len(rows) > 1 for i, row in enumerate(rows)
+            }
+        suffix = self._path_suffixes.get(node._row)
+        if suffix is None:
+            return node._base_path
+        return str(PathBuilder(node._base_path).join(PathBuilder.index(suffix, index_format='a')))
+
+    def collected_frames(self, row):
+        """Gets the (properties, indices, ghosts) collected from the node at the given row and its ancestors
+
+        These are built top-down from the frames of the parent row, with values lower down the tree
+        superceding those higher up. Only the frames of the rows from the root down to the row last
+        asked for are kept, so a depth-first walk of the tree builds each row's frames once without
+        keeping the frames of every row.
+
+        :param row: The row of the node
+        :type row: int
+
+        :returns: The collected properties, indices and ghosts
+        :rtype: tuple
+        """
+        pending = []
+        while row >= 0 and row not in self._frame_depths:
+            pending.append(row)
+            row = self._parents[row]
+        # Rows beneath the closest kept ancestor are not ancestors of this row
+        depth = self._frame_depths[row] + 1 if row >= 0 else 0
+        for kept_row, _ in self._frame_stack[depth:]:
+            del self._frame_depths[kept_row]
+        del self._frame_stack[depth:]
+        frames = self._frame_stack[-1][1] if self._frame_stack else None
+        for pending_row in reversed(pending):
+            if frames is None:
+                frames = ({}, {}, {})
+            else:
+                #pylint: disable=protected-access
+                own_frames = self.node(pending_row)._own_frames()
+                frames = tuple({**frame, **own} for frame, own in zip(frames, own_frames))
+            self._frame_depths[pending_row] = len(self._frame_stack)
+            self._frame_stack.append((pending_row, frames))
+        return frames
+
+    def iter_leaf_rows(self, row):
+        """Iterates depth-first over the rows of the leaves descended from the node at the given row
+
+        :param row: The row of the node
+        :type row: int
+
+        :returns: An iterator over the rows of the leaves
+        :rtype: iterator
+        """
+        rows = [row]
+        while rows:
+            row = rows.pop()
+            child_count = self._child_counts[row]
+            if child_count == 0:
+                yield row
+            else:
+                first_child = self._first_children[row]
+                rows.extend(reversed(range(first_child, first_child + child_count)))
+
+    def leaf_count(self, row):
+        """Gets the number of leaves descended from the node at the given row
+
+        :param row: The row of the node
+        :type row: int
+
+        :returns: The number of leaves
+        :rtype: int
+        """
+        if row == 0:
+            return sum(1 for count in self._child_counts if count == 0)
+        return sum(1 for _ in self.iter_leaf_rows(row))
+
+    def __len__(self):
+        return len(self._parents)
+
+class CompactSpecificationNode(SpecificationNode):
+    """Read-only view of a node stored in a :class:`CompactSpecificationTree`
+    """
+    #pylint: disable=super-init-not-called
+    def __init__(self, tree, row):
+        """Initialises :class:`CompactSpecificationNode`
+
+        :param tree: The tree containing the node
+        :type tree: :class:`CompactSpecificationTree`
+        :param row: The row of the node in the tree
+        :type row: int
+        """
+        self._tree = tree
+        self._row = row
+        self._cache = NodeCache()
+
+    @property
+    def parent(self):
+        """Get the parent
+
+        :returns: The parent node
+        :rtype: :class:`CompactSpecificationNode`
+        """
+        #pylint: disable=protected-access
+        parent_row = self._tree._parents[self._row]
+        return self._tree.node(parent_row) if parent_row >= 0 else None
+
+    @property
+    def children(self):
+        """Get the children of this node
+
+        :returns: Child nodes
+        :rtype: list
+        """
+        #pylint: disable=protected-access
+        first_child = self._tree._first_children[self._row]
+        return [self._tree.node(r) for r in range(first_child, first_child + self._tree._child_counts[self._row])]
+
+    def iter_leaves(self):
+        """Iterates depth-first over the leaf nodes descended from this node
+
+        Views are only created for the leaves, not for the nodes between them and this node.
+
+        :returns: An iterator over the leaf nodes
+        :rtype: iterator
+        """
+        return (self._tree.node(row) for row in self._tree.iter_leaf_rows(self._row))
+
+    def add_child(self, child):
+        """Compact trees are read-only; raises :class:`TypeError`
+        """
+        raise TypeError('Cannot add children to a compact specification tree')
+
+    @property
+    def is_root(self):
+        """Is this the root node
+
+        :returns: ``True`` if this node is the root; otherwise ``False``
+        :rtype: bool
+        """
+        return self._row == 0
+
+    @property
+    def has_property(self):
+        """Does this node have a property value
+
+        :returns: ``True`` if this node has a type that contains properties
+        :rtype: bool
+        """
+        #pylint: disable=protected-access
+        return self._tree._kinds[self._row] != _NO_PROPERTY
+
+    @property
+    def property_name(self):
+        """Gets the property name for this node
+
+        :returns: The property name
+        :rtype: str
+        """
+        #pylint: disable=protected-access
+        return self._tree._names[self._row]
+
+    @property
+    def property_value(self):
+        """Gets the property value for this node
+
+        :returns: The property value
+        :rtype: object
+        """
+        #pylint: disable=protected-access
+        return self._tree._values[self._row]
+
+    @property
+    def index(self):
+        """Gets the index of this node in the parent's child nodes
+
+        :returns: The index if this node is not a root node; otherwise -1
+        :rtype: int
+        """
+        #pylint: disable=protected-access
+        parent_row = self._tree._parents[self._row]
+        if parent_row < 0:
+            return -1
+        return self._row - self._tree._first_children[parent_row]
+
+    @property
+    def root(self):
+        """Gets the root node from this node
+
+        :returns: The root node
+        :rtype: :class:`CompactSpecificationNode`
+        """
+        return self._tree.root
+
+    @property
+    def path(self):
+        """The path for this node.
+
+        :returns: The path for this node
+        :rtype: str
+        """
+        return self._tree.path(self)
+
+    @property
+    def _base_path(self):
+        #pylint: disable=protected-access
+        if self._cache.base_path is None:
+            path = PathBuilder()
+            row = self._row
+            while row >= 0:
+                path_part = self._tree._path_parts[row]
+                if path_part is not None:
+                    path = path.join_start(path_part)
+                row = self._tree._parents[row]
+            self._cache.base_path = str(path.format(self.collected_properties, self.collected_indices))
+        return self._cache.base_path
+
+    @property
+    def _path_part(self):
+        #pylint: disable=protected-access
+        return self._tree._path_parts[self._row]
+
+    @property
+    def _ghosts(self):
+        #pylint: disable=protected-access
+        return self._tree._ghost_sets[self._row]
+
+    def evaluate(self):
+        """Compact trees are stored already evaluated, so this does nothing
+        """
+
+    def _static_leaf_count(self):
+        return self._tree.leaf_count(self._row)
+
+    def _collected_frames(self):
+        return self._tree.collected_frames(self._row)
+
+    def _collected(self, frame_index):
+        if self.is_root:
+            return {}
+        #pylint: disable=protected-access
+        parent_row = self._tree._parents[self._row]
+        return {**self._tree.collected_frames(parent_row)[frame_index], **self._own_frames()[frame_index]}
+
+    def copy(self, new_parent):
+        """Compact trees are read-only; raises :class:`TypeError`
+        """
+        raise TypeError('Cannot copy nodes of a compact specification tree')
+
+    def __eq__(self, other):
+        #pylint: disable=protected-access
+        return isinstance(other, CompactSpecificationNode) and self._tree is other._tree and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._tree), self._row))
+
+class CompactIndexedNode(CompactSpecificationNode, IndexedNode):
+    """Read-only view of an indexed node stored in a :class:`CompactSpecificationTree`
+    """
+    @property
+    def index(self):
+        """Returns the index for this indexed property
+        """
+        #pylint: disable=protected-access
+        return self._tree._array_indices[self._row]
@@ -49,7 +49,7 @@ class DictSpecificationConverter(SpecificationConverter):
         return {
             'base_file': spec.base_file,
             'metadata': self._convert_metadata(spec.metadata),
-            'spec': sum([self._convert_node(c) for c in spec.root_node.children], [])
+            'spec': self._convert_nodes(spec.root_node.children, spec.aliases)
         }
 
     @staticmethod
@@ -60,10 +60,16 @@ class DictSpecificationConverter(SpecificationConverter):
             'notes': metadata.notes
         }
 
-    def _convert_node(self, node):
+    def _convert_nodes(self, nodes, aliases):
+        converted = []
+        for node in nodes:
+            converted.extend(self._convert_node(node, aliases))
+        return converted
+
+    def _convert_node(self, node, aliases):
         validate_type(node, SpecificationNode, 'node')
         if not node.has_property:
-            return sum([self._convert_node(c) for c in node.children], [])
+            return self._convert_nodes(node.children, aliases)
         node_dict = {
             'name': node.property_name,
             'value': node.property_value
@@ -71,13 +77,11 @@ class DictSpecificationConverter(SpecificationConverter):
         if isinstance(node, IndexedNode):
             node_dict['index'] = node.index
         if node.children:
-            children = []
-            for child_node in node.children:
-                next_children = self._convert_node(child_node)
-                children += next_children
-            node_dict['children'] = children
+            node_dict['children'] = self._convert_nodes(node.children, aliases)
         else:
             node_dict['path'] = node.path
             if node.ghosts:
                 node_dict['ghosts'] = node.ghosts
+            if node.path in aliases:
+                node_dict['alias_of'] = aliases[node.path]
         return [node_dict]
@@ -0,0 +1,80 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Detection of leaves of a specification that would spawn identical tasks
+"""
+import json
+
+from spawn.util.hash import string_hash
+from spawn.util.validation import validate_type
+
+from .specification import SpecificationModel, SpecificationNode, IndexedNode
+
+def deduplicate(spec):
+    """Finds the leaves of the spec that duplicate an earlier leaf
+
+    :param spec: The specification model
+    :type spec: :class:`SpecificationModel`
+
+    :returns: A copy of the specification model, whose aliases map the path of each duplicate leaf to the path
+              of the first leaf it duplicates
+    :rtype: :class:`SpecificationModel`
+    """
+    validate_type(spec, SpecificationModel, 'spec')
+    return SpecificationModel(
+        spec.base_file, spec.root_node, spec.metadata, aliases=find_duplicate_leaves(spec.root_node)
+    )
+
+def find_duplicate_leaves(root_node):
+    """Finds the leaves beneath the node that duplicate an earlier leaf
+
+    Leaves are duplicates if the properties assigned along their paths leave the spawner in the same
+    state, i.e. they have the same final value for each property (and each index of indexed properties).
+    Ghost parameters are not assigned to the spawner, so are ignored.
+
+    :param root_node: The root node
+    :type root_node: :class:`SpecificationNode`
+
+    :returns: A dict mapping the path of each duplicate leaf to the path of the first leaf it duplicates
+    :rtype: dict
+    """
+    validate_type(root_node, SpecificationNode, 'root_node')
+    first_paths = {}
+    aliases = {}
+    for leaf in root_node.iter_leaves():
+        fingerprint = _assignment_fingerprint(leaf)
+        first_path = first_paths.setdefault(fingerprint, leaf.path)
+        if first_path != leaf.path:
+            aliases[leaf.path] = first_path
+    return aliases
+
+def _assignment_fingerprint(leaf):
+    assignments = []
+    node = leaf
+    while node is not None and not node.is_root:
+        if node.has_property:
+            assignments.append((node.property_name, node.index if isinstance(node, IndexedNode) else None,
+                                node.property_value))
+        node = node.parent
+    state = {}
+    for name, index, value in reversed(assignments):
+        if index is None:
+            # Assigning the whole property replaces any values assigned to its indices
+            for key in [k for k in state if k[0] == name]:
+                del state[key]
+        state[(name, index)] = value
+    canonical = sorted(json.dumps([name, index, value], default=repr) for (name, index), value in state.items())
+    return string_hash(json.dumps(canonical))
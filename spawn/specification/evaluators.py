@@ -18,16 +18,43 @@
 """
 from abc import abstractmethod
 import inspect
+import math
 
 from spawn.errors import EvaluatorTypeError, ParameterNotFoundError, EvaluatorParameterNotFoundError
 
-from .value_proxy import ValueProxy, evaluate
+from .value_proxy import ValueProxy, Macro, evaluate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#: The default maximum number of values produced by a range evaluator
+RANGE_LIMIT = 10000
+
+_NUMBER_TYPES = (int, float)
 
 class Evaluator(ValueProxy):
     """Evaluator base class implementation of :class:`ValueProxy`
 
     Implements the :meth:`evaluate` method of the parent class to expand any arguments
+
+    The calling convention of :meth:`_evaluate` is determined once for each derived class, when it is created.
     """
+    _evaluate_accepts_kwargs = False
+    _evaluate_parameter_names = []
+    # Whether _evaluate gives the same results when called with numpy arrays in place of numbers
+    _elementwise = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        parameters = list(inspect.signature(cls._evaluate).parameters.values())[1:]    # (skip self)
+        cls._evaluate_accepts_kwargs = any(p.name == 'kwargs' for p in parameters)
+        cls._evaluate_parameter_names = [
+            p.name for p in parameters
+            if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        ]
+
     def __init__(self, *args, name=None):
         """Initialises the :class:`Evaluator`
 
@@ -47,18 +74,50 @@ class Evaluator(ValueProxy):
         required by base class
         """
         args = [self._evaluate_arg(a, **kwargs) for a in self._args]
-        parameters = inspect.signature(self._evaluate).parameters
         try:
-            if 'kwargs' in parameters:
+            if self._evaluate_accepts_kwargs:
                 return self._evaluate(*args, **kwargs)
             return self._evaluate(*args)
         except TypeError:
             evaluator_name = self._name or type(self).__name__
-            named_parameters = [
-                k for k, v in parameters.items()
-                if v.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
-            ]
-            raise EvaluatorTypeError(evaluator_name, named_parameters, args)
+            raise EvaluatorTypeError(evaluator_name, self._evaluate_parameter_names, args)
+
+    @property
+    def vectorisable(self):
+        """Whether :meth:`evaluate_batch` can evaluate a batch at once
+
+        An evaluator is vectorisable if it is an elementwise (e.g. arithmetic) evaluator
+        of numbers, numeric macros, parameters and other vectorisable evaluators.
+
+        :returns: ``True`` if the evaluator is vectorisable; otherwise ``False``
+        :rtype: bool
+        """
+        return self._elementwise and all(_is_vectorisable_arg(arg) for arg in self._args)
+
+    def evaluate_batch(self, contexts):
+        """Evaluates the evaluator for each of a sequence of keyword arguments
+
+        If numpy is installed, the evaluator is :attr:`vectorisable` and the parameters it refers to
+        are numbers in every context, the batch is evaluated at once with numpy arrays. Otherwise, or
+        if the vectorised evaluation fails, each is evaluated in turn. The results are the same either way.
+
+        :param contexts: The keyword arguments of each evaluation
+        :type contexts: list
+
+        :returns: The value of each evaluation, in the same order as the contexts
+        :rtype: list
+        """
+        if np is not None and len(contexts) > 1 and self.vectorisable:
+            arrays = _parameter_arrays(self, contexts)
+            if arrays is not None:
+                try:
+                    with np.errstate(all='raise'):
+                        result = _evaluate_vectorised(self, arrays)
+                    return np.broadcast_to(result, (len(contexts),)).tolist()
+                except (ArithmeticError, TypeError):
+                    # evaluate in turn, raising any error as a scalar evaluation would
+                    pass
+        return super().evaluate_batch(contexts)
 
     #pylint: disable=no-self-use
     def _evaluate_arg(self, arg, **kwargs):
@@ -76,26 +135,51 @@ class Evaluator(ValueProxy):
 class RangeEvaluator(Evaluator):
     """Implementation of :class:`Evaluator` that returns a range
     from range_min up to and including range_max, in steps of range_step
+
+    Raises :class:`ValueError` if the range would have more than :attr:`max_values` values.
     """
+    #: The maximum number of values in a range
+    max_values = RANGE_LIMIT
+
+    @classmethod
+    def limited_to(cls, max_values):
+        """Creates a range evaluator type with a different limit on the number of values
+
+        :param max_values: The maximum number of values in a range
+        :type max_values: int
+
+        :returns: The range evaluator type
+        :rtype: type
+        """
+        return type(cls.__name__, (cls,), {'max_values': max_values})
+
     #pylint: disable=arguments-differ
     def _evaluate(self, start, end, step=1.0):
         if start != end and step * (end-start) <= 0:
             raise ValueError("step value '{}' invalid in range evaluator".format(step))
+        if start == end:
+            return [start]
         comp = (lambda v: end >= v) if step > 0 else (lambda v: end <= v)
-        values = []
-        i = 0
-        while i < 100:
-            val = start + i*step
-            if comp(val):
-                values.append(val)
-            else:
-                break
-            i += 1
-        return values
+        span = (end - start) / step
+        if math.isnan(span):
+            return []
+        if span > self.max_values:
+            raise ValueError('range evaluator would produce more than the limit of {} values'.format(self.max_values))
+        # Count the values in closed form, correcting for rounding so that the values are
+        # exactly those for which start + i * step is within the range
+        count = int(span) + 1
+        while count > 0 and not comp(start + (count - 1) * step):
+            count -= 1
+        while comp(start + count * step):
+            count += 1
+        if count > self.max_values:
+            raise ValueError('range evaluator would produce more than the limit of {} values'.format(self.max_values))
+        return [start + i * step for i in range(count)]
 
 class MultiplyEvaluator(Evaluator):
     """Implementation of :class:`Evaluator` that multiplies two numbers
     """
+    _elementwise = True
     #pylint: disable=arguments-differ
     def _evaluate(self, left, right):
         return left * right
@@ -103,6 +187,7 @@ class MultiplyEvaluator(Evaluator):
 class DivideEvaluator(Evaluator):
     """Implementation of :class:`Evaluator` that divides the left by right
     """
+    _elementwise = True
     #pylint: disable=arguments-differ
     def _evaluate(self, left, right):
         return left / right
@@ -110,6 +195,7 @@ class DivideEvaluator(Evaluator):
 class AddEvaluator(Evaluator):
     """Implementation of :class:`Evaluator` that adds two numbers
     """
+    _elementwise = True
     #pylint: disable=arguments-differ
     def _evaluate(self, left, right):
         return left + right
@@ -117,6 +203,7 @@ class AddEvaluator(Evaluator):
 class SubtractEvaluator(Evaluator):
     """Implementation of :class:`Evaluator` that subtracts right from left
     """
+    _elementwise = True
     #pylint: disable=arguments-differ
     def _evaluate(self, left, right):
         return left - right
@@ -154,17 +241,63 @@ def create_function_evaluator(function):
     :returns: :class:`Evaluator` that wraps the function
     :rtype: :class:`Evaluator`
     """
+    parameter_names = list(inspect.signature(function).parameters.keys())
+    accepts_kwargs = 'kwargs' in parameter_names
+
     class FunctionEvaluator(Evaluator):
         """Implementation of :class:`Evaluator` that evaluates a delegate function
         """
         def _evaluate(self, *args, **kwargs):
-            parameters = inspect.signature(function).parameters
-            if 'kwargs' not in parameters:
-                all_keys = list(parameters.keys())
-                kwargs = {
-                    k: v for k, v in kwargs.items()
-                    if k in parameters and all_keys.index(k) >= len(args)
-                }
-            return function(*args, **kwargs)
+            if accepts_kwargs:
+                return function(*args, **kwargs)
+            if not kwargs:
+                return function(*args)
+            # Only pass the keyword arguments named by parameters not already filled by positional arguments
+            return function(*args, **{k: kwargs[k] for k in parameter_names[len(args):] if k in kwargs})
 
     return FunctionEvaluator
+
+def _is_vectorisable_arg(arg):
+    if isinstance(arg, ParameterEvaluator):
+        return isinstance(arg._args[0], str)    #pylint: disable=protected-access
+    if isinstance(arg, Evaluator):
+        return arg.vectorisable
+    if isinstance(arg, Macro):
+        return type(arg.evaluate()) in _NUMBER_TYPES
+    return type(arg) in _NUMBER_TYPES
+
+def _parameter_names(evaluator, names):
+    #pylint: disable=protected-access
+    if isinstance(evaluator, ParameterEvaluator):
+        names.add(evaluator._args[0])
+        return names
+    for arg in evaluator._args:
+        if isinstance(arg, Evaluator):
+            _parameter_names(arg, names)
+    return names
+
+def _parameter_arrays(evaluator, contexts):
+    """Gathers the values of the parameters referred to by the evaluator into an array for each parameter
+
+    Float values are gathered into float arrays. Otherwise, so that integer arithmetic is exact, the values
+    are gathered into object arrays, which apply the Python operators to each element.
+
+    :returns: A dict of arrays, keyed by parameter name, or ``None`` if any value is missing or not a number
+    """
+    values = {}
+    for name in _parameter_names(evaluator, set()):
+        values[name] = [context.get(name) for context in contexts]
+        if not all(type(value) in _NUMBER_TYPES for value in values[name]):
+            return None
+    dtype = float if all(type(v) is float for name_values in values.values() for v in name_values) else object
+    return {name: np.array(name_values, dtype=dtype) for name, name_values in values.items()}
+
+def _evaluate_vectorised(value, arrays):
+    #pylint: disable=protected-access
+    if isinstance(value, ParameterEvaluator):
+        return arrays[value._args[0]]
+    if isinstance(value, Evaluator):
+        return value._evaluate(*(_evaluate_vectorised(arg, arrays) for arg in value._args))
+    if isinstance(value, Macro):
+        return value.evaluate()
+    return value
@@ -19,6 +19,76 @@
 import random
 from spawn.specification.value_proxy import ValueProxy
 
+_ACTIVE_KEYS = []
+
+
+class GeneratorKey:
+    """The key from which keyed generators draw values while a node is evaluated
+
+    A keyed generator draws each value from its seed and a key, rather than from a sequence,
+    so that the value a node gets does not depend on the order in which nodes are evaluated.
+    The key is the position of the node in the tree, followed by the number of values already
+    drawn from the generator for the node. Keys are activated by using them as context managers.
+    """
+    def __init__(self, position):
+        """Initialises :class:`GeneratorKey`
+
+        :param position: The position of the node being evaluated, as the index of it and each of its ancestors
+                         in their parent's children
+        :type position: tuple
+        """
+        self._position = tuple(position)
+        self._draws = {}
+
+    def __enter__(self):
+        _ACTIVE_KEYS.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE_KEYS.pop()
+
+    @staticmethod
+    def active():
+        """Gets the active key, if any
+
+        :returns: The most recently activated key, or ``None``
+        :rtype: :class:`GeneratorKey`
+        """
+        return _ACTIVE_KEYS[-1] if _ACTIVE_KEYS else None
+
+    def next(self, generator):
+        """Gets the key for the next value drawn from the generator for the node
+
+        :param generator: The generator
+        :type generator: :class:`Generator`
+
+        :returns: The key
+        :rtype: tuple
+        """
+        draw = self._draws.get(id(generator), 0)
+        self._draws[id(generator)] = draw + 1
+        return self._position + (draw,)
+
+
+def next_key(generator):
+    """Gets the key for the next value drawn from a keyed generator
+
+    Outside the evaluation of a node (e.g. in macros) the key is the number of values
+    the generator has drawn outside the evaluation of a node.
+
+    :param generator: The generator
+    :type generator: :class:`Generator`
+
+    :returns: The key
+    :rtype: tuple
+    """
+    key = GeneratorKey.active()
+    if key is not None:
+        return key.next(generator)
+    draw = getattr(generator, '_unpositioned_draws', 0)
+    generator._unpositioned_draws = draw + 1 #pylint: disable=protected-access
+    return (draw,)
+
 
 class Generator(ValueProxy):
     """Abstract base class for generators
@@ -29,29 +99,88 @@ class Generator(ValueProxy):
         return NotImplementedError()
 
 
-class RandomInt(Generator):
+class BatchGenerator(Generator):
+    """Abstract base class for generators that draw values in batches
+
+    Values are drawn by :meth:`generate_batch` into a buffer, which :meth:`evaluate` consumes in order.
+    The first batch has ``initial_batch_size`` values, and each subsequent batch is twice the size of the
+    previous one, up to ``batch_size``. :meth:`generate_batch` must give the same values as drawing them
+    one at a time would, so that the values of a seeded generator do not depend on the batch sizes.
+    """
+    #: The maximum number of values drawn at once
+    batch_size = 1024
+    #: The number of values in the first batch
+    initial_batch_size = 16
+
+    # Class defaults, so that derived classes needn't initialise the buffer
+    _buffer = ()
+    _buffer_position = 0
+
+    def evaluate(self):
+        """Evaluate this generator
+
+        Takes the next value from the buffer, drawing the next batch if the buffer is empty
+        """
+        if self._buffer_position >= len(self._buffer):
+            size = min(max(2 * len(self._buffer), self.initial_batch_size), self.batch_size)
+            self._buffer = self.generate_batch(size)
+            self._buffer_position = 0
+        value = self._buffer[self._buffer_position]
+        self._buffer_position += 1
+        return value
+
+    def generate_batch(self, size):
+        """Draw a batch of values
+
+        Must be implemented in a derived class
+
+        :param size: The number of values to draw
+        :type size: int
+
+        :returns: The values, in the order they would have been drawn one at a time
+        :rtype: list
+        """
+        raise NotImplementedError()
+
+
+class RandomInt(BatchGenerator):
     """Generator of pseudo-random integer values
 
     Uses :class:`random.Random` with the parameters provided
     """
     #pylint: disable=redefined-builtin
-    def __init__(self, min=1, max=999, seed=1):
+    def __init__(self, min=1, max=999, seed=1, keyed=False):
         """Initialises :class:`RandomInt`
         :param min: Minimum value of variate range (inclusive), default=1
         :param max: Maximum value of variate range (inclusive), default=999
         :param seed: Seed for random number generation, default=1
+        :param keyed: If ``True``, each value is drawn from the seed and the key of the node being evaluated
+                      (see :class:`GeneratorKey`), rather than from a sequence, default=False
         """
         self._generator = random.Random()
         self._generator.seed(seed)
         self._min = min
         self._max = max
+        self._seed = seed
+        self._keyed = keyed
 
     def evaluate(self):
         """Evaluate this generator
 
-        Generates a random int between ``min`` and ``max``, given the ``seed``
+        Generates a random int between ``min`` and ``max``, given the ``seed`` (and the key, if keyed)
+        """
+        if self._keyed:
+            key = '/'.join(str(k) for k in (self._seed,) + next_key(self))
+            return random.Random(key).randint(self._min, self._max)
+        return super().evaluate()
+
+    def generate_batch(self, size):
+        """Draw a batch of values
+
+        Generates random ints between ``min`` and ``max``, given the ``seed``
         """
-        return self._generator.randint(self._min, self._max)
+        randint = self._generator.randint
+        return [randint(self._min, self._max) for _ in range(size)]
 
 
 class IncrementalInt(Generator):
@@ -76,12 +205,20 @@ class IncrementalInt(Generator):
         return v
 
 
-class ScipyDistribution(Generator):
-    """Generator of values from a statistical distribution in scipy.stats module"""
-    def __init__(self, distribution, random_state=None, **kwargs):
+class ScipyDistribution(BatchGenerator):
+    """Generator of values from a statistical distribution in scipy.stats module
+
+    Values are drawn with a single call to ``rvs(size=n)``, if the distribution gives the same values
+    that way as it does one at a time (which is checked when the first batch is drawn). Otherwise, they
+    are drawn one at a time.
+    """
+    def __init__(self, distribution, random_state=None, keyed=False, **kwargs):
         """Initialises :class:`ScipyDistribution`
 
         :param distribution: Name of statistical function that exists in scipy.stats
+        :param random_state: Seed for random number generation
+        :param keyed: If ``True``, each value is drawn from the seed and the key of the node being evaluated
+                      (see :class:`GeneratorKey`), rather than from a sequence, default=False
         :param kwargs: Arguments to creation of statistical function
         """
         try:
@@ -95,7 +232,44 @@ class ScipyDistribution(Generator):
             raise KeyError("'{}' distribution not found in scipy.stats module".format(distribution))
         self._distribution = getattr(scipy_stats, distribution)(**kwargs)
         self._random_state = np_random.RandomState(random_state)
+        self._to_list = None
+        self._keyed = keyed
+        if keyed:
+            self._np_random = np_random
+            self._seed_sequence = np_random.SeedSequence(random_state)
 
     def evaluate(self):
+        """Call `rvs` method of statistical function
+
+        If keyed, the random state is seeded from the seed and the key, using :class:`numpy.random.SeedSequence`
+        """
+        if self._keyed:
+            seed_sequence = self._np_random.SeedSequence(self._seed_sequence.entropy, spawn_key=next_key(self))
+            random_state = self._np_random.RandomState(self._np_random.Philox(seed_sequence))
+            return self._distribution.rvs(random_state=random_state)
+        return super().evaluate()
+
+    def generate_batch(self, size):
         """Call `rvs` method of statistical function"""
-        return self._distribution.rvs(random_state=self._random_state)
+        if self._to_list is None:
+            self._to_list = self._batch_conversion()
+        if self._to_list is False:
+            return [self._distribution.rvs(random_state=self._random_state) for _ in range(size)]
+        return self._to_list(self._distribution.rvs(size=size, random_state=self._random_state))
+
+    def _batch_conversion(self):
+        """Draws a batch both at once and one at a time, and then restores the random state
+
+        :returns: The conversion from an array of values drawn at once to a list of the values
+                  as they would be drawn one at a time, or ``False`` if the values are not the same
+        """
+        #pylint: disable=import-outside-toplevel
+        from numpy import generic
+        state = self._random_state.get_state()
+        batch = self._distribution.rvs(size=self.initial_batch_size, random_state=self._random_state)
+        self._random_state.set_state(state)
+        values = [self._distribution.rvs(random_state=self._random_state) for _ in range(self.initial_batch_size)]
+        self._random_state.set_state(state)
+        if getattr(batch, 'shape', None) != (len(values),) or list(batch) != values:
+            return False
+        return list if isinstance(values[0], generic) else type(batch).tolist
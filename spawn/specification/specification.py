@@ -23,12 +23,13 @@ import logging
 from spawn.util import PathBuilder
 from spawn.util.validation import validate_type
 
-from .value_proxy import ValueProxy, evaluate
+from .value_proxy import ValueProxy, Macro, evaluate
+from .generator_methods import GeneratorKey
 
 class SpecificationModel:
     """Class to contain the description of the :mod:`spawn` specification
     """
-    def __init__(self, base_file, root_node, metadata):
+    def __init__(self, base_file, root_node, metadata, aliases=None):
         """Initialises :class:`SpecificationModel`
 
         :param base_file: The base file for the specification
@@ -37,10 +38,14 @@ class SpecificationModel:
         :type root_node: :class:`SpecificationNode`
         :param metadata: Metadata for the specification model.
         :type metadata: :class:`SpecificationMetadata`
+        :param aliases: The paths of leaves that duplicate other leaves, mapped to the paths of the leaves they
+                        duplicate. No tasks are spawned for these leaves.
+        :type aliases: dict
         """
         self._base_file = base_file
         self._root_node = root_node
         self._metadata = metadata
+        self._aliases = aliases or {}
 
     @property
     def base_file(self):
@@ -60,6 +65,12 @@ class SpecificationModel:
         """
         return self._metadata
 
+    @property
+    def aliases(self):
+        """The paths of duplicate leaves, mapped to the paths of the leaves they duplicate
+        """
+        return self._aliases
+
 class SpecificationMetadata:
     """Container class for the :class:`SpecificationModel` metadata
     """
@@ -116,15 +127,14 @@ class SpecificationNode:
         self._property_name = property_name
         self._property_value = property_value
         self._children = []
+        self._position = None
         if self._parent is not None:
             self._parent.add_child(self)
         self._path_part = path
         self._ghosts = ghosts
-        self._collected_properties = self._collected_indices = self._collected_ghosts = None
-        self._derived_path = None
-        self._leaves = None
-        self._root = None
-        self._path = None
+        self._cache = NodeCache()
+        self._deferred = None
+        self._expanded = False
 
     @classmethod
     def create_root(cls, path=None):
@@ -154,19 +164,35 @@ class SpecificationNode:
         :returns: Child nodes
         :rtype: list
         """
+        if not self._expanded:
+            self._expand()
         return self._children
 
+    def _defer_children(self, deferred):
+        """Defers creation of this node's children until they are first accessed
+        (see :meth:`SpecificationNodeFactory.defer_children`)
+        """
+        self._deferred = deferred
+        self._expanded = False
+        self._invalidate_caches()
+
     def add_child(self, child):
         """Adds a child to this node
 
         :param child: The child node to add
         :type child: :class:`SpecificationNode`
         """
-        if child not in self._children:
-            logging.getLogger(__name__).debug('Adding child %s onto %s', child.description, self.description)
-            self._children.append(child)
-            #pylint: disable=protected-access
-            child._parent = self
+        #pylint: disable=protected-access
+        position = child._position
+        if position is not None and position < len(self._children) and self._children[position] is child:
+            return
+        logger = logging.getLogger(__name__)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Adding child %s onto %s', child.description, self.description)
+        child._position = len(self._children)
+        self._children.append(child)
+        child._parent = self
+        self._invalidate_caches()
 
     @property
     def leaves(self):
@@ -175,9 +201,58 @@ class SpecificationNode:
         :returns: The leaf nodes
         :rtype: list
         """
-        if self._leaves is None:
-            self._leaves = sum([c.leaves for c in self.children], []) if self.children else [self]
-        return self._leaves
+        if self._cache.leaves is None:
+            self._cache.leaves = list(self.iter_leaves())
+        return self._cache.leaves
+
+    @property
+    def leaf_count(self):
+        """Gets the number of leaf nodes descended from this node, without building a list of them
+
+        Where possible, the count is calculated from unexpanded nodes without expanding them.
+
+        :returns: The number of leaf nodes
+        :rtype: int
+        """
+        return self._count_leaves()
+
+    def _count_leaves(self):
+        count = self._static_leaf_count()
+        if count is not None:
+            return count
+        children = self.children
+        #pylint: disable=protected-access
+        return sum(child._count_leaves() for child in children) if children else 1
+
+    def _static_leaf_count(self):
+        """Counts the leaves descended from this node without expanding it, if possible
+
+        :returns: The number of leaves, or ``None`` if the leaves can only be counted by expansion
+        :rtype: int
+        """
+        #pylint: disable=protected-access
+        counts = [child._static_leaf_count() for child in self._children]
+        if self._deferred is not None:
+            counts.append(self._deferred.leaf_count())
+        if None in counts:
+            return None
+        return sum(counts) or 1
+
+    def iter_leaves(self):
+        """Iterates depth-first over the leaf nodes descended from this node
+
+        :returns: An iterator over the leaf nodes
+        :rtype: iterator
+        """
+        stack = [iter((self,))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+            elif node.children:
+                stack.append(iter(node.children))
+            else:
+                yield node
 
     @property
     def root(self):
@@ -186,12 +261,12 @@ class SpecificationNode:
         :returns: The root node
         :rtype: :class:`SpecificationNode`
         """
-        if self._root is None:
+        if self._cache.root is None:
             current_node = self
             while not current_node.is_root:
                 current_node = current_node.parent
-            self._root = current_node
-        return self._root
+            self._cache.root = current_node
+        return self._cache.root
 
     @property
     def is_root(self):
@@ -238,15 +313,7 @@ class SpecificationNode:
         :returns: The ghost parameters for this node
         :rtype: dict
         """
-        if self._collected_ghosts is None:
-            ghosts = {}
-            current_node = self
-            while not current_node.is_root:
-                # Ghosts lower down the tree supercede those higher up
-                ghosts = {**current_node._ghosts, **ghosts}
-                current_node = current_node.parent
-            self._collected_ghosts = ghosts
-        return self._collected_ghosts
+        return self._cached_collected(2)
 
     @property
     def index(self):
@@ -255,10 +322,23 @@ class SpecificationNode:
         :returns: The index if this node is not a root node; otherwise -1
         :rtype: int
         """
-        if self.parent is not None:
-            return self.parent.children.index(self)
+        if self._parent is not None:
+            return self._position
         return -1
 
+    def _tree_position(self):
+        """Gets the position of this node in the tree
+
+        :returns: The index of this node and each of its ancestors in their parent's children, from the top down
+        :rtype: tuple
+        """
+        position = []
+        current_node = self
+        while not current_node.is_root:
+            position.append(current_node.index)
+            current_node = current_node.parent
+        return tuple(reversed(position))
+
     @property
     def collected_properties(self):
         """Gets the properties and values of this node and all ancestor nodes
@@ -266,14 +346,7 @@ class SpecificationNode:
         :returns: A dict containing the properties of this node and all ancestor nodes
         :rtype: dict
         """
-        if self._collected_properties is None:
-            properties = {}
-            def _f(node):
-                if node.property_value is not None:
-                    properties.setdefault(node.property_name, node.property_value)
-            self._climb(_f)
-            self._collected_properties = properties
-        return self._collected_properties
+        return self._cached_collected(0)
 
     @property
     def collected_indices(self):
@@ -282,19 +355,56 @@ class SpecificationNode:
         :returns: A dict containing the properties of this node and all ancestor nodes
         :rtype: dict
         """
-        if self._collected_indices is None:
-            indices = {}
+        return self._cached_collected(1)
+
+    def _cached_collected(self, frame_index):
+        collected = self._cache.collected
+        if collected is None:
+            collected = self._cache.collected = [None, None, None]
+        if collected[frame_index] is None:
+            collected[frame_index] = self._collected(frame_index)
+        return collected[frame_index]
+
+    def _own_frames(self):
+        if self.property_value is None:
+            return {}, {}, self._ghosts
+        return {self.property_name: self.property_value}, {self.property_name: self.index}, self._ghosts
+
+    def _collected_frames(self):
+        """Gets the (properties, indices, ghosts) collected from this node and its ancestors.
+
+        These are built top-down, once per node, from the parent's frames, with values lower
+        down the tree superceding those higher up.
+        """
+        #pylint: disable=protected-access
+        if self._cache.frames is None:
+            pending = []
             current_node = self
-            while not current_node.is_root:
-                if current_node.property_value is not None:
-                    indices.setdefault(current_node.property_name, current_node.index)
+            while current_node._cache.frames is None and not current_node.is_root:
+                pending.append(current_node)
                 current_node = current_node.parent
-            self._collected_indices = indices
-        return self._collected_indices
+            if current_node._cache.frames is None:
+                current_node._cache.frames = ({}, {}, {})
+            frames = current_node._cache.frames
+            for node in reversed(pending):
+                frames = tuple({**frame, **own} for frame, own in zip(frames, node._own_frames()))
+                node._cache.frames = frames
+        return self._cache.frames
+
+    def _collected(self, frame_index):
+        """Gets a collected frame for this node. Leaves merge their own values onto the
+        parent's frame without caching frames of their own.
+        """
+        if self.is_root:
+            return {}
+        if self._children or self._deferred is not None:
+            return self._collected_frames()[frame_index]
+        #pylint: disable=protected-access
+        return {**self.parent._collected_frames()[frame_index], **self._own_frames()[frame_index]}
 
     @property
     def _base_path(self):
-        if self._derived_path is None:
+        if self._cache.base_path is None:
             path = PathBuilder()
             current_node = self
             while True:
@@ -304,8 +414,8 @@ class SpecificationNode:
                 if current_node.is_root:
                     break
                 current_node = current_node.parent
-            self._derived_path = str(path.format(self.collected_properties, self.collected_indices))
-        return self._derived_path
+            self._cache.base_path = str(path.format(self.collected_properties, self.collected_indices))
+        return self._cache.base_path
 
     @property
     def path(self):
@@ -317,18 +427,54 @@ class SpecificationNode:
         :returns: The path for this node
         :rtype: str
         """
-        if self._path is None:
-            path = self._base_path
+        #pylint: disable=protected-access
+        return self.root._leaf_paths().get(self, self._base_path)
+
+    def _leaf_paths(self):
+        """Builds (or returns the cached) index of leaf paths for the tree rooted at this node.
+
+        Leaves are grouped by base path in a single pass; where more than one leaf shares
+        a base path, each is given an alphabetical suffix in leaf order.
+        """
+        if self._cache.path_index is None:
+            leaves_by_path = {}
+            for leaf in self.iter_leaves():
+                #pylint: disable=protected-access
+                leaves_by_path.setdefault(leaf._base_path, []).append(leaf)
+            path_index = {}
+            for base_path, leaves in leaves_by_path.items():
+                if len(leaves) == 1:
+                    path_index[leaves[0]] = base_path
+                    continue
+                for i, leaf in enumerate(leaves):
+                    path_index[leaf] = str(PathBuilder(base_path).join(PathBuilder.index(i, index_format='a')))
+            self._cache.path_index = path_index
+        return self._cache.path_index
+
+    def _invalidate_caches(self):
+        """Invalidates the path and leaf caches of this node and all its ancestors
+        """
+        current_node = self
+        while current_node is not None:
+            #pylint: disable=protected-access
+            current_node._cache.reset_descendants()
+            current_node = current_node._parent
+
+    def _set_children(self, children):
+        for position, child in enumerate(children):
             #pylint: disable=protected-access
-            nodes_with_matching_paths = [
-                node for node in self.root.leaves if node._base_path == path
-            ]
-            if len(nodes_with_matching_paths) > 1:
-                path = str(PathBuilder(path).join(
-                    PathBuilder.index(nodes_with_matching_paths.index(self), index_format='a')
-                ))
-            self._path = path
-        return self._path
+            child._position = position
+        self._children = children
+        self._invalidate_caches()
+
+    def _expand(self):
+        """Creates any deferred children of this node. Derived classes that expand their
+        value into children do so here, on first access of :attr:`children`.
+        """
+        self._expanded = True
+        if self._deferred is not None:
+            deferred, self._deferred = self._deferred, None
+            deferred.populate(self)
 
     @property
     def description(self):
@@ -340,14 +486,25 @@ class SpecificationNode:
         return 'root node' if self.is_root else 'node with property "{}"'.format(self.property_name)
 
     def evaluate(self):
-        """Evaluates all children in this node
+        """Evaluates all children in this node, expanding them where required
+
+        Value proxy nodes that share a :attr:`ValueProxy.vectorisable` value proxy are evaluated together
+        in a batch (see :meth:`ValueProxy.evaluate_batch`) before they are expanded.
         """
-        for child in self._children:
-            child.evaluate()
+        _evaluate_in_batches(self.children)
+        self._evaluate_children()
+
+    def _evaluate_children(self):
+        for child in self.children:
+            #pylint: disable=protected-access
+            child._evaluate_children()
 
     def copy(self, new_parent):
         """Copies this node and this node's children
 
+        The children are shared with this node, and are only copied (one level at a time)
+        when the children of the copy are accessed.
+
         :param new_parent: The new parent node
         :type new_parent: :class:`SpecificationNode`
 
@@ -355,9 +512,12 @@ class SpecificationNode:
         :rtype: :class:`SpecificationNode`
         """
         new_node = self._initialise_copy(new_parent)
-        for child in self.children:
-            new_child = child.copy(new_node)
-            new_node.add_child(new_child)
+        if self._children:
+            if self._cache.shared_children is None:
+                self._cache.shared_children = SharedChildren(self._children, self._deferred)
+            SpecificationNodeFactory.defer_children(new_node, self._cache.shared_children)
+        elif self._deferred is not None:
+            SpecificationNodeFactory.defer_children(new_node, self._deferred)
         return new_node
 
     def _initialise_copy(self, new_parent):
@@ -365,12 +525,6 @@ class SpecificationNode:
             new_parent, self.property_name, self.property_value, self._path_part, self._ghosts
         )
 
-    def _climb(self, delegate):
-        current_node = self
-        while not current_node.is_root:
-            delegate(current_node)
-            current_node = current_node.parent
-
     def __repr__(self):
         properties = ', '.join(
             '{}={}'.format(k, getattr(self, k))
@@ -441,22 +595,97 @@ class ValueProxyNode(SpecificationNode):
         """
         super().__init__(parent, name, value_proxy, path, ghosts)
         validate_type(value_proxy, ValueProxy, 'value_proxy')
+        self._batch_value = None
+        self._batch_evaluated = False
 
-    def evaluate(self):
+    @property
+    def evaluation_context(self):
+        """The keyword arguments with which the value proxy of this node is evaluated
+
+        :returns: The ghost parameters and collected properties of this node
+        :rtype: dict
+        """
+        return {**self.ghosts, **self.collected_properties}
+
+    def set_evaluated_value(self, value):
+        """Sets the value of the value proxy of this node, evaluated in a batch with other nodes
+
+        :param value: The value of the value proxy, as evaluated with :attr:`evaluation_context`
+        :type value: object
+        """
+        self._batch_value = (value,)
+        self._batch_evaluated = True
+
+    def _evaluate_children(self):
+        children = self.children
+        if not self._batch_evaluated:
+            # (the nodes beneath this node only exist now that it has been expanded)
+            _evaluate_in_batches(children)
+        for child in children:
+            #pylint: disable=protected-access
+            child._evaluate_children()
+
+    def _expand(self):
         """Evaluates this node to determine what it's value should be.
 
         Replaces children with new values generated by this node.
-        Subsequently evaluates all children.
         """
-        old_children = list(self.children)
-        property_values = {**self.ghosts, **self.collected_properties}
-        values = evaluate(self._property_value, **property_values)
-        self._children = [SpecificationNodeFactory().create(
+        super()._expand()
+        old_children = list(self._children)
+        if self._batch_value is not None:
+            values, = self._batch_value
+            self._batch_value = None
+        else:
+            # Keyed generators draw values from the position of this node, rather than in order of evaluation
+            with GeneratorKey(self._tree_position()):
+                values = evaluate(self._property_value, **self.evaluation_context)
+        self._set_children([SpecificationNodeFactory().create(
             self, self.property_name, values, None, self._ghosts, old_children
-        )]
+        )])
         self._property_value = None
-        for child in self.children:
-            child.evaluate()
+        self._cache.reset_collected()
+
+    def _static_leaf_count(self):
+        if self._expanded:
+            return super()._static_leaf_count()
+        template_count = super()._static_leaf_count()
+        if template_count is None:
+            return None
+        return SpecificationNodeFactory.leaf_count(self._property_value, template_count)
+
+def _evaluate_in_batches(nodes):
+    """Evaluates the vectorisable value proxies of the unexpanded value proxy nodes among and beneath the nodes,
+    in a batch for each value proxy
+
+    Nodes are expanded down to the value proxy nodes. The value proxy nodes evaluated in batches are then
+    expanded in turn, and the value proxy nodes beneath them evaluated in batches, and so on. Expanding
+    other nodes evaluates nothing, and vectorisable value proxies have no side effects, so the values of
+    all other value proxies (e.g. generators) are the same as if the nodes were evaluated one at a time.
+    """
+    while nodes:
+        batches = {}
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ValueProxyNode):
+                #pylint: disable=protected-access
+                if not node._expanded and node.property_value.vectorisable:
+                    batches.setdefault(id(node.property_value), []).append(node)
+            else:
+                stack.extend(node.children)
+        evaluated = []
+        for batch in batches.values():
+            if len(batch) < 2:
+                continue
+            try:
+                values = batch[0].property_value.evaluate_batch([node.evaluation_context for node in batch])
+            except Exception: #pylint: disable=broad-except
+                # leave the error to be raised when the node is expanded, as it would be without batching
+                continue
+            for node, value in zip(batch, values):
+                node.set_evaluated_value(value)
+            evaluated.extend(batch)
+        nodes = [child for node in evaluated for child in node.children]
 
 class DictNode(SpecificationNode):
     """Implementation of :class:`SpecificationNode` that allows a
@@ -479,9 +708,10 @@ class DictNode(SpecificationNode):
         super().__init__(parent, name, value, path, ghosts)
         validate_type(value, dict, 'value')
 
-    def evaluate(self):
-        """Evaluates this node to expand child items
+    def _expand(self):
+        """Expands the first dict item into a child node, with the remaining items beneath it
         """
+        super()._expand()
         node_factory = SpecificationNodeFactory()
         dict_value = deepcopy(self.property_value)
         next_name = list(dict_value.keys())[0]
@@ -495,11 +725,18 @@ class DictNode(SpecificationNode):
         new_children = [node_factory.create(
             self, next_name, next_value, self._path_part, self._ghosts, next_children
         )]
-        self._children = new_children
+        self._set_children(new_children)
         self._path_part = None
-        for child in self.children:
-            child.evaluate()
         self._property_value = None
+        self._cache.reset_collected()
+
+    def _static_leaf_count(self):
+        if self._expanded:
+            return super()._static_leaf_count()
+        template_count = super()._static_leaf_count()
+        if template_count is None:
+            return None
+        return SpecificationNodeFactory.leaf_count(self._property_value, template_count)
 
 class ListNode(SpecificationNode):
     """Implementation of :class:`SpecificationNode` that allows a
@@ -522,20 +759,109 @@ class ListNode(SpecificationNode):
         super().__init__(parent, name, value, path, ghosts)
         validate_type(value, list, 'value')
 
-    def evaluate(self):
-        """Evaluates this node to expand the list and create new children
+    def _expand(self):
+        """Expands the list to create new children
         """
+        super()._expand()
         node_factory = SpecificationNodeFactory()
-        old_children = list(self.children)
+        shared_children = SharedChildren(self._children) if self._children else None
         new_children = []
         for value in self.property_value:
-            new_children.append(node_factory.create(
-                self, self.property_name, value, None, self._ghosts, old_children
-            ))
-        self._children = new_children
-        for child in self.children:
-            child.evaluate()
+            new_child = node_factory.create(self, self.property_name, value, None, self._ghosts)
+            if shared_children is not None:
+                node_factory.defer_children(new_child, shared_children)
+            new_children.append(new_child)
+        self._set_children(new_children)
         self._property_value = None
+        self._cache.reset_collected()
+
+    def _static_leaf_count(self):
+        if self._expanded:
+            return super()._static_leaf_count()
+        template_count = super()._static_leaf_count()
+        if template_count is None:
+            return None
+        return SpecificationNodeFactory.leaf_count(self._property_value, template_count)
+
+class SharedChildren:
+    """Children shared between nodes, which are copied into a node when its children are first accessed
+
+    Allows sibling nodes created during expansion to share the same (unevaluated) subtree, rather
+    than each taking a deep copy of it up front.
+    """
+    def __init__(self, children, deferred=None):
+        """Initialises :class:`SharedChildren`
+
+        :param children: The child nodes to share
+        :type children: list
+        :param deferred: Deferred children (see :meth:`SpecificationNodeFactory.defer_children`) to populate
+                         after the shared children, if any
+        :type deferred: object
+        """
+        self._children = tuple(children)
+        self._deferred = deferred
+        self._leaf_count = None
+        self._leaf_count_known = False
+
+    def populate(self, node):
+        """Adds copies of the shared children to the node
+
+        :param node: The node to add the children to
+        :type node: :class:`SpecificationNode`
+        """
+        for child in self._children:
+            # copying onto the node adds the copy to its children
+            child.copy(node)
+        if self._deferred is not None:
+            self._deferred.populate(node)
+
+    def leaf_count(self):
+        """Counts the leaves beneath the shared children, without expanding them
+
+        :returns: The number of leaves, or ``None`` if the leaves can only be counted by expansion
+        :rtype: int
+        """
+        if not self._leaf_count_known:
+            #pylint: disable=protected-access
+            counts = [child._static_leaf_count() for child in self._children]
+            if self._deferred is not None:
+                counts.append(self._deferred.leaf_count())
+            self._leaf_count = None if None in counts else sum(counts)
+            self._leaf_count_known = True
+        return self._leaf_count
+
+class NodeCache:
+    """Values derived from a :class:`SpecificationNode` and the nodes around it, cached until the tree changes
+
+    The values collected from the node and its ancestors are held separately from those derived from its
+    descendants, so that each can be reset without the other.
+    """
+    # A cache is created for every node, so it is kept as small as possible
+    __slots__ = ('collected', 'frames', 'base_path', 'root', 'path_index', 'leaves', 'shared_children')
+
+    def __init__(self):
+        """Initialises :class:`NodeCache`
+        """
+        self.collected = None
+        self.frames = None
+        self.base_path = None
+        self.root = None
+        self.path_index = None
+        self.leaves = None
+        self.shared_children = None
+
+    def reset_collected(self):
+        """Resets the properties, indices and ghosts collected from the node and its ancestors
+        """
+        self.collected = None
+        self.frames = None
+
+    def reset_descendants(self):
+        """Resets the leaves, leaf paths and shared children derived from the descendants of the node
+        """
+        self.path_index = None
+        self.leaves = None
+        self.shared_children = None
 
 class SpecificationNodeFactory:
     """Factory class for creating :class:`SpecificationNode` objects
@@ -572,13 +898,46 @@ class SpecificationNodeFactory:
                 node = IndexedNode(parent, name, index, value, path, ghosts)
             else:
                 node = SpecificationNode(parent, name, value, path, ghosts)
-        for child in children:
-            node.add_child(self._copy_tree(node, child))
+        if children:
+            self.defer_children(node, SharedChildren(children))
         return node
 
     @staticmethod
-    def _copy_tree(parent, node):
-        return node.copy(parent)
+    def defer_children(node, deferred):
+        """Defers creation of the children of a node until they are first accessed
+
+        :param node: The node whose children are deferred
+        :type node: :class:`SpecificationNode`
+        :param deferred: Object with a ``populate(node)`` method that adds the children to the node,
+                         and a ``leaf_count()`` method that returns the number of leaves that would
+                         be added (or ``None`` if that cannot be determined without adding them)
+        :type deferred: object
+        """
+        #pylint: disable=protected-access
+        node._defer_children(deferred)
+
+    @staticmethod
+    def leaf_count(value, child_leaf_count, literal=False):
+        """Counts the leaves of the subtree that :meth:`create` would produce for the value
+        once expanded, without creating it
+
+        :param value: The value of the node
+        :type value: object
+        :param child_leaf_count: The number of leaves beneath each copy of the children
+        :type child_leaf_count: int
+        :param literal: if True, the value is not expandable and is set literally
+        :type literal: bool
+
+        :returns: The number of leaves, or ``None`` if it can only be found by evaluating
+                  a :class:`ValueProxy`
+        :rtype: int
+        """
+        if literal:
+            return child_leaf_count
+        for value_type, count_leaves in _LEAF_COUNTERS:
+            if isinstance(value, value_type):
+                return count_leaves(value, child_leaf_count)
+        return child_leaf_count
 
     @staticmethod
     def _index(name):
@@ -590,3 +949,32 @@ class SpecificationNodeFactory:
             except ValueError:
                 pass
         return None
+
+def _dict_leaf_count(value, child_leaf_count):
+    next_name = list(value.keys())[0]
+    remaining = {k: v for k, v in value.items() if k != next_name}
+    if remaining:
+        child_leaf_count = SpecificationNodeFactory.leaf_count(remaining, child_leaf_count)
+        if child_leaf_count is None:
+            return None
+    return SpecificationNodeFactory.leaf_count(value[next_name], child_leaf_count)
+
+def _list_leaf_count(value, child_leaf_count):
+    counts = [SpecificationNodeFactory.leaf_count(v, child_leaf_count) for v in value]
+    if None in counts:
+        return None
+    return sum(counts) or 1
+
+def _macro_leaf_count(value, child_leaf_count):
+    return SpecificationNodeFactory.leaf_count(value.evaluate(), child_leaf_count)
+
+def _value_proxy_leaf_count(_value, _child_leaf_count):
+    return None
+
+# Leaf counts of each type of value, in order of precedence (a macro is also a value proxy)
+_LEAF_COUNTERS = (
+    (dict, _dict_leaf_count),
+    (list, _list_leaf_count),
+    (Macro, _macro_leaf_count),
+    (ValueProxy, _value_proxy_leaf_count),
+)
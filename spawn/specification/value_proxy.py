@@ -20,11 +20,42 @@ import inspect
 
 from spawn.util.validation import validate_type
 
+def _accepts_kwargs(function):
+    return 'kwargs' in inspect.signature(function).parameters
+
 class ValueProxy:
     """Base value proxy class
 
     A value proxy is anything that can be `evaluate` d in place of a value
     """
+    #: Whether :meth:`evaluate` accepts keyword arguments. Determined once for each class, when it is created.
+    evaluate_accepts_kwargs = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.evaluate_accepts_kwargs = _accepts_kwargs(cls.evaluate)
+
+    @property
+    def vectorisable(self):
+        """Whether :meth:`evaluate_batch` can evaluate a batch at once. Vectorisable value proxies
+        are pure: evaluating them has no side effects, so may be done ahead of time.
+
+        :returns: ``True`` if the value proxy is vectorisable; otherwise ``False``
+        :rtype: bool
+        """
+        return False
+
+    def evaluate_batch(self, contexts):
+        """Evaluates the :class:`ValueProxy` for each of a sequence of keyword arguments
+
+        :param contexts: The keyword arguments of each evaluation
+        :type contexts: list
+
+        :returns: The value of each evaluation, in the same order as the contexts
+        :rtype: list
+        """
+        return [evaluate(self, **context) for context in contexts]
+
     #pylint: disable=no-self-use
     def evaluate(self):
         """Evaluates the :class:`ValueProxy`
@@ -65,7 +96,6 @@ def evaluate(value_proxy, *args, **kwargs):
     :type value_proxy: :class:`VaWlueProxy`
     """
     validate_type(value_proxy, ValueProxy, 'value_proxy')
-    parameters = inspect.signature(value_proxy.evaluate).parameters
-    if 'kwargs' in parameters:
+    if value_proxy.evaluate_accepts_kwargs:
         return value_proxy.evaluate(*args, **kwargs)
     return value_proxy.evaluate(*args)
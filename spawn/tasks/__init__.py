@@ -19,3 +19,4 @@
 from .base import SpawnTask
 from .simulation import SimulationTask
 from .task_list_parameter import TaskListParameter
+from .manifest import InputManifest
@@ -16,6 +16,7 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
 """Base task for all Spawn tasks
 """
+import asyncio
 import luigi
 
 from .task_list_parameter import TaskListParameter
@@ -33,6 +34,14 @@ class SpawnTask(luigi.Task):
         """
         raise NotImplementedError()
 
+    async def run_async(self):
+        """Run the task from an :mod:`asyncio` event loop.
+
+        By default, runs :meth:`run` in the event loop's executor. Derived classes may
+        override this with a native coroutine.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.run)
+
     def complete(self):
         """Determine if this task is complete
 
@@ -16,9 +16,14 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
 """Methods to generate :class:`SimulationTask`s
 """
+from concurrent.futures import ProcessPoolExecutor
+
 from spawn.util import PathBuilder, TypedProperty
 from spawn.specification.specification import SpecificationNode, IndexedNode
 
+_WORKER_SPAWNER = None
+_WORKER_MANIFEST = None
+
 def _check_type(task_spawner, name, value):
     if hasattr(type(task_spawner), name):
         attribute = getattr(type(task_spawner), name)
@@ -28,26 +33,149 @@ def _check_type(task_spawner, name, value):
                 value = expected_type(value)
     return value
 
-def generate_tasks_from_spec(task_spawner, node, base_path):
-    """Generate list of luigi.Task for a spawn.SpecificationNode"""
+def generate_tasks_from_spec(task_spawner, node, base_path, *, processes=1, manifest=None, aliases=None):
+    """Generate list of luigi.Task for a spawn.SpecificationNode
+
+    :param task_spawner: The task spawner
+    :type task_spawner: :class:`TaskSpawner`
+    :param node: The root node of the specification
+    :type node: :class:`SpecificationNode`
+    :param base_path: The base path of the tasks
+    :type base_path: str
+    :param processes: The number of processes used to spawn the tasks. If greater than 1,
+                      subtrees are spawned in a process pool, each with a branch of the
+                      spawner; the spawner and its tasks must then be picklable.
+    :type processes: int
+    :param manifest: If given, the input hash of each task is recorded in the manifest, and tasks whose
+                     inputs are unchanged since the manifest was saved are respawned without rewriting them.
+    :type manifest: :class:`InputManifest`
+    :param aliases: The paths of leaves that duplicate other leaves (see :attr:`SpecificationModel.aliases`).
+                    No tasks are spawned for these leaves.
+    :type aliases: dict
+
+    :returns: The tasks, in the same order for any number of processes
+    :rtype: list
+    """
+    return list(iter_tasks_from_spec(
+        task_spawner, node, base_path, processes=processes, manifest=manifest, aliases=aliases
+    ))
+
+def iter_tasks_from_spec(task_spawner, node, base_path, *, processes=1, manifest=None, aliases=None):
+    """Generate luigi.Tasks for a spawn.SpecificationNode, yielding each as it is spawned
+
+    Takes the same arguments as :func:`generate_tasks_from_spec`.
+
+    :returns: An iterator over the tasks
+    :rtype: iterator
+    """
     if not isinstance(node, SpecificationNode):
         raise ValueError('node must be of type ' + SpecificationNode.__name__)
+    aliases = aliases or {}
+    if processes > 1:
+        return _generate_tasks_in_pool(
+            task_spawner, node, base_path, processes=processes, manifest=manifest, aliases=aliases
+        )
+    return _generate_tasks(task_spawner, node, base_path, manifest, aliases)
+
+def _generate_tasks(task_spawner, node, base_path, manifest, aliases):
     if node.has_property:
-        value = _check_type(task_spawner, node.property_name, node.property_value)
-        if isinstance(node, IndexedNode):
-            array = getattr(task_spawner, node.property_name)
-            array[node.index] = value
-        else:
-            setattr(task_spawner, node.property_name, value)
+        _set_property(task_spawner, *_property(node))
     if not node.children:   # (leaf)
-        task = task_spawner.spawn(
-            str(PathBuilder(base_path).join(node.path)),
-            {**node.ghosts, **node.collected_properties}
-        )
-        return [task]
+        if node.path not in aliases:
+            yield _spawn_leaf(task_spawner, node, base_path, manifest)
+        return
     # (branch)
-    tasks = []
     for child in node.children:
-        branch = task_spawner.branch()
-        tasks += generate_tasks_from_spec(branch, child, base_path)
-    return tasks
+        yield from _generate_tasks(task_spawner.branch(), child, base_path, manifest, aliases)
+
+def _spawn_leaf(task_spawner, node, base_path, manifest):
+    path_, metadata = _spawn_arguments(node, base_path)
+    task, input_hash = _spawn(task_spawner, path_, metadata, manifest)
+    if manifest is not None:
+        manifest.record(path_, input_hash)
+    return task
+
+def _spawn(task_spawner, path_, metadata, manifest):
+    """Spawns the task, returning it and the hash of its inputs (if there is a manifest to record it in)
+    """
+    if manifest is None:
+        return task_spawner.spawn(path_, metadata), None
+    input_hash = task_spawner.input_hash()
+    if manifest.is_unchanged(path_, input_hash):
+        return task_spawner.respawn(path_, metadata), input_hash
+    return task_spawner.spawn(path_, metadata), input_hash
+
+def _property(node):
+    return node.property_name, node.property_value, node.index if isinstance(node, IndexedNode) else None
+
+def _set_property(task_spawner, name, value, index):
+    value = _check_type(task_spawner, name, value)
+    if index is not None:
+        array = getattr(task_spawner, name)
+        array[index] = value
+    else:
+        setattr(task_spawner, name, value)
+
+def _spawn_arguments(node, base_path):
+    return str(PathBuilder(base_path).join(node.path)), {**node.ghosts, **node.collected_properties}
+
+def _generate_tasks_in_pool(task_spawner, node, base_path, *, processes, manifest, aliases):
+    # Walk down to the first node with more than one child, so that there are subtrees to share out
+    while True:
+        if node.has_property:
+            _set_property(task_spawner, *_property(node))
+        if not node.children:
+            if node.path not in aliases:
+                yield _spawn_leaf(task_spawner, node, base_path, manifest)
+            return
+        if len(node.children) > 1:
+            break
+        node = node.children[0]
+        task_spawner = task_spawner.branch()
+    plans = [_plan(child, base_path, aliases) for child in node.children]
+    yield from _spawn_plans_in_pool(task_spawner, plans, processes, manifest)
+
+def _spawn_plans_in_pool(task_spawner, plans, processes, manifest):
+    chunk_size = -(-len(plans) // (processes * 4))
+    chunks = [plans[i:i + chunk_size] for i in range(0, len(plans), chunk_size)]
+    with ProcessPoolExecutor(processes, initializer=_initialise_worker, initargs=(task_spawner, manifest)) as executor:
+        for descriptors in executor.map(_generate_tasks_from_plans, chunks):
+            for task_type, params, path_, input_hash in descriptors:
+                if manifest is not None:
+                    # Hashes recorded in the worker processes' copies of the manifest are lost, so record them here
+                    manifest.record(path_, input_hash)
+                yield task_type.from_str_params(params)
+
+def _plan(node, base_path, aliases):
+    """Reduces the subtree to plain data (property, spawn arguments and child plans) for a worker process
+
+    Leaves that are aliases have no spawn arguments, and are skipped.
+    """
+    property_ = _property(node) if node.has_property else None
+    children = node.children
+    if not children:
+        return property_, None if node.path in aliases else _spawn_arguments(node, base_path), None
+    return property_, None, [_plan(child, base_path, aliases) for child in children]
+
+def _initialise_worker(task_spawner, manifest):
+    global _WORKER_SPAWNER, _WORKER_MANIFEST #pylint: disable=global-statement
+    _WORKER_SPAWNER = task_spawner
+    _WORKER_MANIFEST = manifest
+
+def _generate_tasks_from_plans(plans):
+    tasks = []
+    for plan in plans:
+        _generate_tasks_from_plan(_WORKER_SPAWNER.branch(), plan, tasks)
+    return [(type(task), task.to_str_params(), path_, input_hash) for task, path_, input_hash in tasks]
+
+def _generate_tasks_from_plan(task_spawner, plan, tasks):
+    property_, spawn_arguments, children = plan
+    if property_ is not None:
+        _set_property(task_spawner, *property_)
+    if children is None:
+        if spawn_arguments is not None:
+            task, input_hash = _spawn(task_spawner, *spawn_arguments, manifest=_WORKER_MANIFEST)
+            tasks.append((task, spawn_arguments[0], input_hash))
+        return
+    for child in children:
+        _generate_tasks_from_plan(task_spawner.branch(), child, tasks)
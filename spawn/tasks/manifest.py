@@ -0,0 +1,94 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+"""Implementation of the :class:`InputManifest`
+"""
+import json
+from os import path
+
+MANIFEST_FILE_NAME = 'spawn.manifest.json'
+
+class InputManifest:
+    """Record of the hash of the inputs spawned at each path in an output directory
+
+    When tasks are generated with a manifest, the inputs at paths whose hash is unchanged since the
+    manifest was last saved are not rewritten (see :meth:`TaskSpawner.respawn`).
+    """
+    def __init__(self, outdir, previous_hashes=None):
+        """Initialises the :class:`InputManifest`
+
+        :param outdir: The output directory
+        :type outdir: path-like
+        :param previous_hashes: The input hashes recorded by the previous run, keyed by path relative to ``outdir``
+        :type previous_hashes: dict
+        """
+        self._outdir = outdir
+        self._previous_hashes = previous_hashes or {}
+        self._hashes = {}
+
+    @classmethod
+    def load(cls, outdir):
+        """Loads the manifest saved in the output directory, if there is one
+
+        :param outdir: The output directory
+        :type outdir: path-like
+
+        :returns: The manifest, with no previous hashes if none was saved
+        :rtype: :class:`InputManifest`
+        """
+        manifest_file = path.join(outdir, MANIFEST_FILE_NAME)
+        if not path.isfile(manifest_file):
+            return cls(outdir)
+        with open(manifest_file) as fp:
+            return cls(outdir, json.load(fp)['input_hashes'])
+
+    def save(self):
+        """Saves the input hashes recorded in this run to the output directory
+
+        Nothing is saved if no hashes were recorded and there was no previous manifest, e.g. when
+        the spawner doesn't support input hashes.
+        """
+        if not self._hashes and not self._previous_hashes:
+            return
+        with open(path.join(self._outdir, MANIFEST_FILE_NAME), 'w') as fp:
+            json.dump({'input_hashes': self._hashes}, fp, indent=2, sort_keys=True)
+
+    def is_unchanged(self, path_, input_hash):
+        """Determine if the inputs at the path are unchanged since the previous run
+
+        :param path_: The path of the inputs
+        :type path_: path-like
+        :param input_hash: The hash of the inputs, or ``None`` if unknown
+        :type input_hash: str
+
+        :returns: ``True`` if the previous run recorded the same hash for the path; otherwise ``False``
+        :rtype: bool
+        """
+        return input_hash is not None and self._previous_hashes.get(self._key(path_)) == input_hash
+
+    def record(self, path_, input_hash):
+        """Records the hash of the inputs spawned at the path
+
+        :param path_: The path of the inputs
+        :type path_: path-like
+        :param input_hash: The hash of the inputs, or ``None`` if unknown
+        :type input_hash: str
+        """
+        if input_hash is not None:
+            self._hashes[self._key(path_)] = input_hash
+
+    def _key(self, path_):
+        return path.relpath(path_, self._outdir).replace(path.sep, '/')
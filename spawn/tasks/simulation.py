@@ -16,6 +16,7 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
 """luigi Tasks
 """
+import asyncio
 import traceback
 from os import path
 import logging
@@ -34,7 +35,9 @@ class SimulationTask(SpawnTask):
     _input_file_path = luigi.Parameter()
     _runner_type = luigi.Parameter()
     _exe_path = luigi.Parameter()
-    _working_dir = luigi.Parameter(default=None)
+    _working_dir = luigi.OptionalParameter(default=None)
+    _max_log_size = luigi.IntParameter(default=0)
+    _input_hash = luigi.Parameter(default='')
 
     def run(self):
         """Run this task
@@ -42,6 +45,19 @@ class SimulationTask(SpawnTask):
         if self._exe_path:
             self._create_runner().run()
 
+    async def run_async(self):
+        """Run this task from an :mod:`asyncio` event loop
+
+        Uses the runner's ``run_async`` coroutine if it has one; otherwise runs the
+        runner in the event loop's executor.
+        """
+        if self._exe_path:
+            runner = self._create_runner()
+            if hasattr(runner, 'run_async'):
+                await runner.run_async()
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, runner.run)
+
     def complete(self):
         """Determine if this task is complete
 
@@ -75,6 +91,15 @@ class SimulationTask(SpawnTask):
         )
         return 'Unhandled exception running task:\n\n{}'.format(''.join(error_string))
 
+    @property
+    def input_hash(self):
+        """The fingerprint of the inputs of this task, if known
+
+        :returns: The fingerprint of the inputs, or ``None``
+        :rtype: str
+        """
+        return self._input_hash or None
+
     @property
     def run_name_with_path(self):
         """Return the run name of this task
@@ -87,8 +112,14 @@ class SimulationTask(SpawnTask):
                 'could not find runner for runner_type {} and task type {}'
                 .format(self._runner_type, type(self))
             )
+        # Only pass optional arguments that are set, so runners of derived tasks needn't accept them
+        kwargs = {}
+        if self._max_log_size:
+            kwargs['max_log_size'] = self._max_log_size
+        if self._input_hash:
+            kwargs['input_hash'] = self._input_hash
         return self.available_runners[self._runner_type](
-            self._id, self._input_file_path, exe_path=self._exe_path, cwd=self._working_dir
+            self._id, self._input_file_path, exe_path=self._exe_path, cwd=self._working_dir, **kwargs
         )
 
     @property
@@ -17,6 +17,7 @@
 """Contains utility functions for hashing entitiess
 """
 import hashlib
+import json
 
 from spawn.util.validation import validate_file, validate_type
 
@@ -58,3 +59,55 @@ def string_hash(string):
     """
     validate_type(string, str, 'string')
     return bytes_hash(string.encode('utf8'))
+
+def json_fingerprint(value):
+    """Returns a stable fingerprint of a JSON serialisable value
+
+    The fingerprint is a BLAKE2 digest over the canonical JSON of the value. Dicts are digested
+    from the digests of their items in key order (see :func:`dict_digest`), so equal values have
+    equal fingerprints whatever the order of their keys, and the digest of a large document can
+    be updated from the digests of its unchanged parts.
+
+    :param value: The value to compute the fingerprint of
+    :type value: JSON serialisable object
+
+    :returns: The fingerprint, as a hex string
+    :rtype: str
+    """
+    return json_digest(value).hex()
+
+def json_digest(value):
+    """Returns the digest of a JSON serialisable value, from which :func:`json_fingerprint` is formed
+
+    :param value: The value to compute the digest of
+    :type value: JSON serialisable object
+
+    :returns: The digest
+    :rtype: bytes
+    """
+    if isinstance(value, dict):
+        return dict_digest((k, json_digest(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        hasher = _blake2(b'[')
+        for item in value:
+            hasher.update(json_digest(item))
+        return hasher.digest()
+    return _blake2(json.dumps(value).encode('utf8')).digest()
+
+def dict_digest(item_digests):
+    """Returns the digest of a dict from the digests of its values
+
+    :param item_digests: The keys of the dict and the digests of their values
+    :type item_digests: iterable of (key, bytes) pairs
+
+    :returns: The digest
+    :rtype: bytes
+    """
+    hasher = _blake2(b'{')
+    for key, digest in sorted((json.dumps(k), d) for k, d in item_digests):
+        hasher.update(_blake2(key.encode('utf8')).digest())
+        hasher.update(digest)
+    return hasher.digest()
+
+def _blake2(data):
+    return hashlib.blake2b(data, digest_size=16)
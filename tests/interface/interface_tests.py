@@ -9,6 +9,8 @@ import numpy as np
 
 import spawn
 from spawn.config import DefaultConfiguration
+from spawn.runners import StateDatabase
+from spawn.specification import SpecificationNode
 
 @pytest.fixture
 def spec():
@@ -27,11 +29,63 @@ def test_tasks_are_run_via_interface(tmpdir):
     assert path.isfile(path.join(str(tmpdir), 'spawn.json'))
     assert len(glob(str(tmpdir) + '/**')) == 7
 
+def test_tasks_are_run_in_batches_via_interface(tmpdir):
+    config = {
+        'plugins': 'test:tests.conftest', 'type': 'test', 'outdir': str(tmpdir),
+        'workers': 1, 'local': True, 'batch_size': 2
+    }
+    spec_dict = {'spec': {'alpha': list(np.arange(4.0, 10.0, 2.0))}}
+    spawn.run(spec_dict, config)
+    assert path.isfile(path.join(str(tmpdir), 'spawn.json'))
+    assert len(glob(str(tmpdir) + '/**')) == 7
+
+def test_tree_is_not_evaluated_up_front_when_run_via_interface(tmpdir, mocker):
+    evaluate = mocker.spy(SpecificationNode, 'evaluate')
+    config = {'plugins': 'test:tests.conftest', 'type': 'test', 'outdir': str(tmpdir), 'workers': 1, 'local': True}
+    spec_dict = {'spec': {'alpha': list(np.arange(4.0, 10.0, 2.0))}}
+    spawn.run(spec_dict, config)
+    assert evaluate.call_count == 0
+    assert len(glob(str(tmpdir) + '/**')) == 7
+
+def test_can_get_status_from_state_database(tmpdir):
+    with StateDatabase.in_directory(str(tmpdir)) as database:
+        database.record('a', 'success', 0)
+        database.record('b', 'failure', 1)
+    assert spawn.status(str(tmpdir)) == {'success': 1, 'failure': 1}
+
+def test_status_raises_without_state_database(tmpdir):
+    with pytest.raises(FileNotFoundError):
+        spawn.status(str(tmpdir))
+
 def test_can_get_stats(spec):
     stats = spawn.stats(spec)
     assert 'leaf_count' in stats
     assert stats['leaf_count'] > 0
 
+def test_stats_include_runs_saved_when_deduplicating():
+    spec_dict = {'spec': {'alpha': [1.0, 2.0, 1.0]}}
+    assert 'runs_saved' not in spawn.stats(spec_dict)
+    stats = spawn.stats(spec_dict, {'deduplicate': True})
+    assert stats == {'leaf_count': 3, 'runs_saved': 1}
+
+def test_duplicate_leaves_are_run_once_via_interface(tmpdir):
+    config = {
+        'plugins': 'test:tests.conftest', 'type': 'test', 'outdir': str(tmpdir),
+        'workers': 1, 'local': True, 'deduplicate': True
+    }
+    spec_dict = {'spec': {'alpha': [4.0, 6.0, 4.0]}}
+    spawn.run(spec_dict, config)
+    with open(path.join(str(tmpdir), 'spawn.json')) as fp:
+        leaves = json.load(fp)['spec']
+    assert leaves[2]['alias_of'] == leaves[0]['path']
+    assert len(glob(str(tmpdir) + '/**')) == 5
+
+def test_range_limit_is_read_from_config():
+    spec_dict = {'spec': {'alpha': '#range(1, 3)'}}
+    assert len(spawn.inspect(spec_dict)['spec']) == 3
+    with pytest.raises(ValueError):
+        spawn.inspect(spec_dict, {'range_limit': 2})
+
 def test_can_inspect(spec):
     result = spawn.inspect(spec)
     assert isinstance(result, dict)
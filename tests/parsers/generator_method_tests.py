@@ -14,7 +14,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import random
+
+import numpy as np
 import pytest
+from scipy import stats
 from spawn.specification.generator_methods import *
 
 
@@ -59,3 +63,67 @@ def test_same_random_state_gives_same_value():
 def test_raises_value_error_with_invalid_scipy_distribution():
     with pytest.raises(KeyError):
         ScipyDistribution('not_a_scipy_distribution')
+
+
+def test_random_int_gives_same_values_as_drawing_one_at_a_time():
+    gen = RandomInt(min=1, max=6, seed=3)
+    rng = random.Random()
+    rng.seed(3)
+    assert [gen.evaluate() for _ in range(100)] == [rng.randint(1, 6) for _ in range(100)]
+
+
+@pytest.mark.parametrize('distribution,kwargs', [
+    ('norm', {'scale': 2.0}),
+    ('poisson', {'mu': 3}),
+    ('skewnorm', {'a': 2.0}),
+])
+def test_scipy_distribution_gives_same_values_as_drawing_one_at_a_time(distribution, kwargs):
+    gen = ScipyDistribution(distribution, random_state=4, **kwargs)
+    expected_distribution = getattr(stats, distribution)(**kwargs)
+    random_state = np.random.RandomState(4)
+    expected = [expected_distribution.rvs(random_state=random_state) for _ in range(100)]
+    values = [gen.evaluate() for _ in range(100)]
+    assert values == expected
+    assert [type(v) for v in values] == [type(v) for v in expected]
+
+
+class CountingGenerator(BatchGenerator):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def generate_batch(self, size):
+        start = sum(self.batch_sizes)
+        self.batch_sizes.append(size)
+        return list(range(start, start + size))
+
+
+def test_batch_generator_draws_batches_of_increasing_size():
+    gen = CountingGenerator()
+    assert [gen.evaluate() for _ in range(5000)] == list(range(5000))
+    assert gen.batch_sizes == [16, 32, 64, 128, 256, 512, 1024, 1024, 1024, 1024]
+
+
+@pytest.mark.parametrize('create_generator', [
+    lambda: RandomInt(seed=5, keyed=True),
+    lambda: ScipyDistribution('norm', random_state=5, keyed=True)
+])
+def test_keyed_generator_values_depend_only_on_key(create_generator):
+    gen1, gen2 = create_generator(), create_generator()
+    with GeneratorKey((0, 3)):
+        first = [gen1.evaluate(), gen1.evaluate()]
+    with GeneratorKey((1, 2)):
+        second = gen1.evaluate()
+    with GeneratorKey((1, 2)):
+        assert gen2.evaluate() == second
+    with GeneratorKey((0, 3)):
+        assert [gen2.evaluate(), gen2.evaluate()] == first
+    assert first[0] != first[1]
+    assert [gen1.evaluate(), gen1.evaluate()] == [gen2.evaluate(), gen2.evaluate()]
+
+
+def test_keys_count_draws_of_each_generator():
+    gen1, gen2 = RandomInt(keyed=True), RandomInt(keyed=True)
+    with GeneratorKey((4,)) as key:
+        assert [key.next(gen1), key.next(gen2), key.next(gen1)] == [(4, 0), (4, 0), (4, 1)]
+    assert next_key(gen1) == (0,)
+    assert next_key(gen1) == (1,)
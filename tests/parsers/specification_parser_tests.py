@@ -811,4 +811,84 @@ def test_variable_succeeding_combinator(parser):
         {"alpha": 30, "beta": 9, "gamma": 18}
     ]
     assert len(model.root_node.leaves) == 3
-    assert [l.collected_properties for l in model.root_node.leaves] == expected_properties
\ No newline at end of file
+    assert [l.collected_properties for l in model.root_node.leaves] == expected_properties
+
+
+LAZY_DESCRIPTIONS = [
+    {'spec': {'alpha': [1, 2, 3], 'beta': [4, 5], 'gamma': ['a', 'b']}},
+    {'spec': {'combine:zip': {'alpha': [10, 20, 30], 'beta': [7, 8, 9]}, 'gamma': '#2 * !beta'}},
+    {'macros': {'MyRange': [2, 4]}, 'spec': {'alpha': '$MyRange', 'beta': [9, 10], 'gamma': ['tadpole', 'frog']}},
+    {'macros': {'MyRange': '#range(2, 5, 2)'}, 'spec': {'alpha': '$MyRange', 'beta': '#4 + !alpha'}},
+    {'spec': {'policy:path': '{alpha}', '_casper': 1, 'alpha': [1, 2], 'blah': {'beta[1]': 6, '~gamma': [1, 2]}}},
+    {
+        'generators': {'Seed': {'method': 'IncrementalInt'}},
+        'spec': {
+            'alpha': [1.5, 2.5, 3.5], 'seed': '@Seed', 'beta': '#!alpha * 2',
+            'gamma': ['#!beta + 1', '#!beta - !alpha', '#@Seed * !beta'], 'delta': '@Seed', 'epsilon': '#!gamma / 4'
+        }
+    },
+]
+
+
+@pytest.mark.parametrize('description', LAZY_DESCRIPTIONS)
+def test_lazy_parse_produces_same_leaves_as_eager_parse(parser, description):
+    eager_leaves = parser.parse(description).root_node.leaves
+    lazy_leaves = parser.parse(description, lazy=True).root_node.leaves
+    assert [l.collected_properties for l in lazy_leaves] == [l.collected_properties for l in eager_leaves]
+    assert [l.ghosts for l in lazy_leaves] == [l.ghosts for l in eager_leaves]
+    assert [l.path for l in lazy_leaves] == [l.path for l in eager_leaves]
+
+
+@pytest.mark.parametrize('description', LAZY_DESCRIPTIONS)
+def test_lazy_leaf_count_matches_eager_leaf_count(parser, description):
+    expected = len(parser.parse(description).root_node.leaves)
+    assert parser.parse(description, lazy=True).root_node.leaf_count == expected
+
+
+def test_lazy_leaf_count_is_calculated_without_expanding_tree(parser):
+    description = {'macros': {'Values': [1, 2, 3]}, 'spec': {'alpha': list(range(100)), 'beta': list(range(100)), 'gamma': '$Values'}}
+    root_node = parser.parse(description, lazy=True).root_node
+    assert root_node.leaf_count == 30000
+    assert len(root_node.children) == 100
+    assert all(not child._expanded for child in root_node.children)
+
+
+def test_value_proxies_shared_by_nodes_are_evaluated_in_batches(parser, mocker):
+    evaluate_batch = mocker.spy(MultiplyEvaluator, 'evaluate_batch')
+    description = {'spec': {'alpha': [1.0, 2.0, 3.0], 'beta': ['a', 'b'], 'gamma': '#!alpha * 2'}}
+    leaves = parser.parse(description).root_node.leaves
+    assert evaluate_batch.call_count == 1
+    assert [l.collected_properties['gamma'] for l in leaves] == [2.0, 2.0, 4.0, 4.0, 6.0, 6.0]
+
+
+def test_range_limit_can_be_set_on_parser(plugin_loader):
+    description = {'spec': {'alpha': '#range(1, 6)'}}
+    assert len(SpecificationParser(plugin_loader).parse(description).root_node.leaves) == 6
+    with pytest.raises(ValueError):
+        SpecificationParser(plugin_loader, range_limit=5).parse(description)
+
+
+KEYED_DESCRIPTION = {
+    'generators': {
+        'Seed': {'method': 'RandomInt', 'keyed': True},
+        'Speed': {'method': 'scipy.weibull_min', 'c': 2.0, 'random_state': 1, 'keyed': True}
+    },
+    'spec': {
+        'alpha': [1, 2, 3], 'beta': ['a', 'b'], 'seed': '@Seed', 'speed': '@Speed',
+        'gamma': '#repeat(@Seed, 2)'
+    }
+}
+
+
+def _expand_in_reverse(node):
+    for child in reversed(node.children):
+        _expand_in_reverse(child)
+
+
+def test_keyed_generators_give_same_values_in_any_order_of_evaluation(parser):
+    eager_leaves = parser.parse(KEYED_DESCRIPTION).root_node.leaves
+    root_node = parser.parse(KEYED_DESCRIPTION, lazy=True).root_node
+    _expand_in_reverse(root_node)
+    reverse_leaves = root_node.leaves
+    assert [l.collected_properties for l in reverse_leaves] == [l.collected_properties for l in eager_leaves]
+    assert len({l.collected_properties['seed'] for l in eager_leaves}) > 1
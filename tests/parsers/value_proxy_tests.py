@@ -124,3 +124,25 @@ def test_is_value_proxy_returns_true_for_strings_starting_with_short_or_long_for
 ])
 def test_is_value_proxy_returns_false_for_strings_not_starting_with_short_or_long_form(parser, value):
     assert not parser.is_value_proxy(value)
+
+@pytest.mark.parametrize('value', [
+    'gen$seed', 'ge!n:x', 'macro', 'macro!', 'para#m:', 'e#', 'x#range(1)', ' #5', '', 'eval', '#', 5, None
+])
+def test_is_value_proxy_matches_prefix_of_expanded_string(parser, value):
+    expected = isinstance(value, str) and any(
+        ValueProxyParser._expand(value).startswith(prefix + ':') for prefix in ['gen', 'macro', 'eval', 'param']
+    )
+    assert parser.is_value_proxy(value) == expected
+
+def test_repeated_strings_are_only_parsed_once(parser):
+    value_proxy = parser.parse('$VRef * !gamma')
+    assert parser.parse('$VRef * !gamma') is value_proxy
+    assert parser.parse('$VRef * !gamma').evaluate(gamma=2) == 10
+    assert parser.parse('$VRef * !beta') is not value_proxy
+
+def test_least_recently_used_value_proxies_are_discarded():
+    parser = ValueProxyParser(ValueLibraries(evaluators={'mult': MultiplyEvaluator}), cache_size=1)
+    value_proxy = parser.parse('!alpha * 2')
+    assert parser.parse('!alpha * 2') is value_proxy
+    parser.parse('!beta * 2')
+    assert parser.parse('!alpha * 2') is not value_proxy
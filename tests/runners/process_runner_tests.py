@@ -17,9 +17,14 @@
 import pytest
 
 from os import path, getcwd
+import asyncio
+import sys
 import json
 
 from spawn.runners.process_runner import ProcessRunner
+from spawn.runners.state_index import StateFileIndex
+from spawn.runners.state_database import StateDatabase
+from spawn.tasks import SimulationTask
 
 @pytest.fixture
 def output(mocker):
@@ -33,7 +38,11 @@ def output(mocker):
 def subprocess(mocker, output):
     subprocess_mock = mocker.Mock()
     mocker.patch('spawn.runners.process_runner.subprocess', subprocess_mock)
-    subprocess_mock.run.return_value = output
+    def _run(**kwargs):
+        kwargs['stdout'].write(output.stdout)
+        kwargs['stderr'].write(output.stderr)
+        return output
+    subprocess_mock.run.side_effect = _run
     return subprocess_mock
 
 @pytest.fixture
@@ -93,4 +102,95 @@ def test_ouptut_path_base_defaults_to_input_file_no_extension(runner, tmpdir):
 def test_logs_returns_output(runner, subprocess, tmpdir):
     runner.run()
     assert runner.logs() == 'output'
-    assert runner.error_logs() == 'error'
\ No newline at end of file
+    assert runner.error_logs() == 'error'
+
+def test_run_async_runs_process_and_writes_outputs(tmpdir):
+    script = path.join(tmpdir, 'script.py')
+    with open(script, 'w') as fp:
+        fp.write('import sys\nprint("output")\nsys.stderr.write("error")\n')
+    runner = ProcessRunner('42', script, sys.executable)
+    asyncio.run(runner.run_async())
+    assert runner.complete()
+    assert runner.logs().strip() == 'output'
+    assert runner.error_logs() == 'error'
+
+def test_run_async_raises_and_writes_failure_on_non_zero_exit(tmpdir):
+    script = path.join(tmpdir, 'script.py')
+    with open(script, 'w') as fp:
+        fp.write('import sys\nsys.exit(3)\n')
+    runner = ProcessRunner('42', script, sys.executable)
+    with pytest.raises(ChildProcessError):
+        asyncio.run(runner.run_async())
+    assert not runner.complete()
+    with open(runner.state_file) as fp:
+        assert json.load(fp)['returncode'] == 3
+
+def test_complete_uses_active_state_file_index(runner, subprocess, tmpdir, mocker):
+    runner.run()
+    with StateFileIndex(str(tmpdir)):
+        isfile = mocker.patch('spawn.runners.process_runner.path.isfile')
+        assert runner.complete()
+        isfile.assert_not_called()
+
+def test_state_is_recorded_in_active_state_database(runner, subprocess, tmpdir):
+    with StateDatabase.in_directory(str(tmpdir)) as database:
+        runner.run()
+        assert runner.complete()
+        assert not path.isfile(runner.state_file)
+        [state] = database.states()
+    assert state['id'] == '42'
+    assert state['result'] == 'success'
+    assert state['start_time'] <= state['end_time']
+
+def test_no_error_log_written_on_success_without_stderr(runner, subprocess, output, tmpdir):
+    output.stderr = b''
+    runner.run()
+    assert runner.error_logs() is None
+
+def test_return_code_written_to_error_log_on_failure_without_stderr(runner, subprocess, output, tmpdir):
+    output.stderr = b''
+    output.returncode = 2
+    with pytest.raises(ChildProcessError):
+        runner.run()
+    assert runner.error_logs() == '2'
+
+def _write_chatty_script(tmpdir):
+    script = path.join(tmpdir, 'script.py')
+    with open(script, 'w') as fp:
+        fp.write(
+            'import sys\n'
+            'for i in range(10000):\n'
+            '    print("line {:05d}".format(i))\n'
+            'sys.stderr.write("error")\n'
+        )
+    return script
+
+def test_only_tail_of_output_kept_when_max_log_size_set(tmpdir):
+    runner = ProcessRunner('42', _write_chatty_script(tmpdir), sys.executable, max_log_size=22)
+    runner.run()
+    assert runner.logs().split() == ['line', '09998', 'line', '09999']
+    assert runner.error_logs() == 'error'
+
+def test_only_tail_of_output_kept_when_max_log_size_set_async(tmpdir):
+    runner = ProcessRunner('42', _write_chatty_script(tmpdir), sys.executable, max_log_size=22)
+    asyncio.run(runner.run_async())
+    assert runner.logs().split() == ['line', '09998', 'line', '09999']
+    assert runner.error_logs() == 'error'
+
+def test_max_log_size_is_passed_to_runner_by_simulation_task(tmpdir):
+    task = SimulationTask(
+        _id='foo', _input_file_path=str(tmpdir.join('input.json')), _runner_type='process',
+        _exe_path='exe_path', _max_log_size=1024
+    )
+    assert task._create_runner()._max_log_size == 1024
+
+def test_output_streamed_to_log_files_in_full_by_default(tmpdir):
+    runner = ProcessRunner('42', _write_chatty_script(tmpdir), sys.executable)
+    runner.run()
+    assert len(runner.logs().splitlines()) == 10000
+
+def test_not_complete_if_input_hash_has_changed(input_file, exe_path, subprocess):
+    ProcessRunner('42', input_file, exe_path, input_hash='abc').run()
+    assert ProcessRunner('42', input_file, exe_path, input_hash='abc').complete()
+    assert not ProcessRunner('42', input_file, exe_path, input_hash='def').complete()
+    assert ProcessRunner('42', input_file, exe_path).complete()
@@ -0,0 +1,115 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+from os import path, makedirs
+import sys
+
+import pytest
+
+from spawn.runners.process_runner import ProcessRunner
+from spawn.runners.result_cache import *
+
+SCRIPT = (
+    'import sys\n'
+    'from os import path\n'
+    'run_dir = path.dirname(path.abspath(sys.argv[0]))\n'
+    'with open(run_dir + ".count", "a") as fp:\n'
+    '    fp.write("x")\n'
+    'with open(path.join(path.dirname(sys.argv[0]), "output.txt"), "w") as fp:\n'
+    '    fp.write("result")\n'
+    'print("done")\n'
+)
+
+def _write(file_path, contents):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as fp:
+        fp.write(contents)
+    return file_path
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    return path.join(str(tmpdir), 'cache')
+
+def _runner(tmpdir, name, contents=SCRIPT):
+    return ProcessRunner(name, _write(path.join(str(tmpdir), name, 'script.py'), contents), sys.executable)
+
+def _run_count(tmpdir, name):
+    counter = path.join(str(tmpdir), name + '.count')
+    if not path.isfile(counter):
+        return 0
+    with open(counter) as fp:
+        return len(fp.read())
+
+def test_identical_input_is_restored_from_cache(tmpdir, cache_dir):
+    with ResultCache(cache_dir):
+        _runner(tmpdir, 'a').run()
+        second = _runner(tmpdir, 'b')
+        second.run()
+    assert _run_count(tmpdir, 'b') == 0
+    assert second.complete()
+    assert second.logs().strip() == 'done'
+    with open(path.join(str(tmpdir), 'b', 'output.txt')) as fp:
+        assert fp.read() == 'result'
+
+def test_different_input_is_run(tmpdir, cache_dir):
+    with ResultCache(cache_dir):
+        _runner(tmpdir, 'a').run()
+        _runner(tmpdir, 'b', SCRIPT + '# different\n').run()
+    assert _run_count(tmpdir, 'b') == 1
+
+def test_restored_outputs_can_be_overwritten_by_a_later_run(tmpdir, cache_dir):
+    with ResultCache(cache_dir):
+        _runner(tmpdir, 'a').run()
+        _runner(tmpdir, 'b').run()
+    _runner(tmpdir, 'b', SCRIPT.replace('"result"', '"changed"')).run()
+    assert _run_count(tmpdir, 'b') == 1
+    with open(path.join(str(tmpdir), 'b', 'output.txt')) as fp:
+        assert fp.read() == 'changed'
+    with open(path.join(str(tmpdir), 'a', 'output.txt')) as fp:
+        assert fp.read() == 'result'
+    with ResultCache(cache_dir):
+        _runner(tmpdir, 'c').run()
+    with open(path.join(str(tmpdir), 'c', 'output.txt')) as fp:
+        assert fp.read() == 'result'
+
+def test_failed_runs_are_not_cached(tmpdir, cache_dir):
+    with ResultCache(cache_dir):
+        with pytest.raises(ChildProcessError):
+            _runner(tmpdir, 'a', SCRIPT + 'sys.exit(1)\n').run()
+        with pytest.raises(ChildProcessError):
+            _runner(tmpdir, 'b', SCRIPT + 'sys.exit(1)\n').run()
+    assert _run_count(tmpdir, 'b') == 1
+
+def test_least_recently_used_entries_are_evicted(tmpdir, cache_dir):
+    cache = ResultCache(cache_dir, max_size=150)
+    for i, name in enumerate(['a', 'b', 'c']):
+        output_dir = path.join(str(tmpdir), name)
+        entry = cache.entry(_write(path.join(output_dir, 'input'), name), sys.executable, output_dir)
+        assert not entry.restore()
+        _write(path.join(output_dir, 'output'), 'x' * 60)
+        entry.store()
+        if name == 'b':
+            assert cache.restore(cache.key(path.join(str(tmpdir), 'a', 'input'), sys.executable), output_dir)
+    assert cache.restore(cache.key(path.join(str(tmpdir), 'a', 'input'), sys.executable), str(tmpdir))
+    assert not cache.restore(cache.key(path.join(str(tmpdir), 'b', 'input'), sys.executable), str(tmpdir))
+    assert cache.restore(cache.key(path.join(str(tmpdir), 'c', 'input'), sys.executable), str(tmpdir))
+
+def test_active_only_within_context(cache_dir):
+    cache = ResultCache(cache_dir)
+    assert ResultCache.active() is None
+    with cache:
+        assert ResultCache.active() is cache
+    assert ResultCache.active() is None
@@ -0,0 +1,95 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import copy
+import os
+from os import path
+
+import pytest
+
+from spawn.runners.state_database import *
+
+@pytest.fixture
+def database(tmpdir):
+    database = StateDatabase.in_directory(str(tmpdir), batch_size=2)
+    yield database
+    database.close()
+
+def test_database_file_is_created_in_directory(database, tmpdir):
+    database.record('a', 'success', 0)
+    database.flush()
+    assert path.isfile(path.join(str(tmpdir), DATABASE_FILE_NAME))
+
+def test_result_returns_recorded_result(database):
+    database.record('a', 'success', 0)
+    database.record('b', 'failure', 1)
+    assert database.result('a') == 'success'
+    assert database.result('b') == 'failure'
+    assert database.result('c') is None
+
+def test_records_are_written_in_batches(database, tmpdir):
+    other = StateDatabase.in_directory(str(tmpdir))
+    database.record('a', 'success', 0)
+    assert other.states() == []
+    database.record('b', 'success', 0)
+    assert [s['id'] for s in other.states()] == ['a', 'b']
+    other.close()
+
+def test_states_are_persisted_after_close(database, tmpdir):
+    database.record('a', 'failure', 3, start_time=1.0, end_time=2.5, input_hash='abc')
+    database.close()
+    reopened = StateDatabase.in_directory(str(tmpdir))
+    assert reopened.states() == [{
+        'id': 'a', 'result': 'failure', 'returncode': 3, 'start_time': 1.0, 'end_time': 2.5, 'input_hash': 'abc'
+    }]
+    reopened.close()
+
+def test_later_record_replaces_earlier(database):
+    database.record('a', 'failure', 1)
+    database.record('a', 'success', 0)
+    assert database.summary() == {'success': 1}
+
+def test_summary_counts_results(database):
+    for i, result in enumerate(['success', 'failure', 'success']):
+        database.record(str(i), result, 0)
+    assert database.summary() == {'failure': 1, 'success': 2}
+
+def test_active_only_within_context(database):
+    assert StateDatabase.active() is None
+    with database:
+        assert StateDatabase.active() is database
+    assert StateDatabase.active() is None
+
+def test_state_recorded_by_another_process_is_read_after_first_read(database, tmpdir):
+    assert database.result('a') is None
+    other = StateDatabase.in_directory(str(tmpdir), batch_size=1)
+    other.record('a', 'success', 0)
+    other.close()
+    assert database.result('a') == 'success'
+
+def test_forked_process_discards_states_and_pending_records_of_parent(tmpdir, monkeypatch):
+    parent = StateDatabase.in_directory(str(tmpdir), batch_size=10)
+    assert parent.result('a') is None
+    parent.record('a', 'success', 0)
+    child = copy.copy(parent)
+    parent_pid = os.getpid()
+    monkeypatch.setattr(os, 'getpid', lambda: parent_pid + 1)
+    assert child.result('a') is None
+    child.record('b', 'failure', 1)
+    assert child.result('b') == 'failure'
+    monkeypatch.setattr(os, 'getpid', lambda: parent_pid)
+    assert [s['id'] for s in parent.states()] == ['a', 'b']
+    parent.close()
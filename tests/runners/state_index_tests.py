@@ -0,0 +1,76 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+from os import path, makedirs
+import json
+
+import pytest
+
+from spawn.runners.state_index import *
+
+def _write_state(file_path, result):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as fp:
+        json.dump({'result': result, 'returncode': 0}, fp)
+
+@pytest.fixture
+def index(tmpdir):
+    _write_state(path.join(str(tmpdir), 'a', '1.state.json'), 'success')
+    _write_state(path.join(str(tmpdir), 'b', '2.state.json'), 'failure')
+    return StateFileIndex(str(tmpdir))
+
+def test_result_is_read_from_state_file(index, tmpdir):
+    assert index.result(path.join(str(tmpdir), 'a', '1.state.json')) == 'success'
+    assert index.result(path.join(str(tmpdir), 'b', '2.state.json')) == 'failure'
+
+def test_result_is_none_without_state_file(index, tmpdir):
+    assert index.result(path.join(str(tmpdir), 'c', '3.state.json')) is None
+
+def test_directory_is_scanned_once(index, tmpdir, mocker):
+    walk = mocker.patch('spawn.runners.state_index.walk', return_value=[])
+    index.result(path.join(str(tmpdir), 'a', '1.state.json'))
+    index.result(path.join(str(tmpdir), 'b', '2.state.json'))
+    assert walk.call_count == 1
+
+def test_recorded_result_supercedes_scan(index, tmpdir):
+    state_file = path.join(str(tmpdir), 'c', '3.state.json')
+    assert index.result(state_file) is None
+    index.record(state_file, {'result': 'success'})
+    assert index.result(state_file) == 'success'
+
+def test_active_returns_covering_index_only_within_context(index, tmpdir):
+    state_file = path.join(str(tmpdir), 'a', '1.state.json')
+    assert StateFileIndex.active(state_file) is None
+    with index:
+        assert StateFileIndex.active(state_file) is index
+        assert StateFileIndex.active(path.join(path.dirname(str(tmpdir)), 'other.state.json')) is None
+    assert StateFileIndex.active(state_file) is None
+
+def test_index_is_not_active_in_forked_process(index, tmpdir, mocker):
+    state_file = path.join(str(tmpdir), 'a', '1.state.json')
+    with index:
+        mocker.patch('spawn.runners.state_index.os.getpid', return_value=-1)
+        assert StateFileIndex.active(state_file) is None
+
+def test_refresh_finds_state_files_written_since_query(index, tmpdir, mocker):
+    state_file = path.join(str(tmpdir), 'c', '3.state.json')
+    assert index.result(state_file) is None
+    _write_state(state_file, 'success')
+    assert index.result(state_file) is None
+    walk = mocker.patch('spawn.runners.state_index.walk', return_value=[])
+    index.refresh()
+    assert index.result(state_file) == 'success'
+    assert walk.call_count == 0
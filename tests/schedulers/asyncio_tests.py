@@ -0,0 +1,61 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+from os import path
+from glob import glob
+
+import pytest
+
+from spawn.config import CommandLineConfiguration, CompositeConfiguration, DefaultConfiguration
+from spawn.parsers import SpecificationParser
+from spawn.schedulers import AsyncioScheduler
+
+from ..conftest import *
+
+class FailingTask(FooTask):
+    def run(self):
+        raise RuntimeError('failed')
+
+class FailingSpawner(FooSpawner):
+    def spawn(self, path, metadata):
+        failing = FailingTask(_id=path, _metadata=metadata, _outdir=self._outdir)
+        return BarTask(_id=path, _dependencies=[failing], _metadata=metadata, _outdir=self._outdir)
+
+    def branch(self):
+        return FailingSpawner(self._outdir)
+
+@pytest.fixture
+def scheduler(tmpdir):
+    config = CompositeConfiguration(
+        CommandLineConfiguration(outdir=str(tmpdir), workers=2), DefaultConfiguration()
+    )
+    return AsyncioScheduler(config)
+
+@pytest.fixture
+def spec(plugin_loader):
+    return SpecificationParser(plugin_loader).parse({'spec': {'alpha': [1, 2, 3]}})
+
+def test_runs_tasks_and_dependencies(scheduler, spawner, spec, tmpdir):
+    scheduler.run(spawner, spec)
+    assert len(glob(path.join(str(tmpdir), '*.json'))) == 6
+
+def test_does_not_run_tasks_with_failed_dependencies(scheduler, spec, tmpdir):
+    scheduler.run(FailingSpawner(str(tmpdir)), spec)
+    assert glob(path.join(str(tmpdir), '*.json')) == []
+
+def test_add_worker_is_not_supported(scheduler):
+    with pytest.raises(NotImplementedError):
+        scheduler.add_worker()
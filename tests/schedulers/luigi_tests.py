@@ -0,0 +1,76 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+from os import path
+from glob import glob
+import sys
+
+import pytest
+
+from spawn.config import CommandLineConfiguration, CompositeConfiguration, DefaultConfiguration
+from spawn.parsers import SpecificationParser
+from spawn.schedulers import LuigiScheduler
+from spawn.spawners import TaskSpawner
+from spawn.tasks import SimulationTask
+
+class ProcessSpawner(TaskSpawner):
+    def __init__(self, outdir):
+        self._outdir = outdir
+
+    def spawn(self, path_, metadata):
+        first = self._task(path_ + '_first', metadata)
+        return self._task(path_ + '_second', metadata, _dependencies=[first])
+
+    def branch(self):
+        return ProcessSpawner(self._outdir)
+
+    def _task(self, id_, metadata, **kwargs):
+        input_file = path.join(self._outdir, id_.replace('/', '_') + '.py')
+        with open(input_file, 'w') as fp:
+            fp.write('pass\n')
+        return SimulationTask(
+            _id=id_, _input_file_path=input_file, _runner_type='process', _exe_path=sys.executable,
+            _metadata=metadata, **kwargs
+        )
+
+def _scheduler(tmpdir, local=True, **kwargs):
+    config = CompositeConfiguration(
+        CommandLineConfiguration(outdir=str(tmpdir), local=local, **kwargs), DefaultConfiguration()
+    )
+    return LuigiScheduler(config)
+
+@pytest.fixture
+def spec(plugin_loader):
+    return SpecificationParser(plugin_loader).parse({'spec': {'alpha': [1, 2, 3]}})
+
+@pytest.mark.parametrize('batch_size', [0, 2])
+def test_runs_tasks_with_dependencies_in_several_worker_processes(tmpdir, spec, batch_size):
+    _scheduler(tmpdir, workers=2, batch_size=batch_size).run(ProcessSpawner(str(tmpdir)), spec)
+    assert len(glob(path.join(str(tmpdir), '*.state.json'))) == 6
+    assert glob(path.join(str(tmpdir), '*.err')) == []
+
+def test_output_directory_is_scanned_once_per_run(tmpdir, spec, mocker):
+    walk = mocker.patch('spawn.runners.state_index.walk', return_value=[])
+    _scheduler(tmpdir, workers=2, batch_size=1).run(ProcessSpawner(str(tmpdir)), spec)
+    assert walk.call_count == 1
+    assert len(glob(path.join(str(tmpdir), '*.state.json'))) == 6
+
+def test_output_directory_is_not_indexed_for_remote_scheduler(tmpdir, spec, mocker):
+    index = mocker.patch('spawn.schedulers.stores.StateFileIndex')
+    build = mocker.patch.object(LuigiScheduler, '_build', return_value=True)
+    _scheduler(tmpdir, local=False, batch_size=1).run(ProcessSpawner(str(tmpdir)), spec)
+    assert build.call_count == 3
+    index.assert_not_called()
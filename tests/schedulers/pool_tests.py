@@ -0,0 +1,71 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+from os import path
+from glob import glob
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+
+from spawn.config import CommandLineConfiguration, CompositeConfiguration, DefaultConfiguration
+from spawn.parsers import SpecificationParser
+from spawn.schedulers import LocalPoolScheduler
+from spawn.runners import StateDatabase
+
+from ..conftest import *
+from .asyncio_tests import FailingSpawner
+from .luigi_tests import ProcessSpawner
+
+@pytest.fixture
+def scheduler(tmpdir):
+    config = CompositeConfiguration(
+        CommandLineConfiguration(outdir=str(tmpdir), workers=2), DefaultConfiguration()
+    )
+    return LocalPoolScheduler(config)
+
+@pytest.fixture
+def spec(plugin_loader):
+    return SpecificationParser(plugin_loader).parse({'spec': {'alpha': [1, 2, 3]}})
+
+def test_runs_tasks_and_dependencies_in_worker_processes(scheduler, spawner, spec, tmpdir):
+    scheduler.run(spawner, spec)
+    assert len(glob(path.join(str(tmpdir), '*.json'))) == 6
+
+def test_runs_simulation_tasks_in_worker_processes(scheduler, spec, tmpdir):
+    scheduler.run(ProcessSpawner(str(tmpdir)), spec)
+    assert len(glob(path.join(str(tmpdir), '*.state.json'))) == 6
+
+def test_does_not_run_tasks_with_failed_dependencies(scheduler, spec, tmpdir):
+    scheduler.run(FailingSpawner(str(tmpdir)), spec)
+    assert glob(path.join(str(tmpdir), '*.json')) == []
+
+def test_add_worker_is_not_supported(scheduler):
+    with pytest.raises(NotImplementedError):
+        scheduler.add_worker()
+
+def test_spawned_worker_processes_record_states_in_state_database(spec, tmpdir, mocker):
+    mocker.patch(
+        'spawn.schedulers.pool.ProcessPoolExecutor', partial(ProcessPoolExecutor, mp_context=get_context('spawn'))
+    )
+    config = CompositeConfiguration(
+        CommandLineConfiguration(outdir=str(tmpdir), workers=2, state_database=True), DefaultConfiguration()
+    )
+    LocalPoolScheduler(config).run(ProcessSpawner(str(tmpdir)), spec)
+    assert glob(path.join(str(tmpdir), '*.state.json')) == []
+    with StateDatabase.in_directory(str(tmpdir)) as database:
+        assert database.summary() == {'success': 6}
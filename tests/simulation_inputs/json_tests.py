@@ -17,8 +17,10 @@
 import pytest
 from os import path
 import copy
+import json
 
 from spawn.simulation_inputs.json import JsonSimulationInput
+from spawn.util.hash import json_fingerprint
 
 
 @pytest.fixture()
@@ -63,8 +65,122 @@ def test_hash_is_same_for_same_inputs(params):
     assert a.hash() == b.hash()
 
 
+def test_hash_is_fingerprint_of_content(params):
+    a = JsonSimulationInput(params).branch()
+    a['b']['c'] = 'frog'
+    a['z'] = 1
+    expected = copy.deepcopy(params)
+    expected['b']['c'] = 'frog'
+    expected['z'] = 1
+    assert a.hash() == json_fingerprint(expected)
+    assert a.hash() == JsonSimulationInput(expected).hash()
+
+
+def test_hash_changes_when_list_modified_in_place(params):
+    params['e'] = [1, 2]
+    a = JsonSimulationInput(params)
+    before = a.hash()
+    a['e'][0] = 3
+    assert a.hash() != before
+
+
 def test_hash_is_different_for_diferent_inputs(params):
     a = JsonSimulationInput(params)
     params['b']['d'] = 'frog'
     b = JsonSimulationInput(params)
     assert a.hash() != b.hash()
+
+
+def test_branch_does_not_affect_trunk(params):
+    trunk = JsonSimulationInput(params)
+    branch = trunk.branch()
+    branch['a'] = 5
+    branch['b']['c'] = 'frog'
+    assert trunk['a'] == 3
+    assert trunk['b']['c'] == 'egg'
+    assert branch['a'] == 5
+    assert branch['b']['c'] == 'frog'
+
+
+def test_branch_inherits_trunk_changes(params):
+    trunk = JsonSimulationInput(params)
+    trunk['b']['d'] = 'frog'
+    branch = trunk.branch()
+    assert branch['b']['d'] == 'frog'
+
+
+def test_list_changes_are_isolated_to_branch():
+    trunk = JsonSimulationInput({'a': [1, 2, 3]})
+    branch = trunk.branch()
+    branch['a'][1] = 5
+    assert branch['a'] == [1, 5, 3]
+    assert trunk['a'] == [1, 2, 3]
+
+
+def test_setting_parent_replaces_nested_changes(params):
+    inp = JsonSimulationInput(params)
+    inp['b']['c'] = 'frog'
+    inp['b'] = {'e': 1}
+    inp['b']['f'] = 2
+    assert inp['b']['e'] == 1
+    with pytest.raises(KeyError):
+        inp['b']['c']
+
+
+def test_written_file_contains_branch_changes(tmpdir, params):
+    inp = JsonSimulationInput(params).branch()
+    inp['b']['c'] = 'frog'
+    inp['g'] = [1, 2]
+    fp = path.join(tmpdir, 'file.json')
+    inp.to_file(fp)
+    with open(fp) as f:
+        assert json.load(f) == {'a': 3, 'b': {'c': 'frog', 'd': 'tadpole'}, 'g': [1, 2]}
+    assert params['b']['c'] == 'egg'
+
+
+@pytest.mark.parametrize('write_options', [
+    {}, {'indent': 2}, {'indent': '\t', 'sort_keys': True}, {'separators': (',', ':')}, {'ensure_ascii': False}
+])
+def test_serialisation_is_identical_to_json_dumps(write_options):
+    params = {'a': 'tadpole', 'b': {'c': 'egg', 'd': {'e': [1.5, {'f': 'frög'}], 'g': {}}}, 'h': []}
+    trunk = JsonSimulationInput(params, **write_options)
+    for _ in range(2):
+        branch = trunk.branch()
+        branch['b']['d']['g'] = {'new': [1, 2]}
+        branch['b']['z'] = 'frog'
+        branch['a'] = None
+        branch['h'].append(3)
+        assert branch._serialise() == json.dumps(branch._materialise(), **write_options)
+    assert trunk._serialise() == json.dumps(params, **write_options)
+
+
+def test_serialisation_falls_back_to_json_dumps_for_non_string_keys():
+    a = JsonSimulationInput({'a': {'b': 1}}, indent=2)
+    a['a'][1] = 2
+    assert a._serialise() == json.dumps({'a': {'b': 1, 1: 2}}, indent=2)
+
+
+def test_values_within_overridden_dict_are_not_taken_from_baseline(tmpdir):
+    trunk = JsonSimulationInput({'a': {'b': 1, 'c': 1}, 'd': 2})
+    baseline_branch = trunk.branch()
+    baseline_branch['a']['b'] = 11
+    baseline_branch.to_file(str(tmpdir.join('baseline.json')))
+    baseline_hash = baseline_branch.hash()
+    branch = trunk.branch()
+    branch['a'] = {'b': 10, 'c': 99}
+    branch['a']['b'] = 11
+    file_path = str(tmpdir.join('branch.json'))
+    branch.to_file(file_path)
+    with open(file_path) as fp:
+        assert json.load(fp) == {'a': {'b': 11, 'c': 99}, 'd': 2}
+    assert branch.hash() != baseline_hash
+    assert branch.hash() == json_fingerprint({'a': {'b': 11, 'c': 99}, 'd': 2})
+
+
+def test_from_file_of_nested_dict_reads_json_simulation_input(tmpdir, params):
+    file_path = str(tmpdir.join('nested.json'))
+    inp = JsonSimulationInput(params)
+    inp['b'].to_file(file_path)
+    nested = type(inp['b']).from_file(file_path)
+    assert isinstance(nested, JsonSimulationInput)
+    assert nested['c'] == params['b']['c']
@@ -16,13 +16,18 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
 from os import path, mkdir
 import json
+import logging
 
 import pytest
 from luigi import configuration
 
 from spawn.spawners import SingleInputFileSpawner
-from spawn.simulation_inputs import JsonSimulationInput
-from spawn.tasks import SimulationTask
+from spawn.simulation_inputs import JsonSimulationInput, SimulationInput
+from spawn.tasks import SimulationTask, InputManifest
+from spawn.tasks.generate import generate_tasks_from_spec
+from spawn.parsers import SpecificationNodeParser
+from spawn.parsers.value_proxy import ValueProxyParser
+from spawn.parsers.value_libraries import ValueLibraries
 
 
 @pytest.fixture()
@@ -66,3 +71,79 @@ def test_branched_spawner_spawns_different_file(sim_input, tmpdir, set_config):
         b = json.load(fp)
     assert a != b
     assert b['a'] == 'frog'
+
+
+def test_spawned_task_has_input_hash(sim_input, tmpdir, set_config):
+    task = SingleInputFileSpawner(sim_input, 'input.json').spawn(str(tmpdir), {})
+    assert task._input_hash == sim_input.hash()
+
+
+class _UnhashableSimulationInput(SimulationInput):
+    def __init__(self):
+        self._parameters = {}
+
+    def to_file(self, file_path):
+        with open(file_path, 'w') as fp:
+            fp.write('input')
+
+    def __setitem__(self, key, value):
+        self._parameters[key] = value
+
+    def __getitem__(self, key):
+        return self._parameters[key]
+
+
+def test_spawns_task_without_input_hash_for_input_without_hash(tmpdir, set_config):
+    spawner = SingleInputFileSpawner(_UnhashableSimulationInput(), 'input.txt')
+    assert spawner.input_hash() is None
+    task = spawner.spawn(str(tmpdir), {})
+    assert task.input_hash is None
+    assert path.isfile(path.join(str(tmpdir), 'input.txt'))
+
+
+def test_respawn_does_not_rewrite_existing_input_file(sim_input, tmpdir, set_config):
+    spawner = SingleInputFileSpawner(sim_input, 'input.json')
+    spawner.spawn(str(tmpdir), {})
+    with open(path.join(str(tmpdir), 'input.json'), 'w') as fp:
+        fp.write('unchanged')
+    spawner.respawn(str(tmpdir), {})
+    with open(path.join(str(tmpdir), 'input.json')) as fp:
+        assert fp.read() == 'unchanged'
+
+
+def _generate_with_manifest(sim_input, outdir, run_spec, file_name='input.json'):
+    root_node = SpecificationNodeParser(ValueProxyParser(ValueLibraries())).parse(run_spec)
+    manifest = InputManifest.load(outdir)
+    tasks = generate_tasks_from_spec(SingleInputFileSpawner(sim_input, file_name), root_node, outdir, manifest=manifest)
+    manifest.save()
+    return tasks
+
+
+def test_only_changed_inputs_are_rewritten_with_manifest(sim_input, tmpdir, set_config):
+    outdir = str(tmpdir)
+    tasks = _generate_with_manifest(sim_input, outdir, {'a': ['egg', 'frog']})
+    for task in tasks:
+        with open(task._input_file_path, 'a') as fp:
+            fp.write(' ')
+    rerun = _generate_with_manifest(sim_input, outdir, {'a': ['egg', 'tadpole']})
+    assert [t._input_hash for t in rerun][0] == tasks[0]._input_hash
+    assert [t._input_hash for t in rerun][1] != tasks[1]._input_hash
+    with open(rerun[0]._input_file_path) as fp:
+        assert fp.read().endswith(' ')
+    with open(rerun[1]._input_file_path) as fp:
+        assert json.load(fp)['a'] == 'tadpole'
+
+
+def test_input_without_hash_is_always_rewritten_with_manifest(tmpdir, set_config, caplog):
+    caplog.set_level(logging.DEBUG, logger='spawn.spawners.single_input_file')
+    outdir = str(tmpdir)
+    tasks = _generate_with_manifest(_UnhashableSimulationInput(), outdir, {'a': ['egg', 'frog']}, 'input.txt')
+    for task in tasks:
+        with open(task._input_file_path, 'a') as fp:
+            fp.write(' changed')
+    rerun = _generate_with_manifest(_UnhashableSimulationInput(), outdir, {'a': ['egg', 'frog']}, 'input.txt')
+    assert len(rerun) == 2
+    for task in rerun:
+        with open(task._input_file_path) as fp:
+            assert fp.read() == 'input'
+    assert '_UnhashableSimulationInput cannot be hashed, so is always rewritten' in caplog.messages
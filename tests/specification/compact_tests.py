@@ -0,0 +1,122 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import pytest
+
+from spawn.parsers import SpecificationParser
+from spawn.specification import DictSpecificationConverter
+from spawn.specification.compact import *
+from spawn.specification.specification import *
+
+SPEC = {
+    'base_file': './file/input.in',
+    'spec': {
+        'policy:path': 'X{alpha}/Y{beta}',
+        '_casper': 1.0,
+        'alpha': [3.0, 12.0],
+        'beta': [0.0, 180.0],
+        'gamma[1]': 'a',
+        'delta': ['x', 'x']
+    }
+}
+
+@pytest.fixture
+def parser(plugin_loader):
+    return SpecificationParser(plugin_loader)
+
+def test_compact_tree_converts_identically_to_node_tree(parser):
+    expected = DictSpecificationConverter().convert(parser.parse(SPEC))
+    assert DictSpecificationConverter().convert(parser.parse(SPEC, compact=True)) == expected
+
+def test_compact_tree_leaves_match_node_tree_leaves(parser):
+    leaves = parser.parse(SPEC).root_node.leaves
+    compact_leaves = parser.parse(SPEC, compact=True).root_node.leaves
+    assert len(compact_leaves) == len(leaves)
+    for leaf, compact_leaf in zip(leaves, compact_leaves):
+        assert compact_leaf.path == leaf.path
+        assert compact_leaf.collected_properties == leaf.collected_properties
+        assert compact_leaf.collected_indices == leaf.collected_indices
+        assert compact_leaf.ghosts == leaf.ghosts
+
+def test_compact_tree_preserves_indexed_nodes(parser):
+    root_node = parser.parse(SPEC, compact=True).root_node
+    indexed = [n for n in root_node.leaves[0].parent.parent.children if isinstance(n, IndexedNode)]
+    assert len(indexed) == 1
+    assert indexed[0].index == 1
+    assert indexed[0].property_value == 'a'
+
+def test_compact_tree_interns_repeated_values():
+    root = SpecificationNode.create_root()
+    for i in range(3):
+        child = SpecificationNode(root, 'alpha', 1.0, None, {})
+        SpecificationNode(child, 'beta', i, None, {})
+    tree = CompactSpecificationTree.from_node(root)
+    assert len(tree) == 7
+    assert len(tree._values) == 5 # None, 1.0, 0, 1, 2
+
+def test_compact_tree_children_are_contiguous_views():
+    root = SpecificationNode.create_root()
+    for i in range(3):
+        SpecificationNode(root, 'alpha', i, None, {})
+    compact_root = CompactSpecificationTree.from_node(root).root
+    assert compact_root.is_root
+    assert [c.index for c in compact_root.children] == [0, 1, 2]
+    assert [c.property_value for c in compact_root.children] == [0, 1, 2]
+    assert all(c.parent == compact_root for c in compact_root.children)
+
+def test_compact_tree_is_read_only():
+    root = SpecificationNode.create_root()
+    compact_root = CompactSpecificationTree.from_node(root).root
+    with pytest.raises(TypeError):
+        compact_root.add_child(SpecificationNode(None, 'alpha', 1, None, {}))
+    with pytest.raises(TypeError):
+        compact_root.copy(None)
+
+def test_compact_tree_evaluates_generators_in_same_order_as_node_tree(parser):
+    spec = {
+        'generators': {'gen': {'method': 'IncrementalInt', 'start': 1, 'step': 1}},
+        'spec': {'alpha': [1, 2], 'beta': {'seed': 'gen:gen', 'gamma': [3, 4]}}
+    }
+    expected = DictSpecificationConverter().convert(parser.parse(spec))
+    assert DictSpecificationConverter().convert(parser.parse(spec, compact=True)) == expected
+
+def test_compact_tree_releases_nodes_once_stored():
+    root = SpecificationNode.create_root()
+    child = SpecificationNode(root, 'alpha', 1.0, None, {})
+    SpecificationNode(child, 'beta', 2.0, None, {})
+    tree = CompactSpecificationTree.from_node(root)
+    assert len(tree) == 3
+    assert root.children == []
+    assert child.children == []
+
+def test_compact_tree_caches_collected_frames_of_each_row(parser):
+    leaf = parser.parse(SPEC, compact=True).root_node.leaves[0]
+    assert leaf.parent._collected_frames() is leaf.parent._collected_frames()
+
+def test_compact_tree_keeps_only_frames_of_ancestors_of_last_node(parser):
+    spec = {'spec': {'alpha': list(range(20)), 'beta': list(range(20)), 'gamma': list(range(20))}}
+    tree = parser.parse(spec, compact=True).root_node._tree
+    leaves = tree.root.leaves
+    assert [l.collected_properties for l in leaves] == [l.collected_properties for l in parser.parse(spec).root_node.leaves]
+    assert len(tree._frame_stack) == 3
+    assert len(tree._frame_depths) == 3
+
+@pytest.mark.parametrize('spec', [SPEC, {'spec': {'alpha': [1, 2, 3], 'beta': {'gamma': [4, 5], 'delta': 6}}}])
+def test_compact_tree_leaf_count_matches_node_tree(parser, spec):
+    root_node = parser.parse(spec).root_node
+    compact_root = parser.parse(spec, compact=True).root_node
+    assert compact_root.leaf_count == root_node.leaf_count
+    assert compact_root.children[0].leaf_count == root_node.children[0].leaf_count
@@ -0,0 +1,84 @@
+# spawn
+# Copyright (C) 2018-2019, Simmovation Ltd.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import pytest
+
+from spawn.parsers import SpecificationParser
+from spawn.specification import DictSpecificationConverter, deduplicate
+from spawn.specification.deduplication import find_duplicate_leaves
+from spawn.tasks.generate import generate_tasks_from_spec
+
+from tests.conftest import create_spawner
+
+@pytest.fixture
+def parse(plugin_loader):
+    def _parse(spec):
+        return SpecificationParser(plugin_loader).parse({'spec': spec})
+    return _parse
+
+def _leaf_paths(spec_model):
+    return [leaf.path for leaf in spec_model.root_node.leaves]
+
+def test_repeated_values_are_aliases_of_first_leaf(parse):
+    spec_model = deduplicate(parse({'alpha': [1.0, 2.0, 1.0, 1.0]}))
+    paths = _leaf_paths(spec_model)
+    assert spec_model.aliases == {paths[2]: paths[0], paths[3]: paths[0]}
+
+def test_distinct_leaves_have_no_aliases(parse):
+    spec_model = deduplicate(parse({'alpha': [1.0, 2.0], 'beta': ['egg', 'frog']}))
+    assert spec_model.aliases == {}
+
+def test_order_of_assignment_does_not_matter(parse):
+    spec_model = parse({'block': [{'alpha': 1.0, 'beta': 'egg'}, {'beta': 'egg', 'alpha': 1.0}]})
+    paths = _leaf_paths(spec_model)
+    assert find_duplicate_leaves(spec_model.root_node) == {paths[1]: paths[0]}
+
+def test_later_assignment_overrides_earlier(parse):
+    spec_model = parse({'alpha': 1.0, 'block': [{'alpha': 2.0}, {'beta': 'egg', 'alpha': 2.0}, {'alpha': 2.0}]})
+    paths = _leaf_paths(spec_model)
+    assert find_duplicate_leaves(spec_model.root_node) == {paths[2]: paths[0]}
+
+def test_indexed_properties_are_compared_by_index(parse):
+    spec_model = parse({'block': [{'x[0]': 1, 'x[1]': 2}, {'x[0]': 2, 'x[1]': 1}, {'x[1]': 2, 'x[0]': 1}]})
+    paths = _leaf_paths(spec_model)
+    assert find_duplicate_leaves(spec_model.root_node) == {paths[2]: paths[0]}
+
+def test_ghost_parameters_are_ignored(parse):
+    spec_model = parse({'block': [{'_ghost': 1, 'alpha': 3.0}, {'_ghost': 2, 'alpha': 3.0}]})
+    paths = _leaf_paths(spec_model)
+    assert find_duplicate_leaves(spec_model.root_node) == {paths[1]: paths[0]}
+
+def test_deduplicate_does_not_modify_spec(parse):
+    spec_model = parse({'alpha': [1.0, 1.0]})
+    deduplicate(spec_model)
+    assert spec_model.aliases == {}
+
+def test_aliases_are_written_by_converter(parse):
+    spec_model = deduplicate(parse({'alpha': [1.0, 1.0]}))
+    first, second = DictSpecificationConverter().convert(spec_model)['spec']
+    assert 'alias_of' not in first
+    assert second['alias_of'] == first['path']
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_no_tasks_are_generated_for_aliases(tmpdir, parse, processes):
+    spec_model = deduplicate(parse({'alpha': [1.0, 2.0, 1.0], 'beta': ['egg', 'egg']}))
+    assert len(spec_model.aliases) == 4
+    tasks = generate_tasks_from_spec(
+        create_spawner(tmpdir.strpath), spec_model.root_node, tmpdir.strpath,
+        processes=processes, aliases=spec_model.aliases
+    )
+    assert len(tasks) == 2
+    assert sorted(t.metadata['alpha'] for t in tasks) == [1.0, 2.0]
@@ -14,9 +14,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import inspect
+
 import pytest
 
 from spawn.specification.evaluators import *
+from spawn.errors import EvaluatorTypeError, EvaluatorParameterNotFoundError
+from spawn.specification.generator_methods import IncrementalInt
 
 @pytest.mark.parametrize('start,end,step,expected', [
     (0, 0, 1, [0]),
@@ -24,4 +28,92 @@ from spawn.specification.evaluators import *
     (0, 1, 2, [0]),
 ])
 def test_range_evaluator_returns_correct_range(start, end, step, expected):
-    assert RangeEvaluator(start, end, step).evaluate() == expected
\ No newline at end of file
+    assert RangeEvaluator(start, end, step).evaluate() == expected
+
+def test_function_evaluator_passes_only_parameters_not_filled_by_position():
+    def function(a, b=2, c=3):
+        return a, b, c
+    evaluator = create_function_evaluator(function)(1, 5)
+    assert evaluator.evaluate(a=10, c=30, d=40) == (1, 5, 30)
+
+def test_function_evaluator_passes_all_keyword_arguments_if_function_accepts_kwargs():
+    def function(a, **kwargs):
+        return a, kwargs
+    evaluator = create_function_evaluator(function)(1)
+    assert evaluator.evaluate(b=20, c=30) == (1, {'b': 20, 'c': 30})
+
+def test_evaluators_are_evaluated_without_inspecting_signatures(monkeypatch):
+    def function(a, b):
+        return a + b
+    evaluator = MultiplyEvaluator(create_function_evaluator(function)(ParameterEvaluator('x'), 1), 3)
+    monkeypatch.setattr(inspect, 'signature', None)
+    assert evaluator.evaluate(x=2) == 9
+
+def test_evaluator_type_error_names_parameters_of_evaluator():
+    with pytest.raises(EvaluatorTypeError) as e:
+        MultiplyEvaluator(1, name='mult').evaluate()
+    assert 'left' in str(e.value) and 'right' in str(e.value)
+
+def _capped_range(start, end, step):
+    # The previous implementation, for ranges within its cap of 100 values
+    comp = (lambda v: end >= v) if step > 0 else (lambda v: end <= v)
+    values = []
+    i = 0
+    while i < 100 and comp(start + i*step):
+        values.append(start + i*step)
+        i += 1
+    return values
+
+@pytest.mark.parametrize('start,end,step', [
+    (1.0, 1.5, 0.1), (0.3, 0.5, 0.1), (0.0, 1.0, 0.1), (0.1, 0.7, 0.2), (-180, 165, 15),
+    (20, 0, -5), (1.0, -1.0, -0.1), (0.0, 9.9, 0.1), (2.5, 3.0, 0.25), (0.0, 1e-3, 2e-5)
+])
+def test_range_evaluator_gives_same_values_as_loop(start, end, step):
+    assert RangeEvaluator(start, end, step).evaluate() == _capped_range(start, end, step)
+
+def test_range_evaluator_raises_if_range_exceeds_limit():
+    assert len(RangeEvaluator(1, RANGE_LIMIT).evaluate()) == RANGE_LIMIT
+    with pytest.raises(ValueError):
+        RangeEvaluator(0, RANGE_LIMIT).evaluate()
+
+def test_range_evaluator_limit_can_be_changed():
+    evaluator_type = RangeEvaluator.limited_to(5)
+    assert evaluator_type(1, 5).evaluate() == [1, 2, 3, 4, 5]
+    with pytest.raises(ValueError):
+        evaluator_type(1, 6).evaluate()
+
+def _batch_contexts(values):
+    return [{'x': x, 'y': y} for x, y in values]
+
+@pytest.mark.parametrize('evaluator', [
+    AddEvaluator(MultiplyEvaluator(ParameterEvaluator('x'), 3), DivideEvaluator(ParameterEvaluator('y'), 7)),
+    SubtractEvaluator(ParameterEvaluator('x'), MultiplyEvaluator(ParameterEvaluator('y'), ParameterEvaluator('x'))),
+    MultiplyEvaluator(4, 2.5)
+])
+@pytest.mark.parametrize('values', [
+    [(0.1, 0.2), (1.5, -3.0), (1e300, 1e-300)],
+    [(1, 2), (3, 4), (2**70, 5)],
+    [(1, 0.5), (2.0, 3)]
+])
+def test_evaluate_batch_gives_same_values_as_evaluate(evaluator, values):
+    contexts = _batch_contexts(values)
+    assert evaluator.vectorisable
+    results = evaluator.evaluate_batch(contexts)
+    expected = [evaluator.evaluate(**context) for context in contexts]
+    assert results == expected
+    assert [type(r) for r in results] == [type(e) for e in expected]
+
+def test_evaluate_batch_raises_as_evaluate_does():
+    evaluator = DivideEvaluator(ParameterEvaluator('x'), ParameterEvaluator('y'))
+    with pytest.raises(ZeroDivisionError):
+        evaluator.evaluate_batch(_batch_contexts([(1.0, 2.0), (1.0, 0.0)]))
+    with pytest.raises(EvaluatorParameterNotFoundError):
+        evaluator.evaluate_batch([{'x': 1.0, 'y': 2.0}, {'x': 1.0}])
+
+def test_evaluate_batch_of_non_numeric_values_evaluates_each():
+    evaluator = AddEvaluator(ParameterEvaluator('x'), ParameterEvaluator('y'))
+    assert evaluator.evaluate_batch(_batch_contexts([('a', 'b'), ('c', 'd')])) == ['ab', 'cd']
+
+def test_evaluators_of_generators_are_not_vectorisable():
+    assert not MultiplyEvaluator(IncrementalInt(), 2).vectorisable
+    assert not RangeEvaluator(1, ParameterEvaluator('x')).vectorisable
@@ -28,3 +28,116 @@ def test_returns_indexed_node_for_index_pattern_name():
     assert node.index == 1
     assert node.property_name == 'alpha'
     assert node.property_value == 42
+
+def _create_list_tree(values, child_values):
+    root = SpecificationNode.create_root()
+    node_factory = SpecificationNodeFactory()
+    list_node = node_factory.create(root, 'alpha', values, None, {})
+    node_factory.create(list_node, 'beta', child_values, None, {})
+    return root
+
+def test_leaves_with_same_base_path_get_alphabetical_suffixes():
+    root = _create_list_tree([1, 2], [3, 4])
+    root.evaluate()
+    assert [l.path for l in root.leaves] == ['a', 'b', 'c', 'd']
+
+def test_leaf_paths_are_reindexed_after_adding_child():
+    root = SpecificationNode.create_root()
+    SpecificationNodeFactory().create(root, 'alpha', 1, None, {})
+    assert [l.path for l in root.leaves] == ['']
+    SpecificationNodeFactory().create(root, 'alpha', 2, None, {})
+    assert [l.path for l in root.leaves] == ['a', 'b']
+
+def test_list_node_expands_when_children_accessed():
+    root = SpecificationNode.create_root()
+    SpecificationNodeFactory().create(root, 'alpha', [1, 2, 3], None, {})
+    assert [l.collected_properties for l in root.leaves] == [{'alpha': 1}, {'alpha': 2}, {'alpha': 3}]
+    assert [l.path for l in root.leaves] == ['a', 'b', 'c']
+
+def test_leaf_count_of_unexpanded_tree_does_not_expand_it():
+    root = _create_list_tree([1, 2, 3], [{'beta': [4, 5], 'gamma': [6, 7, 8]}, 9])
+    list_node = root.children[0]
+    assert root.leaf_count == 21
+    assert not list_node._expanded
+    assert len(root.leaves) == 21
+
+def test_iter_leaves_yields_leaves_depth_first():
+    root = _create_list_tree([1, 2], [3, 4])
+    root.evaluate()
+    assert [l.collected_properties for l in root.iter_leaves()] == [
+        {'alpha': 1, 'beta': 3}, {'alpha': 1, 'beta': 4},
+        {'alpha': 2, 'beta': 3}, {'alpha': 2, 'beta': 4}
+    ]
+
+def test_leaf_count_matches_number_of_leaves():
+    root = _create_list_tree([1, 2, 3], [4, 5])
+    root.evaluate()
+    assert root.leaf_count == len(root.leaves) == 6
+
+def test_leaf_is_its_own_only_leaf():
+    node = SpecificationNodeFactory().create(None, 'alpha', 42, None, {})
+    assert node.leaves == [node]
+    assert node.leaf_count == 1
+
+def test_expanded_list_children_share_subtree_until_accessed():
+    root = _create_list_tree([1, 2], [3, 4])
+    list_node = root.children[0]
+    first, second = list_node.children
+    assert first._children == [] and second._children == []
+    assert first._deferred is second._deferred
+    assert [l.property_value for l in first.leaves] == [3, 4]
+    assert second._children == []
+
+def test_copy_shares_children_until_accessed():
+    root = SpecificationNode.create_root()
+    node = SpecificationNode(root, 'alpha', 1, None, {})
+    SpecificationNode(node, 'beta', 2, None, {})
+    copied = node.copy(None)
+    assert copied._children == []
+    assert [(c.property_name, c.property_value) for c in copied.children] == [('beta', 2)]
+    assert copied.children[0] is not node.children[0]
+    assert copied.children[0].parent is copied
+
+def test_index_is_position_in_parent_children():
+    root = SpecificationNode.create_root()
+    children = [SpecificationNode(root, 'alpha', i, None, {}) for i in range(5)]
+    assert [c.index for c in children] == list(range(5))
+    assert root.index == -1
+
+def test_adding_existing_child_does_not_duplicate_it():
+    root = SpecificationNode.create_root()
+    child = SpecificationNode(root, 'alpha', 1, None, {})
+    root.add_child(child)
+    assert root.children == [child]
+
+def test_index_is_updated_after_expansion():
+    root = _create_list_tree([1, 2, 3], [4])
+    assert [l.collected_indices for l in root.leaves] == [{"alpha": i, "beta": 0} for i in range(3)]
+
+def test_sibling_leaves_share_parent_collected_properties():
+    root = _create_list_tree([1, 2], [3, 4])
+    first, second = root.leaves[:2]
+    assert first.collected_properties == {'alpha': 1, 'beta': 3}
+    assert second.collected_properties == {'alpha': 1, 'beta': 4}
+    assert first.parent._cache.frames is second.parent._cache.frames
+    assert first._cache.frames is None
+
+def test_lower_ghosts_supercede_higher_ghosts():
+    root = SpecificationNode.create_root()
+    node = SpecificationNode(root, 'alpha', 1, None, {'casper': 1, 'boo': 2})
+    leaf = SpecificationNode(node, 'beta', 2, None, {'casper': 3})
+    assert leaf.ghosts == {'casper': 3, 'boo': 2}
+    assert node.ghosts == {'casper': 1, 'boo': 2}
+
+def test_evaluated_value_proxy_is_not_collected():
+    root = SpecificationNode.create_root()
+    ValueProxyNode(root, 'alpha', Macro({'beta': [1, 2]}), None, {})
+    assert [l.collected_properties for l in root.leaves] == [{'beta': 1}, {'beta': 2}]
+
+def test_leaves_are_cached_until_tree_changes():
+    root = SpecificationNode.create_root()
+    node = SpecificationNode(root, 'alpha', 1, None, {})
+    leaves = root.leaves
+    assert root.leaves is leaves
+    leaf = SpecificationNode(node, 'beta', 2, None, {})
+    assert root.leaves == [leaf]
@@ -46,3 +46,13 @@ def test_can_create_runs_from_example_spec(tmpdir, spawner, plugin_loader, examp
         assert 'alpha' in t.metadata
         assert 'beta' in t.metadata
         assert t.metadata['beta'] in ['egg', 'tadpole', 'frog']
+
+def test_generating_in_process_pool_gives_same_tasks_as_serial(tmpdir, plugin_loader, example_data_folder):
+    input_path = path.join(example_data_folder, 'example_spec.json')
+    spec_model = SpecificationParser(plugin_loader).parse(SpecificationFileReader(input_path).get())
+    serial = generate_tasks_from_spec(create_spawner(tmpdir.strpath), spec_model.root_node, tmpdir.strpath)
+    parallel = generate_tasks_from_spec(
+        create_spawner(tmpdir.strpath), spec_model.root_node, tmpdir.strpath, processes=2
+    )
+    assert [t.task_id for t in parallel] == [t.task_id for t in serial]
+    assert [t.requires()[0].task_id for t in parallel] == [t.requires()[0].task_id for t in serial]
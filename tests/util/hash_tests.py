@@ -14,7 +14,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+import os
 from os import path
+import subprocess
+import sys
 
 import pytest
 
@@ -61,3 +64,21 @@ def test_same_bytes_same_hashes():
 
 def test_different_bytes_different_hashes():
     assert bytes_hash(b'foo') != bytes_hash(b'bar')
+
+def test_json_fingerprint_ignores_key_order():
+    assert json_fingerprint({'a': 1, 'b': [1, 2]}) == json_fingerprint({'b': [1, 2], 'a': 1})
+
+@pytest.mark.parametrize('a,b', [
+    ({'a': 1}, {'a': 1.0}), ({'a': 1}, {'a': True}), ([1, 2], [2, 1]), ({'a': [1]}, {'a': 1}), ({'a': 'b'}, {'ab': ''})
+])
+def test_different_json_values_have_different_fingerprints(a, b):
+    assert json_fingerprint(a) != json_fingerprint(b)
+
+def test_json_fingerprint_is_stable_across_processes():
+    script = 'from spawn.util.hash import json_fingerprint; print(json_fingerprint({"a": [1, "b"]}))'
+    outputs = {
+        subprocess.run([sys.executable, '-c', script], env={**os.environ, 'PYTHONHASHSEED': seed},
+                       stdout=subprocess.PIPE, check=True).stdout
+        for seed in ('1', '2')
+    }
+    assert outputs == {(json_fingerprint({'a': [1, 'b']}) + '\n').encode()}